@@ -0,0 +1,201 @@
+import hashlib
+import importlib
+import json
+import os
+from typing import List
+
+from llm_scripts import MODEL, RESPONSE_FORMAT, build_prompt, parse_llm_response
+from models import CatalogEntrySuggestion
+from resolver_scripts import EXT_TO_KEDRO_DATASET, sniff_dataset_type
+from telemetry_scripts import COMPLETION_TOKENS, LLM_REQUESTS, LLM_RETRIES, PROMPT_TOKENS, count
+
+DEFAULT_BACKEND = "openai"
+DEFAULT_LOCAL_BASE_URL = "http://localhost:8000/v1"
+
+# Backends are referenced by import path and only imported when first
+# requested, so that choosing one never pays for the dependencies of another
+BACKENDS: dict[str, str] = {
+    "openai": "backend_scripts:OpenAIBackend",
+    "openai-compatible": "backend_scripts:OpenAICompatibleBackend",
+    "heuristics": "backend_scripts:HeuristicsBackend",
+    "replay": "backend_scripts:ReplayBackend",
+}
+
+
+def register_backend(name: str, target: str):
+    BACKENDS[name] = target
+
+
+def load_backend_class(name: str) -> type["InferenceBackend"]:
+    try:
+        target = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown inference backend '{name}', expected one of: {', '.join(sorted(BACKENDS))}"
+        ) from None
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def create_backend(name: str = DEFAULT_BACKEND, **options) -> "InferenceBackend":
+    return load_backend_class(name)(**options)
+
+
+def prompt_key(messages: List[dict]) -> str:
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class InferenceBackend:
+    name = "base"
+    # Backends that take ``rejected`` in ``infer_chunk`` are asked again for
+    # the entries their reply left without a valid type
+    supports_reask = False
+    # Answers from a model are learned by the type index, guesses are not
+    from_model = False
+
+    @property
+    def cache_namespace(self) -> str:
+        return self.name
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def infer_chunk(
+        self,
+        chunk: List[CatalogEntrySuggestion],
+        context_md: str | None,
+        data_dir: str,
+        rejected: dict[str, str | None] | None = None,
+    ) -> dict[str, str | None]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(InferenceBackend):
+    name = "openai"
+    supports_reask = True
+    from_model = True
+
+    def __init__(
+        self,
+        model: str = MODEL,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        temperature: float = 0.2,
+        record_path: str | None = None,
+        structured_output: bool = True,
+    ):
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.temperature = temperature
+        self.record_path = record_path
+        # Constrains replies to the known dataset classes, off for servers without it
+        self.structured_output = structured_output
+        self._client = None
+        self._recorded: dict[str, str] = {}
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    async def open(self):
+        from openai import AsyncOpenAI
+
+        self._client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+        if self.record_path and self._recorded:
+            fixture = ReplayBackend.load_fixture(self.record_path)
+            fixture.update(self._recorded)
+            os.makedirs(os.path.dirname(self.record_path) or ".", exist_ok=True)
+            with open(self.record_path, "w") as f:
+                json.dump(fixture, f, indent=2, sort_keys=True)
+            self._recorded = {}
+
+    async def infer_chunk(self, chunk, context_md, data_dir, rejected=None):
+        messages = build_prompt(chunk, context_md=context_md, rejected=rejected)
+        options = {"response_format": RESPONSE_FORMAT} if self.structured_output else {}
+        # The raw response also tells how often the client retried the request
+        raw = await self._client.chat.completions.with_raw_response.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            **options,
+        )
+        response = raw.parse()
+        count(LLM_REQUESTS)
+        count(LLM_RETRIES, raw.retries_taken)
+        if response.usage is not None:
+            count(PROMPT_TOKENS, response.usage.prompt_tokens)
+            count(COMPLETION_TOKENS, response.usage.completion_tokens)
+        content = response.choices[0].message.content
+        if self.record_path:
+            self._recorded[prompt_key(messages)] = content
+        return parse_llm_response(content)
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """Any server speaking the OpenAI chat completions API, e.g. vLLM or Ollama."""
+
+    name = "openai-compatible"
+
+    def __init__(self, model: str | None = None, base_url: str | None = None, api_key: str | None = None, **kwargs):
+        super().__init__(
+            model=model or os.environ.get("AUTOCATALOG_MODEL", "local-model"),
+            base_url=base_url or os.environ.get("AUTOCATALOG_BASE_URL", DEFAULT_LOCAL_BASE_URL),
+            # Local servers usually ignore the key, but the client insists on one
+            api_key=api_key or os.environ.get("AUTOCATALOG_API_KEY", "not-needed"),
+            **kwargs,
+        )
+
+
+class HeuristicsBackend(InferenceBackend):
+    """Offline best guesses from file contents and extensions, never calls a model."""
+
+    name = "heuristics"
+
+    async def infer_chunk(self, chunk, context_md, data_dir, rejected=None):
+        type_map = {}
+        for s in chunk:
+            dataset_type, _ = sniff_dataset_type(os.path.join(data_dir, s.filepath))
+            if dataset_type is None:
+                dataset_type = EXT_TO_KEDRO_DATASET.get(os.path.splitext(s.filepath)[1].lower())
+            type_map[s.suggested_name] = dataset_type
+        return type_map
+
+
+class ReplayBackend(InferenceBackend):
+    """Answers from responses recorded by ``OpenAIBackend(record_path=...)``."""
+
+    name = "replay"
+    supports_reask = True
+    from_model = True
+
+    def __init__(self, fixture_path: str):
+        self.fixture_path = fixture_path
+        self._responses: dict[str, str] = {}
+
+    @staticmethod
+    def load_fixture(fixture_path: str) -> dict[str, str]:
+        if not os.path.exists(fixture_path):
+            return {}
+        with open(fixture_path) as f:
+            return json.load(f)
+
+    async def open(self):
+        self._responses = self.load_fixture(self.fixture_path)
+
+    async def infer_chunk(self, chunk, context_md, data_dir, rejected=None):
+        key = prompt_key(build_prompt(chunk, context_md=context_md, rejected=rejected))
+        try:
+            content = self._responses[key]
+        except KeyError:
+            raise KeyError(f"No recorded response for prompt {key[:12]} in {self.fixture_path}") from None
+        return parse_llm_response(content)
@@ -0,0 +1,152 @@
+"""Times the data_processing nodes with numpy and with Arrow-backed inputs.
+
+Synthetic shuttles, companies and reviews shaped like the raw datasets are
+generated at each size, once as numpy-backed frames and once with pyarrow
+dtypes, as ``dtype_backend: pyarrow`` would load them. Both paths run all
+three nodes and their model input tables are checked to be identical. Peak
+memory covers the nodes only, Python and numpy allocations through
+tracemalloc and Arrow buffers through a pool of their own::
+
+    python -m benchmarks.bench_data_processing --sizes 100000 1000000 10000000
+
+Sizes are numbers of reviews, with one shuttle per review and a company for
+every four shuttles.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.testing import assert_frame_equal
+
+from ai_tool_idea_test.pipelines.data_processing.nodes import (
+    create_model_input_table,
+    preprocess_companies,
+    preprocess_shuttles,
+)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+STAGES = ["preprocess_companies", "preprocess_shuttles", "create_model_input_table"]
+LOCATIONS = ["Niue", "Chile", "Isle of Man", "Rwanda", "Sao Tome and Principe"]
+MISSING = 0.05
+
+
+def _with_missing(rng, values: np.ndarray) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < MISSING] = np.nan
+    return values
+
+
+def make_inputs(reviews: int, seed: int = 0) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    shuttle_count, company_count = reviews, max(1, reviews // 4)
+    company_ids = rng.permutation(company_count) * 7 + 3
+    shuttle_ids = rng.permutation(shuttle_count) * 3 + 1
+    prices = rng.integers(100, 10_000_000, shuttle_count) / 10
+    return {
+        "companies": pd.DataFrame({
+            "id": company_ids,
+            "company_rating": _with_missing(rng, np.char.add(rng.integers(0, 101, company_count).astype(str), "%")),
+            "company_location": _with_missing(rng, rng.choice(LOCATIONS, company_count)),
+            "total_fleet_count": rng.integers(1, 10, company_count).astype(float),
+            "iata_approved": rng.choice(["t", "f"], company_count).astype(object),
+        }),
+        "shuttles": pd.DataFrame({
+            "id": shuttle_ids,
+            "shuttle_type": rng.choice(["Type V5", "Type F5", "Type V2"], shuttle_count).astype(object),
+            "engines": pd.array(_with_missing(rng, rng.integers(1, 4, shuttle_count)), dtype=float).to_numpy(),
+            "passenger_capacity": rng.integers(1, 16, shuttle_count),
+            "d_check_complete": rng.choice(["t", "f"], shuttle_count).astype(object),
+            "moon_clearance_complete": rng.choice(["t", "f"], shuttle_count).astype(object),
+            "price": _with_missing(rng, np.array([f"${p:,.1f}" for p in prices], dtype=object)),
+            "company_id": rng.choice(company_ids, shuttle_count),
+        }),
+        "reviews": pd.DataFrame({
+            "shuttle_id": rng.choice(shuttle_ids, reviews),
+            "review_scores_rating": np.where(rng.random(reviews) < MISSING, np.nan, rng.integers(20, 101, reviews)),
+            "number_of_reviews": rng.integers(0, 500, reviews),
+        }),
+    }
+
+
+def to_arrow_backed(df: pd.DataFrame) -> pd.DataFrame:
+    # What ``dtype_backend: pyarrow`` loads, without the file in between
+    return pa.Table.from_pandas(df, preserve_index=False).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def copy_inputs(inputs: dict[str, pd.DataFrame]) -> tuple[pd.DataFrame, ...]:
+    # The nodes update their inputs in place, so every run gets its own
+    return tuple(inputs[name].copy() for name in ("companies", "shuttles", "reviews"))
+
+
+def run_nodes(companies: pd.DataFrame, shuttles: pd.DataFrame, reviews: pd.DataFrame) -> tuple[dict[str, float], pd.DataFrame]:
+    timings = {}
+    gc.collect()
+    start = time.perf_counter()
+    companies = preprocess_companies(companies)
+    timings["preprocess_companies"] = time.perf_counter() - start
+    start = time.perf_counter()
+    shuttles = preprocess_shuttles(shuttles)
+    timings["preprocess_shuttles"] = time.perf_counter() - start
+    start = time.perf_counter()
+    model_input_table = create_model_input_table(shuttles, companies, reviews)
+    timings["create_model_input_table"] = time.perf_counter() - start
+    return timings, model_input_table
+
+
+def peak_memory(inputs: dict[str, pd.DataFrame]) -> int:
+    # A separate run, tracing would slow the timed ones down
+    companies, shuttles, reviews = copy_inputs(inputs)
+    default_pool = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(default_pool)
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    try:
+        run_nodes(companies, shuttles, reviews)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(default_pool)
+    return peak + pool.max_memory()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs per size.")
+    args = parser.parse_args()
+
+    print(f"{'reviews':>10}  {'stage':<26}{'numpy':>10}{'arrow':>10}{'speedup':>9}")
+    memory = []
+    for size in args.sizes:
+        numpy_inputs = make_inputs(size)
+        arrow_inputs = {name: to_arrow_backed(df) for name, df in numpy_inputs.items()}
+
+        results = {}
+        for label, inputs in (("numpy", numpy_inputs), ("arrow", arrow_inputs)):
+            runs = [run_nodes(*copy_inputs(inputs)) for _ in range(args.repeat)]
+            timings = {stage: min(run[0][stage] for run in runs) for stage in STAGES}
+            results[label] = timings, runs[-1][1], peak_memory(inputs)
+
+        assert_frame_equal(results["numpy"][1], results["arrow"][1], check_exact=True)
+        for stage in [*STAGES, "total"]:
+            numpy_seconds, arrow_seconds = (
+                sum(results[label][0].values()) if stage == "total" else results[label][0][stage]
+                for label in ("numpy", "arrow")
+            )
+            print(
+                f"{size:>10}  {stage:<26}{numpy_seconds:>10.3f}{arrow_seconds:>10.3f}"
+                f"{numpy_seconds / arrow_seconds:>8.1f}x"
+            )
+        memory.append((size, results["numpy"][2], results["arrow"][2]))
+
+    print(f"\n{'reviews':>10}  {'peak MiB':<26}{'numpy':>10}{'arrow':>10}{'saved':>9}")
+    for size, numpy_peak, arrow_peak in memory:
+        print(f"{size:>10}  {'':<26}{numpy_peak / 2**20:>10.1f}{arrow_peak / 2**20:>10.1f}{1 - arrow_peak / numpy_peak:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
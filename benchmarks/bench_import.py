@@ -0,0 +1,73 @@
+"""Measures the cold import cost of the autocatalog modules with ``-X importtime``.
+
+Run from the project root::
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --module main --budget-ms 400
+
+Exits non-zero when the import exceeds ``--budget-ms`` or pulls in any of the
+``--forbid`` packages, so it can guard the cold start in CI.
+"""
+import argparse
+import subprocess
+import sys
+
+
+def import_times(module: str) -> tuple[dict[str, int], dict[str, int]]:
+    # -X importtime writes "import time: self [us] | cumulative | imported package",
+    # with the package name indented by two spaces per nesting level
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative, children, direct = {}, {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        cumulative[name] = int(total)
+        # A module is reported after everything it imported
+        if depth == 1:
+            children[name] = int(total)
+        elif depth == 0:
+            if name == module:
+                direct = children
+            children = {}
+    return cumulative, direct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="tool_scripts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", nargs="*", default=["openai", "httpx"])
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    best = min(cumulative[args.module] for cumulative, _ in runs) / 1000
+    # Direct imports of the module only, nested ones are counted in their parent
+    cumulative, direct = runs[0]
+
+    print(f"import {args.module}: {best:.1f} ms (best of {args.repeat})")
+    for name, total in sorted(direct.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {total / 1000:>8.1f} ms  {name}")
+
+    failures = []
+    forbidden = sorted({name.split(".")[0] for name in cumulative} & set(args.forbid))
+    if forbidden:
+        failures.append(f"imports {', '.join(forbidden)}")
+    if args.budget_ms is not None and best > args.budget_ms:
+        failures.append(f"exceeds the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        sys.exit(f"import {args.module} {' and '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
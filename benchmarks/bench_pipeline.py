@@ -0,0 +1,175 @@
+"""Times each stage of ``update_auto_catalog`` on synthetic data trees.
+
+Every size gets a fresh tree from ``benchmarks.synthetic``, and the model is
+the offline stub from ``tests/fake_openai_server.py`` with a configurable
+latency. Results are compared to a stored baseline, and the run exits non-zero
+when a stage got slower than ``--tolerance`` allows. Run from the project root::
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --sizes 1000 1000000 --latency 0.2
+    python -m benchmarks.bench_pipeline --save-baseline
+
+Only ``--infer-limit`` datasets are sent to the stub per size, the others are
+typed from their extension so the later stages see a full catalog.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from backend_scripts import create_backend
+from benchmarks.synthetic import DEFAULT_EXTENSION_MIX, make_data_tree, parse_extension_mix
+from llm_scripts import DEFAULT_MAX_CONCURRENCY, infer_dataset_types
+from tests.fake_openai_server import EXT_TO_TYPE, FakeOpenAIServer
+from tool_scripts import (
+    analyze_observed_project,
+    observe_project,
+    scan_data_folder,
+    to_catalog_entries,
+    write_catalog_to_yaml,
+)
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+STAGES = [
+    "scan_data_folder",
+    "observe_project",
+    "analyze_observed_project",
+    "infer_dataset_types",
+    "to_catalog_entries",
+    "write_catalog_to_yaml",
+]
+# Slowdowns below this are filesystem and timer noise on the small trees
+DEFAULT_NOISE_FLOOR_SECONDS = 0.025
+
+
+def run_stages(data_dir: str, output_path: str, backend, args) -> dict[str, float]:
+    timings = {}
+
+    def timed(stage, fn):
+        # Stages print per dataset, which would dominate the larger trees
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            result = fn()
+            timings[stage] = time.perf_counter() - start
+        return result
+
+    files = timed("scan_data_folder", lambda: scan_data_folder(data_dir, jobs=args.jobs))
+    observed = timed("observe_project", lambda: observe_project(files))
+    suggestions = timed("analyze_observed_project", lambda: analyze_observed_project(observed))
+
+    sample = suggestions if args.infer_limit <= 0 else suggestions[:args.infer_limit]
+    timed("infer_dataset_types", lambda: infer_dataset_types(
+        sample,
+        verbose=False,
+        data_dir=data_dir,
+        max_concurrency=args.max_concurrency,
+        backend=backend,
+        node_index_path=None,
+    ))
+    for s in suggestions[len(sample):]:
+        s.suggested_type = EXT_TO_TYPE.get(os.path.splitext(s.filepath)[1])
+
+    entries = timed("to_catalog_entries", lambda: to_catalog_entries(suggestions))
+    timed("write_catalog_to_yaml", lambda: write_catalog_to_yaml(entries, output_path))
+    return timings
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, tolerance: float, noise_floor: float) -> list[str]:
+    regressions = []
+    print(f"{'files':>9}  {'stage':<26}{'seconds':>10}{'baseline':>10}{'change':>9}")
+    for size, timings in results.items():
+        for stage in STAGES:
+            seconds = timings[stage]
+            before = baseline.get("results", {}).get(size, {}).get(stage)
+            if before is None:
+                print(f"{size:>9}  {stage:<26}{seconds:>10.3f}{'-':>10}{'-':>9}")
+                continue
+            change = (seconds - before) / before if before else 0.0
+            flag = ""
+            if change > tolerance and seconds - before > noise_floor:
+                flag = "  REGRESSION"
+                regressions.append(f"{stage} at {size} files: {before:.3f}s -> {seconds:.3f}s")
+            print(f"{size:>9}  {stage:<26}{seconds:>10.3f}{before:>10.3f}{change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument(
+        "--extensions",
+        type=parse_extension_mix,
+        default=DEFAULT_EXTENSION_MIX,
+        help="Weighted extension mix, e.g. csv=4,parquet=3,json=1.",
+    )
+    parser.add_argument("--versioned", type=int, default=20, help="Number of versioned datasets.")
+    parser.add_argument("--versions", type=int, default=5, help="Saves per versioned dataset.")
+    parser.add_argument("--noise", type=float, default=0.05, help="Share of .DS_Store and checkpoint files.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stub takes per request.")
+    parser.add_argument("--infer-limit", type=int, default=2_000, help="Datasets sent to the stub, 0 for all.")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs per size.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before flagging.")
+    parser.add_argument("--noise-floor", type=float, default=DEFAULT_NOISE_FLOOR_SECONDS, help="Seconds a stage may always lose.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    args = parser.parse_args()
+
+    results = {}
+    with FakeOpenAIServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        backend = create_backend("openai", base_url=server.base_url, api_key="benchmark")
+
+        # Imports, the node index and the client pool are paid for once, untimed
+        make_data_tree(os.path.join(tmp, "warmup", "data"), 100)
+        run_stages(os.path.join(tmp, "warmup", "data"), os.path.join(tmp, "warmup", "auto_catalog.yml"), backend, args)
+
+        for size in args.sizes:
+            data_dir = os.path.join(tmp, str(size), "data")
+            counts = make_data_tree(
+                data_dir,
+                size,
+                depth=args.depth,
+                files_per_dir=args.files_per_dir,
+                extension_mix=args.extensions,
+                versioned=args.versioned,
+                versions=args.versions,
+                noise=args.noise,
+            )
+            print(f"Generated {size} files: " + ", ".join(f"{n} {kind}" for kind, n in counts.items()), file=sys.stderr)
+
+            output_path = os.path.join(tmp, str(size), "auto_catalog.yml")
+            runs = [run_stages(data_dir, output_path, backend, args) for _ in range(args.repeat)]
+            results[str(size)] = {stage: min(run[stage] for run in runs) for stage in STAGES}
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance, args.noise_floor)
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.setdefault("results", {}).update(results)
+        baseline["machine"] = f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print("\nRegressions against the baseline:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compares the per-file models against the columnar scan table for planning.
+
+Both sides start from the same in-memory directory listing, so only the
+non-LLM stages are measured: building the scan results, then observing and
+planning the catalog. Python allocations are traced with tracemalloc, Arrow
+buffers are read from its memory pool. Run the models first, as the pool only
+reports its high-water mark::
+
+    python -m benchmarks.bench_plan --files 1000000
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+import pyarrow as pa
+
+from models import ScannedDataFile
+from table_scripts import ScanTableBuilder, plan_catalog
+from tool_scripts import EXT_TO_KEDRO_DATASET, analyze_observed_project, observe_project
+
+EXTENSIONS = [".csv", ".parquet", ".json", ".pickle", ".xlsx", ".txt"]
+VERSIONS = ["2025-01-01T10.00.00.000Z"]
+
+
+def make_listing(files: int, files_per_dir: int) -> list[tuple[str, list[str], dict]]:
+    listing = []
+    for d in range(files // files_per_dir):
+        if d % 50 == 0:
+            # Every 50th directory is the latest version of a versioned dataset
+            name = f"model_{d}.pickle"
+            versions = {"version": VERSIONS[0], "version_count": 10, "versioned_bytes": 1_000}
+            listing.append((os.path.join("06_models", name, VERSIONS[0]), [name], versions))
+            continue
+        rel_dir = os.path.join(f"layer_{d % 8}", f"dir_{d}")
+        names = [f"file_{f}{EXTENSIONS[f % len(EXTENSIONS)]}" for f in range(files_per_dir)]
+        listing.append((rel_dir, names, {}))
+    return listing
+
+
+def with_models(data_dir: str, listing) -> int:
+    files = []
+    for rel_dir, names, versions in listing:
+        for name in names:
+            rel_path = os.path.join(rel_dir, name)
+            files.append(ScannedDataFile(
+                full_path=os.path.join(data_dir, rel_path),
+                rel_path=rel_path,
+                dataset_type=EXT_TO_KEDRO_DATASET.get(os.path.splitext(name)[1].lower()),
+                **versions,
+            ))
+    return len(analyze_observed_project(observe_project(files)))
+
+
+def with_table(data_dir: str, listing) -> int:
+    builder = ScanTableBuilder(data_dir)
+    for rel_dir, names, versions in listing:
+        builder.add_directory(rel_dir, names, versions=versions)
+    return plan_catalog(builder.finish()).num_rows
+
+
+def measure(fn) -> tuple[float, int, int]:
+    # Memory first, as the Arrow pool only reports its high-water mark
+    gc.collect()
+    pool = pa.default_memory_pool()
+    arrow_before = pool.max_memory()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Arrow buffers live outside tracemalloc
+    peak += max(0, pool.max_memory() - arrow_before)
+
+    # Timed without tracing, which would slow the per-file models down unfairly
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    args = parser.parse_args()
+
+    listing = make_listing(args.files, args.files_per_dir)
+    total = sum(len(names) for _, names, _ in listing)
+    print(f"{total} files in {len(listing)} directories")
+    print(f"{'stages':<10}{'seconds':>10}{'peak MiB':>10}{'datasets':>10}{'cpu':>8}{'memory':>8}")
+
+    baseline = None
+    for label, fn in (("models", with_models), ("table", with_table)):
+        elapsed, peak, datasets = measure(lambda: fn("data", listing))
+        baseline = baseline or (elapsed, peak)
+        print(
+            f"{label:<10}{elapsed:>10.2f}{peak / 2**20:>10.1f}{datasets:>10}"
+            f"{baseline[0] / elapsed:>7.1f}x{baseline[1] / peak:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
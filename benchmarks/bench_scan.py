@@ -0,0 +1,101 @@
+"""Compares ``scan_data_folder`` against the original ``os.walk`` based walker.
+
+Incremental runs against a manifest of the same, unchanged tree are timed
+too, as ``update_auto_catalog`` takes them and with ``verify_files``. Run from the project root, either on
+a synthetic tree or an existing folder::
+
+    python -m benchmarks.bench_scan --dirs 200 --files-per-dir 100 --jobs 1 4 16
+    python -m benchmarks.bench_scan --path /mnt/nfs/data --jobs 1 8 32
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from models import ScannedDataFile
+from tool_scripts import EXT_TO_KEDRO_DATASET, diff_data_folder, manifest_table, scan_data_folder
+
+EXTENSIONS = [".csv", ".parquet", ".json", ".pickle", ".xlsx", ".txt"]
+
+
+def os_walk_scan(data_dir: str) -> list[ScannedDataFile]:
+    entries = []
+    for root, _, files in os.walk(data_dir):
+        for file in files:
+            full_path = os.path.join(root, file)
+            rel_path = os.path.relpath(full_path, data_dir)
+            ext = Path(file).suffix.lower()
+            entries.append(ScannedDataFile(
+                full_path=full_path,
+                rel_path=rel_path,
+                dataset_type=EXT_TO_KEDRO_DATASET.get(ext),
+            ))
+    return entries
+
+
+def make_tree(root: str, dirs: int, files_per_dir: int, fanout: int = 8):
+    for d in range(dirs):
+        parts = []
+        n = d
+        while True:
+            parts.append(f"dir_{n % fanout}")
+            n //= fanout
+            if n == 0:
+                break
+        directory = os.path.join(root, *parts, f"leaf_{d}")
+        os.makedirs(directory, exist_ok=True)
+        for f in range(files_per_dir):
+            ext = EXTENSIONS[f % len(EXTENSIONS)]
+            open(os.path.join(directory, f"file_{f}{ext}"), "w").close()
+
+
+def best_of(fn, repeat: int) -> tuple[float, list]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", help="Existing folder to scan instead of a synthetic tree.")
+    parser.add_argument("--dirs", type=int, default=200)
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.path
+        if data_dir is None:
+            data_dir = os.path.join(tmp, "data")
+            make_tree(data_dir, args.dirs, args.files_per_dir)
+
+        baseline, expected = best_of(lambda: os_walk_scan(data_dir), args.repeat)
+        expected_paths = sorted(e.rel_path for e in expected)
+        print(f"{len(expected)} files in {data_dir}")
+        print(f"{'walker':<20}{'seconds':>10}{'speedup':>10}")
+        print(f"{'os.walk':<20}{baseline:>10.3f}{1.0:>10.2f}")
+
+        for jobs in args.jobs:
+            elapsed, result = best_of(lambda: scan_data_folder(data_dir, jobs=jobs), args.repeat)
+            assert sorted(e.rel_path for e in result) == expected_paths
+            print(f"{f'scandir jobs={jobs}':<20}{elapsed:>10.3f}{baseline / elapsed:>10.2f}")
+
+        jobs = max(args.jobs)
+        *_, manifest = diff_data_folder(data_dir, {}, jobs=jobs)
+
+        def incremental(verify_files: bool) -> tuple[list, int]:
+            added, modified, _, new_manifest = diff_data_folder(data_dir, manifest, jobs=jobs, verify_files=verify_files)
+            return added + modified, len(manifest_table(data_dir, new_manifest))
+
+        for label, verify_files in (("incremental", False), ("verify files", True)):
+            elapsed, (changed, files) = best_of(lambda: incremental(verify_files), args.repeat)
+            assert changed == [] and files == len(expected)
+            print(f"{f'{label} jobs={jobs}':<20}{elapsed:>10.3f}{baseline / elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Times KedroSession creation up to a built catalog with many generated entries.
+
+Copies the project configuration into a temporary project, generates the
+entries and compares three ways of loading them::
+
+    omegaconf   entries in conf/base/catalog_generated.yml, parsed by OmegaConf
+    yaml        auto_catalog.yml parsed with libyaml, no snapshot
+    snapshot    auto_catalog.yml served from its precompiled snapshot
+
+Run from the project root::
+
+    python -m benchmarks.bench_session --entries 10000 --repeat 5
+
+Without OMEGACONF_MAX_YAML_EXPANDED_NODES raised, OmegaConf cannot load a
+catalog file this large at all.
+"""
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from kedro.config import OmegaConfigLoader
+from kedro.framework.project import settings
+from kedro.framework.session import KedroSession
+from kedro.framework.startup import bootstrap_project
+
+from ai_tool_idea_test.catalog_snapshot import snapshot_path_for
+from ai_tool_idea_test.config_loader import AUTO_CATALOG_FILE, AutoCatalogConfigLoader
+from tool_scripts import write_catalog_to_yaml
+
+DATASET_TYPES = [
+    ("pandas.CSVDataset", ".csv"),
+    ("pandas.ParquetDataset", ".parquet"),
+    ("pickle.PickleDataset", ".pickle"),
+    ("pandas.ExcelDataset", ".xlsx"),
+]
+
+
+def generated_catalog(entries: int) -> dict:
+    catalog = {}
+    for i in range(entries):
+        dataset_type, ext = DATASET_TYPES[i % len(DATASET_TYPES)]
+        catalog[f"generated_{i}"] = {"type": dataset_type, "filepath": f"data/02_intermediate/generated_{i}{ext}"}
+        if i % 10 == 0:
+            catalog[f"generated_{i}"]["versioned"] = True
+    return catalog
+
+
+def make_project(root: Path):
+    shutil.copy("pyproject.toml", root / "pyproject.toml")
+    shutil.copytree("conf", root / "conf")
+    # The package itself is imported from the installed project
+    (root / "src").mkdir()
+    for name in ("auto_catalog.yml", f".{AUTO_CATALOG_FILE}.snapshot"):
+        (root / "conf" / "base" / name).unlink(missing_ok=True)
+
+
+def time_session(project_path: Path, repeat: int) -> tuple[list[float], int]:
+    timings, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with KedroSession.create(project_path=project_path) as session:
+            size = len(list(session.load_context().catalog))
+        timings.append(time.perf_counter() - start)
+    return timings, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    # OmegaConf refuses YAML this large by default, the baseline needs it lifted
+    os.environ.setdefault("OMEGACONF_MAX_YAML_EXPANDED_NODES", "none")
+    catalog = generated_catalog(args.entries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp)
+        make_project(project_path)
+        bootstrap_project(project_path)
+        base = project_path / settings.CONF_SOURCE / "base"
+        auto_catalog = base / AUTO_CATALOG_FILE
+
+        def omegaconf():
+            settings.CONFIG_LOADER_CLASS = OmegaConfigLoader
+            write_catalog_to_yaml(catalog, str(base / "catalog_generated.yml"))
+            os.remove(snapshot_path_for(base / "catalog_generated.yml"))
+
+        def libyaml():
+            os.remove(base / "catalog_generated.yml")
+            settings.CONFIG_LOADER_CLASS = AutoCatalogConfigLoader
+            write_catalog_to_yaml(catalog, str(auto_catalog))
+            os.remove(snapshot_path_for(auto_catalog))
+
+        def snapshot():
+            write_catalog_to_yaml(catalog, str(auto_catalog))
+
+        print(f"{args.entries} generated entries, best and median of {args.repeat}")
+        print(f"{'loader':<12}{'datasets':>10}{'best':>10}{'median':>10}{'speedup':>10}")
+        baseline = None
+        for label, setup in (("omegaconf", omegaconf), ("yaml", libyaml), ("snapshot", snapshot)):
+            setup()
+            timings, size = time_session(project_path, args.repeat)
+            best = min(timings)
+            baseline = baseline or best
+            print(
+                f"{label:<12}{size:>10}{best:>10.3f}{statistics.median(timings):>10.3f}"
+                f"{baseline / best:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Synthetic Kedro data trees for the benchmarks.
+
+The tree spreads regular files over the Kedro layers at the requested depth,
+adds versioned datasets with several timestamped saves each, and sprinkles
+the noise real projects collect (``.DS_Store`` files, ``.ipynb_checkpoints``
+directories). Files are empty, only the layout matters to the stages timed.
+"""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+KEDRO_LAYERS = [
+    "01_raw", "02_intermediate", "03_primary", "04_feature",
+    "05_model_input", "06_models", "07_model_output", "08_reporting",
+]
+
+DEFAULT_EXTENSION_MIX = {".csv": 4, ".parquet": 3, ".json": 1, ".xlsx": 1, ".pickle": 1, ".txt": 1}
+
+
+def parse_extension_mix(spec: str) -> dict[str, int]:
+    # "csv=4,parquet=3,json=1" -> {".csv": 4, ".parquet": 3, ".json": 1}
+    mix = {}
+    for part in spec.split(","):
+        ext, _, weight = part.partition("=")
+        mix[f".{ext.strip().lstrip('.')}"] = int(weight or 1)
+    return mix
+
+
+def version_names(count: int) -> list[str]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H.%M.%S.000Z")
+        for i in range(count)
+    ]
+
+
+def _touch(path: str):
+    open(path, "w").close()
+
+
+def make_data_tree(
+    root: str,
+    files: int,
+    depth: int = 3,
+    files_per_dir: int = 100,
+    extension_mix: dict[str, int] | None = None,
+    versioned: int = 0,
+    versions: int = 5,
+    noise: float = 0.05,
+    seed: int = 0,
+) -> dict[str, int]:
+    # Returns how many files of each kind were written, together ``files``
+    rng = random.Random(seed)
+    mix = extension_mix or DEFAULT_EXTENSION_MIX
+    extensions, weights = list(mix), list(mix.values())
+
+    versioned_files = min(files, versioned * versions)
+    noise_files = int((files - versioned_files) * noise)
+    regular_files = files - versioned_files - noise_files
+
+    for v, version in ((v, version) for v in range(versioned) for version in version_names(versions)):
+        name = f"model_{v}.pickle"
+        directory = os.path.join(root, "06_models", name, version)
+        os.makedirs(directory, exist_ok=True)
+        _touch(os.path.join(directory, name))
+
+    directories = []
+    for d in range(max(1, -(-regular_files // files_per_dir))):
+        parts = [KEDRO_LAYERS[d % len(KEDRO_LAYERS)]]
+        n = d // len(KEDRO_LAYERS)
+        for level in range(depth - 1):
+            parts.append(f"group_{level}_{n % 10}")
+            n //= 10
+        parts.append(f"batch_{d}")
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        directories.append(directory)
+
+    for i in range(regular_files):
+        ext = rng.choices(extensions, weights)[0]
+        _touch(os.path.join(directories[i // files_per_dir], f"table_{i}{ext}"))
+
+    # One .DS_Store per directory first, then notebook checkpoints
+    for i in range(noise_files):
+        directory = directories[i % len(directories)]
+        if i < len(directories):
+            _touch(os.path.join(directory, ".DS_Store"))
+        else:
+            checkpoints = os.path.join(directory, ".ipynb_checkpoints")
+            os.makedirs(checkpoints, exist_ok=True)
+            _touch(os.path.join(checkpoints, f"analysis_{i}-checkpoint.ipynb"))
+
+    return {"regular": regular_files, "versioned": versioned_files, "noise": noise_files}
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+import time
+from typing import Iterable
+
+from remote_scripts import is_remote, remote_fingerprint
+
+DEFAULT_INFERENCE_CACHE_PATH = ".autocatalog/inference_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 50_000
+HEADER_BYTES = 4096
+
+# sqlite caps the number of host parameters in a single statement
+_SQL_BATCH = 500
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def fingerprint_file(path: str) -> list | None:
+    if is_remote(path):
+        return remote_fingerprint(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    if stat.S_ISDIR(st.st_mode):
+        # Versioned datasets are directories of timestamped saves, a new version
+        # does not change what kind of dataset it is
+        return [path, "dir"]
+
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+    except OSError:
+        return None
+
+    return [path, st.st_size, st.st_mtime_ns, hashlib.sha256(header).hexdigest()]
+
+
+class InferenceCache:
+    """Persistent, size-bounded LRU cache of dataset type verdicts.
+
+    Keys are content addresses built with ``make_key``, so a verdict is only
+    reused while the file and the source code context it was inferred from
+    are unchanged.
+    """
+
+    def __init__(self, path: str = DEFAULT_INFERENCE_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, dataset_type TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hash_text(json.dumps(parts, sort_keys=True, default=str))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        keys = list(dict.fromkeys(keys))
+        hits = {}
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i : i + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, dataset_type FROM verdicts WHERE key IN ({placeholders})",
+                batch,
+            )
+            hits.update(rows)
+
+        if hits:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE verdicts SET last_used = ? WHERE key = ?",
+                [(now, key) for key in hits],
+            )
+            self._conn.commit()
+        return hits
+
+    def put_many(self, verdicts: dict[str, str]):
+        if not verdicts:
+            return
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO verdicts (key, dataset_type, last_used) VALUES (?, ?, ?)",
+            [(key, dataset_type, now) for key, dataset_type in verdicts.items()],
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM verdicts WHERE key IN "
+                "(SELECT key FROM verdicts ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self) -> "InferenceCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
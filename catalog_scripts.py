@@ -0,0 +1,186 @@
+import logging
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+from models import CatalogEntrySuggestion
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}:]*)(?::[^{}]*)?\}")
+
+
+def load_project_catalog_config(project_path: str = ".", envs: List[str] | None = None) -> dict[str, dict]:
+    # Reads the catalog the way `kedro run` would, through the project's own
+    # config loader, once per environment found under the conf source. Kedro
+    # is only imported when asked for.
+    try:
+        from kedro.framework.project import settings
+        from kedro.framework.startup import bootstrap_project
+
+        project_path = Path(project_path).resolve()
+        bootstrap_project(project_path)
+
+        conf_source = project_path / settings.CONF_SOURCE
+        loader_args = dict(settings.CONFIG_LOADER_ARGS)
+        base_env = loader_args.get("base_env", "base")
+        if envs is None:
+            envs = sorted(
+                d.name for d in conf_source.iterdir() if d.is_dir() and d.name != base_env
+            ) or [base_env]
+
+        config = {}
+        for env in envs:
+            loader = settings.CONFIG_LOADER_CLASS(conf_source=str(conf_source), env=env, **loader_args)
+            config.update(loader["catalog"])
+        return config
+    except Exception as e:
+        logger.warning("Could not load the project catalog: %s", e)
+        return {}
+
+
+def _normalise_path(path: str) -> str:
+    return os.path.abspath(path).replace(os.sep, "/")
+
+
+def _pattern_sort_key(pattern: str) -> tuple:
+    # Same precedence as Kedro's dataset factories: most characters outside
+    # placeholders first, then fewest placeholders, then alphabetical
+    specificity = len(PLACEHOLDER_PATTERN.sub("", pattern))
+    return -specificity, pattern.count("{"), pattern
+
+
+def _compile_filepath_template(template: str, named: bool) -> str:
+    parts = []
+    seen = set()
+    last = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        parts.append(re.escape(template[last:match.start()]))
+        name = match.group(1)
+        if not named or not name.isidentifier():
+            parts.append("(?:.+?)")
+        elif name in seen:
+            # A placeholder repeated in one template must capture the same text
+            parts.append(f"(?P={name})")
+        else:
+            parts.append(f"(?P<{name}>.+?)")
+            seen.add(name)
+        last = match.end()
+    parts.append(re.escape(template[last:]))
+    return "".join(parts)
+
+
+class CatalogIndex:
+    """Filepaths already covered by a project's catalog.
+
+    Explicit entries are looked up by resolved filepath. Dataset factory
+    patterns are compiled into one alternation in Kedro's precedence order, so
+    a path is tested against all of them with a single regex match.
+    """
+
+    def __init__(self, catalog_config: dict[str, dict]):
+        self.names = {name.lower() for name in catalog_config if not name.startswith("_")}
+        self.filepaths: dict[str, str] = {}
+        self.entries: dict[str, dict] = {}
+        self.patterns: list[tuple[str, re.Pattern]] = []
+
+        factories = []
+        for name, entry in catalog_config.items():
+            # Keys starting with an underscore hold YAML anchors, not datasets
+            if name.startswith("_") or not isinstance(entry, dict):
+                continue
+            filepath = entry.get("filepath") or entry.get("path")
+            if not isinstance(filepath, str):
+                continue
+            if "{" in name:
+                factories.append((name, filepath))
+            else:
+                self.filepaths[_normalise_path(filepath)] = name
+                self.entries[name] = entry
+
+        factories.sort(key=lambda factory: _pattern_sort_key(factory[0]))
+        alternatives = []
+        for name, filepath in factories:
+            template = _normalise_path(filepath)
+            self.patterns.append((name, re.compile(_compile_filepath_template(template, named=True))))
+            alternatives.append(f"({_compile_filepath_template(template, named=False)})")
+        self.pattern = "|".join(alternatives) or None
+        self._matcher = re.compile(self.pattern) if self.pattern else None
+
+    def __len__(self) -> int:
+        return len(self.filepaths) + len(self.patterns)
+
+    def match(self, path: str) -> str | None:
+        # Returns the dataset that already covers ``path``, if any
+        path = _normalise_path(path)
+        name = self.filepaths.get(path)
+        if name is not None or self._matcher is None:
+            return name
+
+        match = self._matcher.fullmatch(path)
+        if match is None:
+            return None
+        # Only the outer group of the winning alternative takes part in the
+        # match. The alternation cannot check repeated placeholders, so the
+        # remaining patterns are tried one by one if the winner rejects them.
+        for pattern, compiled in self.patterns[match.lastindex - 1:]:
+            fields = compiled.fullmatch(path)
+            if fields is not None:
+                try:
+                    return pattern.format(**fields.groupdict())
+                except (KeyError, IndexError, ValueError):
+                    return pattern
+        return None
+
+
+def build_catalog_index(project_path: str = ".", exclude: dict[str, dict] | None = None) -> CatalogIndex:
+    # ``exclude`` holds entries this tool wrote itself, which must not count as
+    # catalogued by the user should the config patterns pick them up
+    config = load_project_catalog_config(project_path)
+    exclude = exclude or {}
+    return CatalogIndex({name: entry for name, entry in config.items() if exclude.get(name) != entry})
+
+
+def drop_catalogued(
+    suggestions: List[CatalogEntrySuggestion], index: CatalogIndex, data_dir: str = "data"
+) -> List[CatalogEntrySuggestion]:
+    uncatalogued = []
+    for s in suggestions:
+        if index.match(os.path.join(data_dir, s.filepath)) is None:
+            uncatalogued.append(s)
+    return uncatalogued
+
+
+def drop_catalogued_table(plan: "pa.Table", index: CatalogIndex, data_dir: str = "data") -> "pa.Table":
+    # Columnar drop_catalogued: explicit filepaths are looked up in bulk and
+    # the factory alternation runs over the whole column at once
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not len(index) or not plan.num_rows:
+        return plan
+
+    filepaths = plan.column("filepath")
+    if os.sep != "/":
+        filepaths = pc.replace_substring(filepaths, os.sep, "/")
+    paths = pc.binary_join_element_wise(_normalise_path(data_dir) + "/", filepaths, "")
+
+    covered = pc.is_in(paths, value_set=pa.array(list(index.filepaths), pa.string()))
+    if index.pattern is not None:
+        try:
+            candidates = pc.match_substring_regex(paths, f"^(?:{index.pattern})$")
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Escapes libre2 does not accept, every row is checked in Python instead
+            candidates = pa.array([True] * len(paths))
+        # Confirmed in Python, since the alternation cannot check repeated placeholders
+        candidates = pc.and_(candidates, pc.invert(covered)).to_numpy(zero_copy_only=False)
+        covered = covered.to_numpy(zero_copy_only=False).copy()
+        for i in candidates.nonzero()[0]:
+            covered[i] = index.match(paths[int(i)].as_py()) is not None
+
+    return plan.filter(pc.invert(pa.array(covered)))
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import re
+from typing import Iterable, List
+
+from remote_scripts import is_remote, read_remote_file
+from telemetry_scripts import count
+
+ENTRIES_IGNORED = "scan.ignored"
+
+# Read from the top of the data folder, patterns are relative to it
+IGNORE_FILENAME = ".autocatalogignore"
+
+# Editor, notebook and engine leftovers that are never datasets. A project
+# can take any of them back with a ``!`` rule.
+DEFAULT_IGNORE_PATTERNS = (
+    ".ipynb_checkpoints/",
+    "__pycache__/",
+    ".git/",
+    ".DS_Store",
+    "._*",
+    "Thumbs.db",
+    "desktop.ini",
+    ".~lock.*#",
+    "*.swp",
+    "*~",
+    "*.tmp",
+    "*.partial",
+    # Spark and Hadoop output markers and staging directories
+    "_SUCCESS",
+    "_started_*",
+    "_committed_*",
+    ".*.crc",
+    "_temporary/",
+    ".spark-staging-*/",
+)
+
+
+def _translate(pattern: str) -> str:
+    # Regular expression for one gitignore pattern, without the ``!`` and
+    # the trailing ``/``. Patterns with a slash are anchored to the data
+    # folder, the rest match at any depth.
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == len(pattern) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append(".*")
+            i += 2
+        elif pattern.startswith("**", i):
+            # Anywhere else two asterisks are just one
+            parts.append("[^/]*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ("" if anchored else "(?:.*/)?") + "".join(parts)
+
+
+def _compile(rules: List[tuple[str, bool]]) -> tuple[re.Pattern | None, List[bool]]:
+    # Alternatives are tried in order, so with the rules reversed the first
+    # one to match is the last in the file, which is the one that decides
+    if not rules:
+        return None, []
+    rules = rules[::-1]
+    regex = re.compile("^(?:" + "|".join(f"({body})" for body, _ in rules) + ")$")
+    return regex, [negated for _, negated in rules]
+
+
+class IgnoreRules:
+    """Paths to leave out of the scan, with the semantics of a ``.gitignore``.
+
+    All patterns are compiled into one regular expression for files and one
+    for directories, so a path costs a single match however many rules there
+    are. Ignored directories are never listed, so nothing below them can be
+    taken back, just like in git.
+    """
+
+    def __init__(self, patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS):
+        self.patterns = []
+        file_rules, dir_rules = [], []
+        for line in patterns:
+            line = line.rstrip("\n")
+            # Trailing spaces are dropped unless escaped
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            self.patterns.append(line)
+            negated = line.startswith("!")
+            pattern = line[1:] if negated else line
+            if pattern.startswith(("\\#", "\\!")):
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            body = _translate(pattern.rstrip("/"))
+            dir_rules.append((body, negated))
+            if not dir_only:
+                file_rules.append((body, negated))
+        self._files, self._file_negated = _compile(file_rules)
+        self._dirs, self._dir_negated = _compile(dir_rules)
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256("\n".join(self.patterns).encode("utf-8")).hexdigest()
+
+    def ignores(self, rel_path: str, is_dir: bool = False) -> bool:
+        regex, negated = (self._dirs, self._dir_negated) if is_dir else (self._files, self._file_negated)
+        if regex is None:
+            return False
+        match = regex.match(rel_path.replace(os.sep, "/"))
+        return match is not None and not negated[match.lastindex - 1]
+
+    def ignores_tree(self, rel_path: str, is_dir: bool = False) -> bool:
+        # Also true below an ignored directory, for paths that did not come from the walk
+        parts = rel_path.replace(os.sep, "/").split("/")
+        for i in range(1, len(parts)):
+            if self.ignores("/".join(parts[:i]), is_dir=True):
+                return True
+        return self.ignores(rel_path, is_dir)
+
+    def filter_listing(self, rel_dir: str, files: dict, subdirs: List[str]) -> tuple[dict, List[str]]:
+        prefix = rel_dir.replace(os.sep, "/") + "/" if rel_dir else ""
+        kept_files = {
+            name: stat
+            for name, stat in files.items()
+            if not self.ignores(prefix + name) and (prefix or name != IGNORE_FILENAME)
+        }
+        kept_dirs = [name for name in subdirs if not self.ignores(prefix + name, is_dir=True)]
+        count(ENTRIES_IGNORED, len(files) - len(kept_files) + len(subdirs) - len(kept_dirs))
+        return kept_files, kept_dirs
+
+
+def load_ignore_rules(data_dir: str = "data") -> IgnoreRules:
+    # The defaults, followed by the project's own rules, which take precedence
+    try:
+        if is_remote(data_dir):
+            text = read_remote_file(f"{data_dir.rstrip('/')}/{IGNORE_FILENAME}").decode("utf-8")
+        else:
+            path = os.path.join(data_dir, IGNORE_FILENAME)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+    except (OSError, UnicodeDecodeError):
+        text = ""
+    return IgnoreRules([*DEFAULT_IGNORE_PATTERNS, *text.splitlines()])
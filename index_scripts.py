@@ -0,0 +1,203 @@
+import ast
+import hashlib
+import json
+import logging
+import os
+import textwrap
+from pathlib import Path
+from typing import List
+
+from models import IndexedNode, NodeIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE_INDEX_PATH = ".autocatalog/node_index.json"
+NODE_INDEX_VERSION = 1
+NODE_FACTORIES = {"Node", "node"}
+
+
+def _hash_file(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _dataset_names(arg: ast.expr | None) -> List[str]:
+    # inputs/outputs may be a name, a list of names or a {argument: name} dict
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        return [arg.value]
+    if isinstance(arg, (ast.List, ast.Tuple)):
+        return [name for elt in arg.elts for name in _dataset_names(elt)]
+    if isinstance(arg, ast.Dict):
+        return [name for value in arg.values for name in _dataset_names(value)]
+    return []
+
+
+def _resolve_module(pipeline_path: Path, src_root: Path, module: str | None, level: int) -> Path | None:
+    if level:
+        base = pipeline_path.parent
+        for _ in range(level - 1):
+            base = base.parent
+    else:
+        base = src_root
+
+    parts = module.split(".") if module else []
+    candidates = [base.joinpath(*parts).with_suffix(".py"), base.joinpath(*parts, "__init__.py")]
+    return next((c for c in candidates if parts and c.is_file()), None)
+
+
+class _ModuleSource:
+    def __init__(self, path: Path):
+        self.path = path
+        self.source = path.read_text(encoding="utf-8")
+        self.functions = {
+            stmt.name: stmt
+            for stmt in ast.parse(self.source).body
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+
+    def function_source(self, name: str) -> str | None:
+        func = self.functions.get(name)
+        if func is None:
+            return None
+
+        # Module-level helpers the function calls directly, e.g. _parse_money
+        callees = []
+        for call in ast.walk(func):
+            if (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Name)
+                and call.func.id in self.functions
+                and call.func.id != name
+                and call.func.id not in callees
+            ):
+                callees.append(call.func.id)
+
+        segments = [ast.get_source_segment(self.source, self.functions[n]) for n in callees]
+        segments.append(ast.get_source_segment(self.source, func))
+        return "\n\n".join(segments)
+
+
+def _index_pipeline_file(path: Path, src_root: Path) -> tuple[List[IndexedNode], dict[str, str]]:
+    source = path.read_text(encoding="utf-8")
+    tree = ast.parse(source)
+    deps = {str(path): _hash_file(path)}
+    modules: dict[Path, _ModuleSource] = {}
+
+    # Imported name -> (module file, name in that module)
+    imports: dict[str, tuple[Path, str | None]] = {}
+    for stmt in ast.walk(tree):
+        if not isinstance(stmt, ast.ImportFrom):
+            continue
+        for alias in stmt.names:
+            local = alias.asname or alias.name
+            module_path = _resolve_module(path, src_root, stmt.module, stmt.level)
+            if module_path is not None:
+                imports[local] = (module_path, alias.name)
+                continue
+            # ``from . import nodes`` imports a module rather than a function
+            submodule = f"{stmt.module}.{alias.name}" if stmt.module else alias.name
+            module_path = _resolve_module(path, src_root, submodule, stmt.level)
+            if module_path is not None:
+                imports[local] = (module_path, None)
+
+    def module_source(module_path: Path) -> _ModuleSource:
+        if module_path not in modules:
+            modules[module_path] = _ModuleSource(module_path)
+            deps[str(module_path)] = _hash_file(module_path)
+        return modules[module_path]
+
+    def function_source(func: ast.expr | None) -> tuple[str | None, str | None]:
+        if isinstance(func, ast.Name):
+            module_path, name = imports.get(func.id, (path, func.id))
+            return func.id, module_source(module_path).function_source(name or func.id)
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            module_path, name = imports.get(func.value.id, (None, None))
+            if module_path is not None and name is None:
+                return func.attr, module_source(module_path).function_source(func.attr)
+        return None, None
+
+    nodes = []
+    for call in ast.walk(tree):
+        if not isinstance(call, ast.Call):
+            continue
+        factory = call.func.id if isinstance(call.func, ast.Name) else getattr(call.func, "attr", None)
+        if factory not in NODE_FACTORIES:
+            continue
+
+        args = dict(zip(("func", "inputs", "outputs", "name"), call.args))
+        args.update({kw.arg: kw.value for kw in call.keywords if kw.arg})
+        func_name, func_source = function_source(args.get("func"))
+        name = args.get("name")
+
+        nodes.append(IndexedNode(
+            file=str(path.relative_to(src_root)),
+            name=name.value if isinstance(name, ast.Constant) else None,
+            func=func_name,
+            source=textwrap.dedent(ast.get_source_segment(source, call, padded=True)),
+            func_source=func_source,
+            inputs=_dataset_names(args.get("inputs")),
+            outputs=_dataset_names(args.get("outputs")),
+        ))
+
+    return nodes, deps
+
+
+def load_node_index_cache(cache_path: str = DEFAULT_NODE_INDEX_PATH) -> dict:
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == NODE_INDEX_VERSION else {}
+
+
+def build_node_index(src_root: str = "src", cache_path: str | None = DEFAULT_NODE_INDEX_PATH) -> NodeIndex:
+    # Each pipeline file is re-parsed only when it, or one of the node modules
+    # it imports from, no longer matches the hashes recorded in the cache
+    root = Path(src_root)
+    cached = load_node_index_cache(cache_path).get("pipelines", {}) if cache_path else {}
+    pipelines = {}
+
+    for path in sorted(root.rglob("pipeline*.py")):
+        if not path.is_file():
+            continue
+        entry = cached.get(str(path))
+        if entry is not None and all(_hash_file(Path(p)) == h for p, h in entry["deps"].items()):
+            pipelines[str(path)] = entry
+            continue
+        try:
+            nodes, deps = _index_pipeline_file(path, root)
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            logger.warning("Skipping %s: %s", path, e)
+            continue
+        pipelines[str(path)] = {"deps": deps, "nodes": [n.model_dump() for n in nodes]}
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": NODE_INDEX_VERSION, "pipelines": pipelines}, f)
+        os.replace(tmp_path, cache_path)
+
+    index = NodeIndex()
+    for entry in pipelines.values():
+        for node in entry["nodes"]:
+            index.add(IndexedNode(**node))
+    return index
+
+
+def node_context_for(index: NodeIndex, dataset_names: List[str]) -> dict[str, str]:
+    context = {}
+    for dataset_name in dataset_names:
+        for i in index.datasets.get(dataset_name.lower(), []):
+            node = index.nodes[i]
+            label = f"{node.file} (node `{node.name or node.func}`)"
+            if label in context:
+                continue
+            parts = [node.source]
+            if node.func_source:
+                parts.append(node.func_source)
+            context[label] = "\n\n".join(parts)
+    return context
@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import os
+import re
+from typing import List
+
+from models import CatalogEntrySuggestion
+from remote_scripts import is_remote
+from telemetry_scripts import count
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TYPE_INDEX_PATH = ".autocatalog/type_index.npy"
+KNN_HITS = "knn.hits"
+KNN_LEARNED = "knn.learned"
+
+# Width of the hashed feature vectors, 1 KiB per indexed dataset
+FEATURE_DIM = 256
+DEFAULT_K = 5
+# Sharing only an extension and a layer stays below this, the path or the
+# columns have to look alike too
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+SIGNATURE_BYTES = 4096
+MAX_COLUMNS = 64
+# Stored as fixed-width bytes, longer type names are not learned
+MAX_LABEL_BYTES = 64
+LABEL_DTYPE = [("key", "S32"), ("label", f"S{MAX_LABEL_BYTES}")]
+
+# Features are weighted by how much they say about the dataset class
+EXTENSION_WEIGHT = 3.0
+LAYER_WEIGHT = 2.0
+MAGIC_WEIGHT = 2.0
+TOKEN_WEIGHT = 1.0
+COLUMN_WEIGHT = 1.0
+
+LAYER_PATTERN = r"^\d{2}_\w+$"
+TOKEN_PATTERN = r"[a-z]+|[0-9]+"
+COLUMN_DELIMITERS = r"[,;\t|]"
+
+_layer_re = re.compile(LAYER_PATTERN)
+_token_re = re.compile(TOKEN_PATTERN)
+_delimiter_re = re.compile(COLUMN_DELIMITERS)
+
+
+def _key(path: str) -> bytes:
+    return hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=16).hexdigest().encode("ascii")
+
+
+def path_features(rel_path: str) -> List[tuple[str, float]]:
+    parts = rel_path.replace("\\", "/").split("/")
+    stem, ext = os.path.splitext(parts[-1])
+    features = [(f"ext:{ext.lower()}", EXTENSION_WEIGHT)]
+    if len(parts) > 1 and _layer_re.match(parts[0]):
+        features.append((f"layer:{parts[0].lower()}", LAYER_WEIGHT))
+        parts = parts[1:]
+    for part in [*parts[:-1], stem]:
+        for token in _token_re.findall(part.lower()):
+            features.append((f"token:{'#' if token.isdigit() else token}", TOKEN_WEIGHT))
+    return features
+
+
+def content_features(path: str) -> List[tuple[str, float]]:
+    # The magic bytes, and the header of delimited text files
+    if is_remote(path) or not os.path.isfile(path):
+        return []
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SIGNATURE_BYTES)
+    except OSError:
+        return []
+    if not head:
+        return []
+
+    features = [(f"magic:{head[:4].hex()}", MAGIC_WEIGHT)]
+    try:
+        first_line = head.decode("utf-8").splitlines()[0]
+    except (UnicodeDecodeError, IndexError):
+        return features
+    columns = _delimiter_re.split(first_line)
+    if len(columns) > 1:
+        for column in columns[:MAX_COLUMNS]:
+            name = column.strip().strip('"').lower()
+            features.append((f"column:{name}", COLUMN_WEIGHT))
+    return features
+
+
+def feature_vector(rel_path: str, data_dir: str) -> "np.ndarray":
+    # Signed feature hashing into FEATURE_DIM buckets, scaled to unit length
+    # so a dot product is the cosine similarity
+    import numpy as np
+
+    vector = np.zeros(FEATURE_DIM, dtype=np.float32)
+    for feature, weight in path_features(rel_path) + content_features(os.path.join(data_dir, rel_path)):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[h % FEATURE_DIM] += weight if h >> 63 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class TypeIndex:
+    """Nearest-neighbour classifier over datasets whose type has been settled.
+
+    The vectors are one ``.npy`` matrix, memory-mapped on open, next to a
+    ``.labels.npy`` file with the key and dataset type of each row. Newly
+    learned rows are matched against right away, but only written on ``close``.
+
+    Only confirmed types are learned: entries written by hand in the project
+    catalog, and the model's answers only with ``learn_model_answers``, as one
+    wrong answer would otherwise be copied to every similar file.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_TYPE_INDEX_PATH,
+        k: int = DEFAULT_K,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        learn_model_answers: bool = False,
+    ):
+        import numpy as np
+
+        self.path = path
+        self.labels_path = f"{os.path.splitext(path)[0]}.labels.npy"
+        self.k = k
+        self.threshold = threshold
+        self.learn_model_answers = learn_model_answers
+        self._vectors = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        self._labels = np.zeros(0, dtype=LABEL_DTYPE)
+        if os.path.exists(path) and os.path.exists(self.labels_path):
+            vectors = np.load(path, mmap_mode="r")
+            labels = np.load(self.labels_path)
+            # Written by another feature layout or cut short, so started over
+            if vectors.shape[1:] == (FEATURE_DIM,) and len(vectors) == len(labels):
+                self._vectors, self._labels = vectors, labels
+        self._rows = {key: i for i, key in enumerate(self._labels["key"].tolist())}
+        self._learned: dict[bytes, tuple[str, "np.ndarray"]] = {}
+        self._learned_rows = None
+
+    def __len__(self) -> int:
+        return len(self._rows) + sum(key not in self._rows for key in self._learned)
+
+    def __enter__(self) -> "TypeIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def classify(self, suggestions: List[CatalogEntrySuggestion], data_dir: str) -> dict[str, tuple[str, float]]:
+        # Type and similarity of each dataset whose nearest neighbours above
+        # the threshold mostly agree. The rest is left to the model.
+        import numpy as np
+
+        if not len(self) or not suggestions:
+            return {}
+        queries = np.stack([feature_vector(s.filepath, data_dir) for s in suggestions])
+        # One matrix product for the whole batch straight off the mapped file,
+        # and one over the rows learned since, which stay a separate matrix
+        similarities = queries @ np.asarray(self._vectors).T
+        learned_vectors, learned_labels, replaced = self._learned_matrix()
+        if replaced:
+            # Below any threshold, unit vectors are never further apart
+            similarities[:, replaced] = -1.0
+        # Only neighbours above the threshold can vote, so only those are ranked
+        query_rows, neighbours = np.nonzero(similarities >= self.threshold)
+        scores = similarities[query_rows, neighbours]
+        if len(learned_labels):
+            learned_similarities = queries @ learned_vectors.T
+            learned_rows, learned_neighbours = np.nonzero(learned_similarities >= self.threshold)
+            query_rows = np.concatenate([query_rows, learned_rows])
+            neighbours = np.concatenate([neighbours, learned_neighbours + len(self._labels)])
+            scores = np.concatenate([scores, learned_similarities[learned_rows, learned_neighbours]])
+        order = np.lexsort((-scores, query_rows))
+        query_rows, neighbours, scores = query_rows[order], neighbours[order], scores[order]
+        starts = np.searchsorted(query_rows, np.arange(len(suggestions)))
+        labels = self._labels["label"]
+
+        results = {}
+        for j, s in enumerate(suggestions):
+            nearest = slice(starts[j], starts[j] + self.k)
+            votes: dict[bytes, float] = {}
+            best: dict[bytes, float] = {}
+            for i, score, row in zip(neighbours[nearest], scores[nearest], query_rows[nearest]):
+                if row != j:
+                    break
+                label = labels[i] if i < len(labels) else learned_labels[i - len(labels)]
+                votes[label] = votes.get(label, 0.0) + float(score)
+                best.setdefault(label, float(score))
+            if not votes:
+                continue
+            label, weight = max(votes.items(), key=lambda item: item[1])
+            if weight > sum(votes.values()) / 2:
+                results[s.suggested_name] = (label.decode("utf-8"), best[label])
+        count(KNN_HITS, len(results))
+        return results
+
+    def learn(self, filepath: str, dataset_type: str, data_dir: str):
+        # ``filepath`` is relative to ``data_dir``, like a suggestion's. Files
+        # already indexed with the same type are not read again.
+        if len(dataset_type.encode("utf-8")) > MAX_LABEL_BYTES:
+            logger.warning(
+                "Not learning %s, its type name is longer than %d bytes: %s", filepath, MAX_LABEL_BYTES, dataset_type
+            )
+            return
+        key = _key(os.path.join(data_dir, filepath))
+        if key in self._learned:
+            return
+        row = self._rows.get(key)
+        if row is not None and self._labels["label"][row].decode("utf-8") == dataset_type:
+            return
+        self._learned[key] = (dataset_type, feature_vector(filepath, data_dir))
+        self._learned_rows = None
+        count(KNN_LEARNED)
+
+    def learn_catalog(self, entries: dict, root: str, data_dir: str):
+        # Entries written by hand in the project catalog, for files in the data folder
+        prefix = root.rstrip("/") + "/"
+        for entry in entries.values():
+            filepath, dataset_type = entry.get("filepath"), entry.get("type")
+            if isinstance(filepath, str) and isinstance(dataset_type, str) and filepath.startswith(prefix):
+                self.learn(filepath[len(prefix):], dataset_type.removeprefix("kedro_datasets."), data_dir)
+
+    def _learned_matrix(self) -> tuple["np.ndarray", List[bytes], List[int]]:
+        # The rows learned since opening, their labels, and the mapped rows
+        # they replace. Kept until the next ``learn``.
+        import numpy as np
+
+        if self._learned_rows is None:
+            keys = list(self._learned)
+            self._learned_rows = (
+                np.stack([self._learned[key][1] for key in keys])
+                if keys
+                else np.zeros((0, FEATURE_DIM), dtype=np.float32),
+                [self._learned[key][0].encode("utf-8") for key in keys],
+                [self._rows[key] for key in keys if key in self._rows],
+            )
+        return self._learned_rows
+
+    def _merged(self) -> tuple["np.ndarray", "np.ndarray"]:
+        # Vectors and labels with the rows learned since opening, which
+        # replace earlier rows for the same file. Only built to be written.
+        import numpy as np
+
+        if not self._learned:
+            return self._vectors, self._labels
+        keys = list(self._learned)
+        replaced = [self._rows[key] for key in keys if key in self._rows]
+        keep = np.ones(len(self._labels), dtype=bool)
+        keep[replaced] = False
+
+        labels = np.concatenate([
+            self._labels[keep],
+            np.array([(key, self._learned[key][0].encode("utf-8")) for key in keys], dtype=self._labels.dtype),
+        ])
+        vectors = np.concatenate([
+            np.asarray(self._vectors)[keep],
+            np.stack([self._learned[key][1] for key in keys]),
+        ])
+        return vectors, labels
+
+    def close(self):
+        import numpy as np
+
+        if not self._learned:
+            return
+        vectors, labels = self._merged()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Written next to the index and renamed over it, so readers never map a partial file
+        for path, array in ((self.path, vectors), (self.labels_path, labels)):
+            with open(f"{path}.partial", "wb") as f:
+                np.save(f, array)
+            os.replace(f"{path}.partial", path)
+
+        self._vectors = np.load(self.path, mmap_mode="r")
+        self._labels = labels
+        self._rows = {key: i for i, key in enumerate(labels["key"].tolist())}
+        self._learned = {}
+        self._learned_rows = None
@@ -1,9 +1,97 @@
-from pathlib import Path
-from openai import OpenAI
-from models import CatalogEntrySuggestion
-from typing import List
+import asyncio
+import contextvars
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from cache_scripts import InferenceCache, fingerprint_file, hash_text
+from index_scripts import DEFAULT_NODE_INDEX_PATH, build_node_index, node_context_for
+from knn_scripts import TypeIndex
+from models import CatalogEntrySuggestion, NodeIndex
+from resolver_scripts import EXT_TO_KEDRO_DATASET
+from telemetry_scripts import CACHE_HITS, CACHE_MISSES, LLM_REASKS, count
+from typing import TYPE_CHECKING, Callable, Coroutine, List
 
-client = OpenAI()
+if TYPE_CHECKING:
+    from backend_scripts import InferenceBackend
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o"
+
+# Leaves room in gpt-4o's 128k window for the completion and the chat overhead
+DEFAULT_MAX_PROMPT_TOKENS = 32_000
+# The reply repeats every dataset name, so chunks are also capped by entry count
+DEFAULT_MAX_CHUNK_ENTRIES = 200
+DEFAULT_MAX_CONCURRENCY = 4
+CHARS_PER_TOKEN = 4
+# Follow-up requests for the entries a reply left without a valid type
+DEFAULT_MAX_REASKS = 2
+# Answers where the model deliberately gave no type, which are not asked again
+UNCERTAIN_VALUES = {"unknown", "?", "none", "unsure", "null"}
+
+# File-backed classes shipped with kedro-datasets, the only answers accepted
+KEDRO_DATASET_TYPES = frozenset({
+    *EXT_TO_KEDRO_DATASET.values(),
+    "biosequence.BioSequenceDataset",
+    "dask.CSVDataset",
+    "dask.ParquetDataset",
+    "email.EmailMessageDataset",
+    "geopandas.GenericDataset",
+    "holoviews.HoloviewsWriter",
+    "ibis.FileDataset",
+    "json.JSONDataset",
+    "matlab.MatlabDataset",
+    "matplotlib.MatplotlibDataset",
+    "matplotlib.MatplotlibWriter",
+    "networkx.GMLDataset",
+    "networkx.GraphMLDataset",
+    "networkx.JSONDataset",
+    "openxml.DocxDataset",
+    "pandas.DeltaTableDataset",
+    "pandas.FeatherDataset",
+    "pandas.GenericDataset",
+    "pandas.HDFDataset",
+    "pandas.JSONDataset",
+    "pickle.PickleDataset",
+    "pillow.ImageDataset",
+    "plotly.HTMLDataset",
+    "plotly.JSONDataset",
+    "plotly.PlotlyDataset",
+    "polars.CSVDataset",
+    "polars.EagerPolarsDataset",
+    "polars.LazyPolarsDataset",
+    "spark.DeltaTableDataset",
+    "spark.SparkDataset",
+    "svmlight.SVMLightDataset",
+    "tensorflow.TensorFlowModelDataset",
+    "text.TextDataset",
+})
+_CANONICAL_TYPES = {t.lower(): t for t in KEDRO_DATASET_TYPES}
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "datasets": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string", "enum": sorted(KEDRO_DATASET_TYPES)},
+                },
+                "required": ["name", "type"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["datasets"],
+    "additionalProperties": False,
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "dataset_types", "strict": True, "schema": RESPONSE_SCHEMA},
+}
 
 
 def format_context_for_llm(context_dict: dict[str, str]) -> str:
@@ -13,19 +101,13 @@ def format_context_for_llm(context_dict: dict[str, str]) -> str:
     )
 
 
-def get_node_pipeline_source_code(src_root: str = "src") -> dict[str, str]:
-    relevant_files = {}
-    for path in Path(src_root).rglob("*.py"):
-        if path.name in {"nodes.py", "pipeline.py"}:
-            try:
-                relative_path = str(path.relative_to(src_root))
-                relevant_files[relative_path] = path.read_text(encoding="utf-8")
-            except Exception as e:
-                print(f"Skipping {path}: {e}")
-    return relevant_files
-
-
-def build_prompt(suggestions: List[CatalogEntrySuggestion], context_md: str | None) -> List[dict]:
+def build_prompt(
+    suggestions: List[CatalogEntrySuggestion],
+    context_md: str | None,
+    rejected: dict[str, str | None] | None = None,
+) -> List[dict]:
+    # ``rejected`` holds the previous answers for a follow-up request, which
+    # only lists the entries they left without a valid type
     dataset_lines = [f"{s.suggested_name}: {s.filepath}" for s in suggestions]
     dataset_block = "\n".join(dataset_lines)
 
@@ -43,6 +125,19 @@ def build_prompt(suggestions: List[CatalogEntrySuggestion], context_md: str | No
         "",
         "You MUST respond with a dataset type for every entry — even if you're unsure, make your best guess.",
         "",
+    ]
+
+    if rejected:
+        instructions += [
+            "Your previous answer did not give a valid Kedro dataset class for these entries:",
+            *(
+                f"- {name}: " + (f"`{answer}` is not a Kedro dataset class" if answer else "no answer")
+                for name, answer in rejected.items()
+            ),
+            "",
+        ]
+
+    instructions += [
         "Dataset entries:",
         dataset_block,
     ]
@@ -56,8 +151,8 @@ def build_prompt(suggestions: List[CatalogEntrySuggestion], context_md: str | No
 
     instructions += [
         "",
-        "Respond in this format only:",
-        "dataset_name: dataset.DatasetType",
+        "Respond with JSON only, in this format:",
+        '{"datasets": [{"name": "dataset_name", "type": "dataset.DatasetType"}]}',
         "",
         "Do not explain your choices. Just output the name-to-type mapping.",
     ]
@@ -69,6 +164,25 @@ def build_prompt(suggestions: List[CatalogEntrySuggestion], context_md: str | No
 
 
 def parse_llm_response(content: str) -> dict[str, str | None]:
+    # Structured replies are JSON. Servers without structured output may wrap
+    # it in a code fence, or fall back to ``name: type`` lines.
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        reply = json.loads(text)
+    except ValueError:
+        reply = None
+    if isinstance(reply, dict):
+        datasets = reply.get("datasets")
+        if isinstance(datasets, list):
+            return {
+                str(d["name"]).strip(): d.get("type")
+                for d in datasets
+                if isinstance(d, dict) and d.get("name") is not None
+            }
+        return {str(name).strip(): value if isinstance(value, str) else None for name, value in reply.items()}
+
     type_map = {}
     for line in content.strip().splitlines():
         if ":" not in line:
@@ -78,46 +192,240 @@ def parse_llm_response(content: str) -> dict[str, str | None]:
     return type_map
 
 
-def is_noise_file(s: CatalogEntrySuggestion) -> bool:
-    # Add filters for files that should NOT be treated as datasets
-    noise_indicators = [
-        "_versions", "version", "checkpoint", "SUCCESS", ".ipynb_checkpoints",
-        ".DS_Store", "._", ".trash", "metadata", ".log"
-    ]
-    path = s.filepath.lower()
-    return any(part in path for part in noise_indicators)
+def valid_dataset_type(dataset_type: str | None) -> str | None:
+    # The class as spelled in kedro-datasets, or None if the answer is not one
+    if not isinstance(dataset_type, str):
+        return None
+    name = dataset_type.strip().strip("`").removeprefix("kedro_datasets.")
+    return _CANONICAL_TYPES.get(name.lower())
+
+
+def is_uncertain(dataset_type: str | None) -> bool:
+    return isinstance(dataset_type, str) and dataset_type.strip().strip("`").lower() in UNCERTAIN_VALUES
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_suggestions(
+    suggestions: List[CatalogEntrySuggestion],
+    context_md: str | None,
+    max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+    max_chunk_entries: int = DEFAULT_MAX_CHUNK_ENTRIES,
+    snippets_for: Callable[[CatalogEntrySuggestion], dict[str, str]] | None = None,
+) -> List[List[CatalogEntrySuggestion]]:
+    # ``context_md`` is shared by every chunk, while ``snippets_for`` gives the
+    # per-dataset context that is only sent along with the chunk holding it
+    base_tokens = sum(estimate_tokens(m["content"]) for m in build_prompt([], context_md))
+
+    def entry_tokens(s: CatalogEntrySuggestion, snippets: dict[str, str], sent: set[str]) -> int:
+        new_snippets = [content for label, content in snippets.items() if label not in sent]
+        return estimate_tokens(f"{s.suggested_name}: {s.filepath}\n") + sum(map(estimate_tokens, new_snippets))
+
+    chunks = []
+    chunk, chunk_tokens, chunk_snippets = [], base_tokens, set()
+    for s in suggestions:
+        snippets = snippets_for(s) if snippets_for else {}
+        tokens = entry_tokens(s, snippets, chunk_snippets)
+        if chunk and (chunk_tokens + tokens > max_prompt_tokens or len(chunk) >= max_chunk_entries):
+            chunks.append(chunk)
+            chunk, chunk_tokens, chunk_snippets = [], base_tokens, set()
+            tokens = entry_tokens(s, snippets, chunk_snippets)
+        chunk.append(s)
+        chunk_tokens += tokens
+        chunk_snippets.update(snippets)
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def _infer_chunk(
+    backend: "InferenceBackend",
+    chunk: List[CatalogEntrySuggestion],
+    context_md: str | None,
+    rejected: dict[str, str | None] | None,
+    data_dir: str,
+    semaphore: asyncio.Semaphore,
+) -> dict[str, str | None]:
+    async with semaphore:
+        if rejected:
+            type_map = await backend.infer_chunk(chunk, context_md, data_dir, rejected=rejected)
+        else:
+            type_map = await backend.infer_chunk(chunk, context_md, data_dir)
+
+    # A reply may only answer for the datasets that were asked about in its chunk
+    names = {s.suggested_name for s in chunk}
+    return {name: dataset_type for name, dataset_type in type_map.items() if name in names}
+
+
+async def _infer_chunks(
+    backend: "InferenceBackend",
+    chunks: List[tuple[List[CatalogEntrySuggestion], str | None, dict[str, str | None] | None]],
+    data_dir: str,
+    max_concurrency: int,
+) -> List[dict[str, str | None]]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Opened per run, so clients never outlive the event loop they were bound to
+    await backend.open()
+    try:
+        return await asyncio.gather(
+            *(
+                _infer_chunk(backend, chunk, context_md, rejected, data_dir, semaphore)
+                for chunk, context_md, rejected in chunks
+            )
+        )
+    finally:
+        await backend.close()
+
+
+def _run(coro: Coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Already inside an event loop (e.g. a notebook), so run on a separate one,
+    # and carry the context along, so requests are counted in the calling span
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(context.run, asyncio.run, coro).result()
 
 
 def infer_dataset_types(
     suggestions: List[CatalogEntrySuggestion],
-    verbose: bool = True
+    verbose: bool = True,
+    cache: InferenceCache | None = None,
+    data_dir: str = "data",
+    max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+    max_chunk_entries: int = DEFAULT_MAX_CHUNK_ENTRIES,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    backend: "InferenceBackend | None" = None,
+    src_root: str = "src",
+    node_index_path: str | None = DEFAULT_NODE_INDEX_PATH,
+    max_reasks: int = DEFAULT_MAX_REASKS,
+    type_index: TypeIndex | None = None,
+    node_index: NodeIndex | None = None,
 ) -> List[CatalogEntrySuggestion]:
     def log(msg: str):
         if verbose:
-            print(msg)
+            logger.info(msg)
+
+    if backend is None:
+        from backend_scripts import create_backend
+
+        backend = create_backend()
 
-    context_dict = get_node_pipeline_source_code()
-    context_md = format_context_for_llm(context_dict)
+    # Only the nodes reading or writing a dataset are sent along with it.
+    # Callers typing several batches build the index once and pass it in.
+    index = node_index if node_index is not None else build_node_index(src_root, node_index_path)
+    snippets = {s.suggested_name: node_context_for(index, [s.suggested_name]) for s in suggestions}
 
     unresolved = suggestions.copy()
     final_results: dict[str, str] = {}
 
-    # 🔍 Attempt with context immediately
-    log("🔍 Attempting with source code context from the start...")
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=build_prompt(unresolved, context_md=context_md),
-        temperature=0.2,
-    )
-    first_pass = parse_llm_response(response.choices[0].message.content)
+    cache_keys: dict[str, str] = {}
+    if cache is not None:
+        cache_keys = {
+            s.suggested_name: cache.make_key(
+                backend.cache_namespace,
+                hash_text(format_context_for_llm(snippets[s.suggested_name])),
+                s.filepath,
+                fingerprint_file(os.path.join(data_dir, s.filepath)),
+            )
+            for s in suggestions
+        }
+        cached = cache.get_many(cache_keys.values())
+        for s in suggestions:
+            result = cached.get(cache_keys[s.suggested_name])
+            if result is not None:
+                log(f"  - 💾 Cached: {s.suggested_name} → {result}")
+                final_results[s.suggested_name] = result
+        unresolved = [s for s in suggestions if s.suggested_name not in final_results]
+        count(CACHE_HITS, len(suggestions) - len(unresolved))
+        count(CACHE_MISSES, len(unresolved))
 
-    for s in unresolved:
-        result = first_pass.get(s.suggested_name)
-        if not result or result.lower() in {"unknown", "?", "none", "unsure", "null"}:
-            log(f"  - ⚠️ LLM returned uncertain value for `{s.suggested_name}`, but keeping it anyway.")
-        else:
-            log(f"  - ✅ Resolved: {s.suggested_name} → {result}")
-        final_results[s.suggested_name] = result
+    if unresolved and type_index is not None:
+        # Datasets that look like ones seen before are not sent to the model
+        for name, (result, similarity) in type_index.classify(unresolved, data_dir).items():
+            log(f"  - 🧭 Nearest neighbours: {name} → {result} ({similarity:.2f})")
+            final_results[name] = result
+        unresolved = [s for s in unresolved if s.suggested_name not in final_results]
+
+    if unresolved:
+        # 🔍 Attempt with context immediately
+        def ask(
+            entries: List[CatalogEntrySuggestion], rejected: dict[str, str | None] | None = None
+        ) -> dict[str, str | None]:
+            chunks = chunk_suggestions(
+                entries,
+                None,
+                max_prompt_tokens,
+                max_chunk_entries,
+                snippets_for=lambda s: snippets[s.suggested_name],
+            )
+            chunk_contexts = []
+            for chunk in chunks:
+                chunk_snippets = {}
+                for s in chunk:
+                    chunk_snippets.update(snippets[s.suggested_name])
+                chunk_rejected = {s.suggested_name: rejected[s.suggested_name] for s in chunk} if rejected else None
+                chunk_contexts.append((chunk, format_context_for_llm(chunk_snippets) or None, chunk_rejected))
+            if rejected is None:
+                log(f"🔍 Attempting with source code context from the start ({len(chunks)} request(s))...")
+
+            answers: dict[str, str | None] = {}
+            # Merged in chunk order, so the outcome does not depend on which reply came first
+            for type_map in _run(_infer_chunks(backend, chunk_contexts, data_dir, max_concurrency)):
+                answers.update(type_map)
+            return answers
+
+        answers = ask(unresolved)
+
+        new_verdicts: dict[str, str] = {}
+        rejected: dict[str, str | None] = {}
+        uncertain: set[str] = set()
+        for attempt in range(max_reasks + 1):
+            for s in unresolved:
+                if s.suggested_name not in answers:
+                    continue
+                if is_uncertain(answers[s.suggested_name]):
+                    # Asking again would only repeat the model's own verdict
+                    rejected.pop(s.suggested_name, None)
+                    uncertain.add(s.suggested_name)
+                    continue
+                result = valid_dataset_type(answers[s.suggested_name])
+                if result is None:
+                    rejected[s.suggested_name] = answers[s.suggested_name]
+                    continue
+                rejected.pop(s.suggested_name, None)
+                log(f"  - ✅ Resolved: {s.suggested_name} → {result}")
+                final_results[s.suggested_name] = result
+                if type_index is not None and type_index.learn_model_answers and backend.from_model:
+                    type_index.learn(s.filepath, result, data_dir)
+                if s.suggested_name in cache_keys:
+                    new_verdicts[cache_keys[s.suggested_name]] = result
+            for s in unresolved:
+                if s.suggested_name not in final_results and s.suggested_name not in uncertain:
+                    rejected.setdefault(s.suggested_name, None)
+
+            if not rejected or attempt == max_reasks or not backend.supports_reask:
+                break
+            # Only the entries without a valid type are asked about again,
+            # along with their own context and what was wrong with the answer
+            retry = [s for s in unresolved if s.suggested_name in rejected]
+            log(f"  - 🔁 Asking again for {len(retry)} dataset(s) without a valid type...")
+            count(LLM_REASKS, len(retry))
+            answers = ask(retry, rejected)
+
+        for name in sorted(uncertain):
+            log(f"  - ⚠️ The model could not type `{name}`, leaving it out.")
+        for name, answer in rejected.items():
+            log(f"  - ⚠️ No valid dataset type for `{name}` (answered {answer!r}), leaving it out.")
+
+        if cache is not None:
+            cache.put_many(new_verdicts)
 
     # Apply final results
     for s in suggestions:
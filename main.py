@@ -1,4 +1,247 @@
-from tool_scripts import update_auto_catalog
+import argparse
+import logging
+
+from backend_scripts import BACKENDS, DEFAULT_BACKEND
+from cache_scripts import DEFAULT_INFERENCE_CACHE_PATH
+from knn_scripts import DEFAULT_TYPE_INDEX_PATH
+from llm_scripts import DEFAULT_MAX_CONCURRENCY
+from partition_scripts import DEFAULT_MIN_PARTITIONS
+from remote_scripts import is_remote, local_path
+from telemetry_scripts import DEFAULT_OTLP_ENDPOINT, Tracer
+from tool_scripts import DEFAULT_CATALOG_PATH, DEFAULT_SCAN_JOBS, stream_auto_catalog, update_auto_catalog
+from transcode_scripts import DEFAULT_TRANSCODE_MIN_BYTES, materialize_caches
+from watch_scripts import DEFAULT_WATCH_DEBOUNCE, watch_auto_catalog
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate conf/base/auto_catalog.yml")
+    parser.add_argument(
+        "--data-dir",
+        default="data",
+        help="Data folder to catalog, a local path or a URL such as s3://bucket/data (default: data).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_SCAN_JOBS,
+        help=f"Number of threads listing directories concurrently (default: {DEFAULT_SCAN_JOBS}).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the scan manifest and re-catalog every file.",
+    )
+    parser.add_argument(
+        "--verify-files",
+        action="store_true",
+        help="Stat every file of unchanged directories to catch files rewritten in place, as slow as a full scan.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Rebuild the catalog with bounded memory, writing entries as they resolve (implies --full).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and update the catalog whenever files under data/ change.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_WATCH_DEBOUNCE,
+        help=f"Seconds without changes before a burst is catalogued in watch mode (default: {DEFAULT_WATCH_DEBOUNCE}).",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll directory mtimes in watch mode instead of using filesystem events.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Send every dataset to the model instead of reusing cached verdicts.",
+    )
+    parser.add_argument(
+        "--no-type-index",
+        action="store_true",
+        help="Send every unresolved dataset to the model instead of matching it to similar ones resolved before.",
+    )
+    parser.add_argument(
+        "--learn-model-types",
+        action="store_true",
+        help="Also add the model's answers to the type index, not only hand-written catalog entries.",
+    )
+    parser.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Write entries without load_args and save_args tuned from the file metadata.",
+    )
+    parser.add_argument(
+        "--min-partitions",
+        type=int,
+        default=DEFAULT_MIN_PARTITIONS,
+        help=f"Same-shaped files in a directory that make it one partitioned dataset (default: {DEFAULT_MIN_PARTITIONS}).",
+    )
+    parser.add_argument(
+        "--no-partitions",
+        action="store_true",
+        help="Catalog every file on its own instead of grouping collections into partitioned datasets.",
+    )
+    parser.add_argument(
+        "--no-transcode",
+        action="store_true",
+        help="Do not pair slow raw formats with a transcoded Parquet cache entry.",
+    )
+    parser.add_argument(
+        "--transcode-min-bytes",
+        type=int,
+        default=DEFAULT_TRANSCODE_MIN_BYTES,
+        help=f"Smallest raw file given a Parquet cache (default: {DEFAULT_TRANSCODE_MIN_BYTES}).",
+    )
+    parser.add_argument(
+        "--materialize",
+        action="store_true",
+        help="Convert stale Parquet caches right away instead of on the first run reading them.",
+    )
+    parser.add_argument(
+        "--skip-pipelines",
+        action="store_true",
+        help="Do not load the registered pipelines to type their datasets statically.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Maximum number of model requests in flight (default: {DEFAULT_MAX_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=f"Inference backend for datasets that cannot be resolved locally (default: {DEFAULT_BACKEND}).",
+    )
+    parser.add_argument("--model", help="Model name for the openai and openai-compatible backends.")
+    parser.add_argument("--base-url", help="Endpoint for the openai and openai-compatible backends.")
+    parser.add_argument(
+        "--no-structured-output",
+        action="store_true",
+        help="Ask for plain text replies, for OpenAI-compatible servers without JSON schema support.",
+    )
+    parser.add_argument("--record", help="Record model responses to this fixture file.")
+    parser.add_argument("--fixture", help="Recorded responses used by the replay backend.")
+    parser.add_argument("--report", help="Write per-stage timings and counters to this JSON file.")
+    parser.add_argument(
+        "--otlp-endpoint",
+        nargs="?",
+        const=DEFAULT_OTLP_ENDPOINT,
+        help=f"Send the run's spans to an OpenTelemetry collector (default: {DEFAULT_OTLP_ENDPOINT}).",
+    )
+
+    args = parser.parse_args(argv)
+    if args.backend == "replay" and not args.fixture:
+        parser.error("--fixture is required with --backend replay")
+    if args.verify_files and (args.stream or args.full or args.watch):
+        parser.error("--verify-files only applies to incremental runs without --stream, --full or --watch")
+    if args.watch and (args.stream or args.full):
+        parser.error("--watch updates incrementally and cannot be combined with --stream or --full")
+    if args.materialize and (args.watch or args.no_transcode):
+        parser.error("--materialize cannot be combined with --watch or --no-transcode")
+    if args.watch and is_remote(args.data_dir):
+        parser.error("--watch needs a local --data-dir")
+    return args
+
+
+def backend_options(args: argparse.Namespace) -> dict:
+    if args.backend == "replay":
+        return {"fixture_path": args.fixture}
+    if args.backend == "heuristics":
+        return {}
+
+    options = {
+        "model": args.model,
+        "base_url": args.base_url,
+        "record_path": args.record,
+        "structured_output": False if args.no_structured_output else None,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def export_report(tracer: Tracer, args: argparse.Namespace):
+    if args.report:
+        tracer.write_json(args.report)
+        logger.info("Run report written to %s", args.report)
+    if args.otlp_endpoint:
+        try:
+            tracer.export_otlp(args.otlp_endpoint)
+        except OSError as e:
+            # A missing collector should not fail a run that already wrote its catalog
+            logger.warning("Could not export spans to %s: %s", args.otlp_endpoint, e)
+
 
 if __name__ == "__main__":
-    update_auto_catalog()
\ No newline at end of file
+    args = parse_args()
+    # Progress is logged by the modules, shown like the prints it replaced
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    tracer = Tracer()
+    try:
+        with tracer:
+            if args.watch:
+                watch_auto_catalog(
+                    data_dir=local_path(args.data_dir),
+                    jobs=args.jobs,
+                    cache_path=None if args.no_cache else DEFAULT_INFERENCE_CACHE_PATH,
+                    debounce=args.debounce,
+                    polling=args.poll,
+                    max_concurrency=args.max_concurrency,
+                    backend=args.backend,
+                    backend_options=backend_options(args),
+                    project_path=None if args.skip_pipelines else ".",
+                    profile=not args.no_profile,
+                    transcode=not args.no_transcode,
+                    transcode_min_bytes=args.transcode_min_bytes,
+                    min_partitions=None if args.no_partitions else args.min_partitions,
+                    type_index_path=None if args.no_type_index else DEFAULT_TYPE_INDEX_PATH,
+                    learn_model_types=args.learn_model_types,
+                )
+            elif args.stream:
+                stream_auto_catalog(
+                    data_dir=args.data_dir,
+                    jobs=args.jobs,
+                    cache_path=None if args.no_cache else DEFAULT_INFERENCE_CACHE_PATH,
+                    max_concurrency=args.max_concurrency,
+                    backend=args.backend,
+                    backend_options=backend_options(args),
+                    project_path=None if args.skip_pipelines else ".",
+                    profile=not args.no_profile,
+                    transcode=not args.no_transcode,
+                    transcode_min_bytes=args.transcode_min_bytes,
+                    min_partitions=None if args.no_partitions else args.min_partitions,
+                    type_index_path=None if args.no_type_index else DEFAULT_TYPE_INDEX_PATH,
+                    learn_model_types=args.learn_model_types,
+                )
+            else:
+                update_auto_catalog(
+                    data_dir=args.data_dir,
+                    incremental=not args.full,
+                    verify_files=args.verify_files,
+                    jobs=args.jobs,
+                    cache_path=None if args.no_cache else DEFAULT_INFERENCE_CACHE_PATH,
+                    max_concurrency=args.max_concurrency,
+                    backend=args.backend,
+                    backend_options=backend_options(args),
+                    project_path=None if args.skip_pipelines else ".",
+                    profile=not args.no_profile,
+                    transcode=not args.no_transcode,
+                    transcode_min_bytes=args.transcode_min_bytes,
+                    min_partitions=None if args.no_partitions else args.min_partitions,
+                    type_index_path=None if args.no_type_index else DEFAULT_TYPE_INDEX_PATH,
+                    learn_model_types=args.learn_model_types,
+                )
+            if args.materialize:
+                materialize_caches(DEFAULT_CATALOG_PATH)
+    finally:
+        # Failed runs are reported too, with the error on the span that raised
+        export_report(tracer, args)
@@ -8,20 +8,75 @@ class DataFile(BaseModel):
     ext: str
 
 
+class VersionedDataset(BaseModel):
+    path: str
+    latest_version: str
+    version_count: int
+    # Unknown under a remote data folder, where only the latest save is listed
+    total_bytes: int | None
+
+
 class ObservedProject(BaseModel):
     versioned_files: List[str]
     uncatalogued_files: List[str]
     possible_models: List[str]
+    versioned_datasets: List[VersionedDataset] = []
 
 
 class ScannedDataFile(BaseModel):
     full_path: str
     rel_path: str
     dataset_type: str | None
+    size: int | None = None
+    mtime_ns: int | None = None
+    inode: int | None = None
+    # Set on the latest save of a versioned dataset, the only one the scan lists
+    version: str | None = None
+    version_count: int | None = None
+    versioned_bytes: int | None = None
+
+
+class ScanResult(BaseModel):
+    files: List[ScannedDataFile]
+    added: List[ScannedDataFile] = []
+    modified: List[ScannedDataFile] = []
+    removed: List[str] = []
+
+    @property
+    def changed(self) -> List[ScannedDataFile]:
+        return self.added + self.modified
 
 
 class CatalogEntrySuggestion(BaseModel):
     filepath: str
     suggested_name: str
     suggested_type: str | None
-    is_versioned: bool
\ No newline at end of file
+    is_versioned: bool
+    confidence: float | None = None
+    load_args: dict | None = None
+    save_args: dict | None = None
+    # Set for a collection of files, typed through its first one in ``filepath``
+    collection_type: str | None = None
+    collection_path: str | None = None
+
+
+class IndexedNode(BaseModel):
+    file: str
+    name: str | None
+    func: str | None
+    source: str
+    func_source: str | None
+    inputs: List[str]
+    outputs: List[str]
+
+
+class NodeIndex(BaseModel):
+    nodes: List[IndexedNode] = []
+    datasets: dict[str, List[int]] = {}
+
+    def add(self, node: IndexedNode):
+        self.nodes.append(node)
+        for dataset in dict.fromkeys(node.inputs + node.outputs):
+            # Transcoded datasets (``shuttles@spark``) share the file of ``shuttles``
+            key = dataset.split("@", 1)[0].lower()
+            self.datasets.setdefault(key, []).append(len(self.nodes) - 1)
@@ -0,0 +1,274 @@
+import heapq
+import os
+import re
+from typing import Iterable, Iterator, List
+
+from models import CatalogEntrySuggestion
+from telemetry_scripts import count
+
+COLLECTIONS_FOUND = "collections.found"
+COLLECTION_FILES = "collections.files"
+
+# Fewer same-shaped files than this are catalogued one by one
+DEFAULT_MIN_PARTITIONS = 5
+
+PARTITIONED_DATASET = "partitions.PartitionedDataset"
+INCREMENTAL_DATASET = "partitions.IncrementalDataset"
+# Written into the collection root by IncrementalDataset
+CHECKPOINT_FILENAME = "CHECKPOINT"
+
+# The root of a collection is the highest directory below which there is
+# nothing but partition directories, such as ``2024``, ``07`` or
+# ``date=2024-07-01``, and then the files themselves
+PARTITION_PATTERN = r"^(?P<root>.+?)/(?P<partition>(?:(?:[A-Za-z_]\w*=)?[0-9][0-9_.:T-]*/)*[^/]+)$"
+EXTENSION_PATTERN = r"(?P<ext>\.[^./]+)$"
+# Partitions differing only in their numbers share a shape
+DIGITS_PATTERN = r"[0-9]+"
+SHAPE_PLACEHOLDER = "#"
+# Dated partitions are only ever added to, numbered parts get rewritten
+DATE_PATTERN = r"(?:19|20)\d{2}[-_]?(?:0[1-9]|1[0-2])[-_]?(?:0[1-9]|[12]\d|3[01])"
+
+_partition_re = re.compile(PARTITION_PATTERN)
+_extension_re = re.compile(EXTENSION_PATTERN)
+_digits_re = re.compile(DIGITS_PATTERN)
+_date_re = re.compile(DATE_PATTERN)
+
+
+def collection_suggestion(root: str, sample: str, dataset_type: str) -> CatalogEntrySuggestion:
+    # Typed, profiled and inferred through its first partition
+    return CatalogEntrySuggestion(
+        filepath=sample,
+        suggested_name=root.rsplit("/", 1)[-1],
+        suggested_type=None,
+        is_versioned=False,
+        collection_type=dataset_type,
+        collection_path=root,
+    )
+
+
+def find_collections(
+    plan: "pa.Table",
+    min_partitions: int = DEFAULT_MIN_PARTITIONS,
+    exclude_names: Iterable[str] = (),
+) -> "pa.Table":
+    # Columnar over the planned files: one row per collection, with its root,
+    # extension, first partition and dataset type. A directory is a collection
+    # if everything under it is a partition of the same extension and shape,
+    # and none of them is a dataset the pipelines use by name. Only the
+    # checkpoint of an IncrementalDataset may sit next to the partitions.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    paths = plan["filepath"]
+    if os.sep != "/":
+        paths = pc.replace_substring(paths, os.sep, "/")
+    unversioned = pc.invert(plan["is_versioned"])
+    parts = pc.extract_regex(pc.filter(paths, unversioned), PARTITION_PATTERN)
+    partitions = pc.struct_field(parts, "partition")
+    files = pa.table({
+        "root": pc.struct_field(parts, "root"),
+        "ext": pc.utf8_lower(pc.struct_field(pc.extract_regex(partitions, EXTENSION_PATTERN), "ext")),
+        "shape": pc.replace_substring_regex(partitions, DIGITS_PATTERN, SHAPE_PLACEHOLDER),
+        "filepath": pc.filter(paths, unversioned),
+        "dated": pc.match_substring_regex(partitions, DATE_PATTERN),
+        "excluded": pc.is_in(
+            pc.utf8_lower(pc.filter(plan["suggested_name"], unversioned)),
+            value_set=pa.array(list(exclude_names), pa.string()),
+        ),
+    })
+    files = files.filter(pc.and_(pc.is_valid(files["root"]), pc.is_valid(files["ext"])))
+
+    groups = files.group_by(["root", "ext"]).aggregate([
+        ("filepath", "count"),
+        ("shape", "count_distinct"),
+        ("filepath", "min"),
+        ("dated", "all"),
+        ("excluded", "any"),
+    ])
+    candidates = pc.and_(
+        pc.and_(
+            pc.greater_equal(groups["filepath_count"], min_partitions),
+            pc.equal(groups["shape_count_distinct"], 1),
+        ),
+        pc.invert(groups["excluded_any"]),
+    )
+    groups = groups.filter(candidates).sort_by("filepath_min")
+
+    # Everything under a candidate has to be one of its partitions
+    under = _paths_under(paths, groups["root"]).group_by("root").aggregate([("path", "count")])
+    under = dict(zip(under["root"].to_pylist(), under["path_count"].to_pylist()))
+    checkpoints = set(pc.filter(paths, pc.ends_with(paths, "/" + CHECKPOINT_FILENAME)).to_pylist())
+    dedicated = [
+        under.get(root, 0) == files_count + (dated and f"{root}/{CHECKPOINT_FILENAME}" in checkpoints)
+        for root, files_count, dated in zip(
+            groups["root"].to_pylist(), groups["filepath_count"].to_pylist(), groups["dated_all"].to_pylist()
+        )
+    ]
+    groups = groups.filter(pa.array(dedicated, pa.bool_()))
+
+    return pa.table({
+        "root": groups["root"],
+        "ext": groups["ext"],
+        "sample": groups["filepath_min"],
+        "files": groups["filepath_count"],
+        "collection_type": pc.if_else(groups["dated_all"], INCREMENTAL_DATASET, PARTITIONED_DATASET),
+    })
+
+
+def _paths_under(paths: "pa.ChunkedArray", roots: "pa.Array") -> "pa.Table":
+    # A (path index, root) row for every root a path is under. Paths are cut
+    # at each depth once, rather than scanned once per root.
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    components = pc.split_pattern(paths, "/")
+    depths = pc.list_value_length(components)
+    max_depth = pc.max(depths).as_py() or 0
+    indices, matched = [], []
+    for depth in range(1, max_depth):
+        prefixes = pc.binary_join(pc.list_slice(components, 0, depth), "/")
+        hit = pc.and_(pc.greater(depths, depth), pc.is_in(prefixes, value_set=roots))
+        hit = pc.fill_null(hit, False)
+        indices.append(np.flatnonzero(hit.to_numpy(zero_copy_only=False)))
+        matched.append(pc.filter(prefixes, hit))
+    if not indices:
+        return pa.table({"path": pa.array([], pa.int64()), "root": pa.array([], pa.string())})
+    return pa.table({
+        "path": np.concatenate(indices),
+        "root": pa.chunked_array([chunk for m in matched for chunk in m.chunks], pa.string()),
+    })
+
+
+def drop_collection_members(plan: "pa.Table", collections: "pa.Table") -> "pa.Table":
+    # Everything under a collection root is part of the collection
+    import numpy as np
+    import pyarrow.compute as pc
+
+    if not collections.num_rows or not plan.num_rows:
+        return plan
+    paths = plan["filepath"]
+    if os.sep != "/":
+        paths = pc.replace_substring(paths, os.sep, "/")
+    members = _paths_under(paths, collections["root"])["path"].to_numpy()
+    keep = np.ones(plan.num_rows, dtype=bool)
+    keep[members] = False
+    return plan.filter(keep)
+
+
+def to_collection_suggestions(collections: "pa.Table") -> List[CatalogEntrySuggestion]:
+    count(COLLECTIONS_FOUND, collections.num_rows)
+    count(COLLECTION_FILES, sum(collections["files"].to_pylist()))
+    return [
+        collection_suggestion(row["root"], row["sample"], row["collection_type"])
+        for row in collections.to_pylist()
+    ]
+
+
+def merge_collections(
+    suggestions: List[CatalogEntrySuggestion], collections: List[CatalogEntrySuggestion]
+) -> List[CatalogEntrySuggestion]:
+    # Collections take the place of their first partition among the sorted
+    # files, where the streaming walk yields them too. Versioned datasets stay last.
+    files = [s for s in suggestions if not s.is_versioned]
+    versioned = [s for s in suggestions if s.is_versioned]
+    return [*heapq.merge(files, collections, key=lambda s: s.filepath), *versioned]
+
+
+def _inside(path: str, root: str) -> bool:
+    return path.startswith(root + "/")
+
+
+def _ancestors(path: str) -> Iterator[str]:
+    parts = path.split("/")[:-1]
+    for i in range(1, len(parts) + 1):
+        yield "/".join(parts[:i])
+
+
+def group_collections(
+    suggestions: Iterable[CatalogEntrySuggestion],
+    min_partitions: int = DEFAULT_MIN_PARTITIONS,
+    exclude_names: Iterable[str] = (),
+) -> Iterator[CatalogEntrySuggestion]:
+    # Streaming find_collections for suggestions in walk order. The walk is
+    # depth-first, so a collection is complete once the walk leaves its root,
+    # and anything else turning up under it rules it out on the spot. Only the
+    # partitions of the directory being walked are held back.
+    exclude_names = set(exclude_names)
+    # Extension, shape and (suggestion, partition) members of each candidate root
+    pending: dict[str, tuple[str, str, list[tuple[CatalogEntrySuggestion, str]]]] = {}
+    disqualified: set[str] = set()
+    checkpoints: dict[str, CatalogEntrySuggestion] = {}
+    # Suggestions walked so far below each directory of the current path
+    seen_under: dict[str, int] = {}
+
+    def release(root: str) -> Iterator[CatalogEntrySuggestion]:
+        disqualified.add(root)
+        yield from (s for s, _ in pending.pop(root)[2])
+
+    def finish(root: str) -> Iterator[CatalogEntrySuggestion]:
+        _, _, members = pending.pop(root)
+        checkpoint = checkpoints.pop(root, None)
+        incremental = all(_date_re.search(partition) for _, partition in members)
+        if (
+            len(members) < min_partitions
+            or any(s.suggested_name.lower() in exclude_names for s, _ in members)
+            or (checkpoint is not None and not incremental)
+        ):
+            yield from (s for s, _ in members)
+            if checkpoint is not None:
+                yield checkpoint
+            return
+        count(COLLECTIONS_FOUND)
+        count(COLLECTION_FILES, len(members))
+        sample = min(s.filepath.replace(os.sep, "/") for s, _ in members)
+        yield collection_suggestion(root, sample, INCREMENTAL_DATASET if incremental else PARTITIONED_DATASET)
+
+    def leave(path: str | None) -> Iterator[CatalogEntrySuggestion]:
+        # Settles the directories the walk is no longer in
+        for root in [root for root in pending if path is None or not _inside(path, root)]:
+            yield from finish(root)
+        for root in [root for root in checkpoints if path is None or not _inside(path, root)]:
+            yield checkpoints.pop(root)
+        for d in [d for d in seen_under if path is None or not _inside(path, d)]:
+            del seen_under[d]
+        disqualified.difference_update([d for d in disqualified if path is None or not _inside(path, d)])
+
+    for s in suggestions:
+        path = s.filepath.replace(os.sep, "/")
+        yield from leave(path)
+        for d in _ancestors(path):
+            seen_under[d] = seen_under.get(d, 0) + 1
+
+        parent, _, name = path.rpartition("/")
+        if parent and name == CHECKPOINT_FILENAME:
+            # Held back until its directory turns out to be a collection or not,
+            # but it is not a partition of any collection above it
+            for candidate in [root for root in pending if _inside(parent, root)]:
+                yield from release(candidate)
+            checkpoints[parent] = s
+            continue
+
+        match = None if s.is_versioned else _partition_re.match(path)
+        ext = _extension_re.search(match.group("partition")) if match else None
+        key = None
+        if ext is not None:
+            root, partition = match.group("root"), match.group("partition")
+            key = (root, ext.group("ext").lower(), _digits_re.sub(SHAPE_PLACEHOLDER, partition))
+
+        # Anything under a candidate that is not one more of its partitions rules it out
+        for candidate in list(pending):
+            if key is None or key[0] != candidate or pending[candidate][:2] != key[1:]:
+                yield from release(candidate)
+        if key is None or key[0] in disqualified:
+            yield s
+        elif key[0] in pending:
+            pending[key[0]][2].append((s, partition))
+        elif seen_under[key[0]] - 1 - (key[0] in checkpoints):
+            # Something else was walked under it before its first partition
+            disqualified.add(key[0])
+            yield s
+        else:
+            pending[key[0]] = (key[1], key[2], [(s, partition)])
+
+    yield from leave(None)
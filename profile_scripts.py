@@ -0,0 +1,289 @@
+import csv
+import json
+import logging
+import os
+import posixpath
+import re
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+from xml.sax.saxutils import unescape
+
+from models import CatalogEntrySuggestion
+from resolver_scripts import CSV_DELIMITERS, HEADER_BYTES, _latest_version_file
+from telemetry_scripts import count, span
+
+logger = logging.getLogger(__name__)
+
+PROFILE_BYTES_READ = "profile.bytes_read"
+
+# Rows of a CSV head the column types are read from
+CSV_PROFILE_ROWS = 200
+# The header row and dimension record sit at the start of a sheet
+SHEET_HEAD_BYTES = 64 * 1024
+
+ARROW_DTYPES = {
+    "int": "int64[pyarrow]",
+    "float": "double[pyarrow]",
+    "bool": "bool[pyarrow]",
+    "str": "string[pyarrow]",
+}
+BOOL_VALUES = {"true", "false"}
+
+EXCEL_ENGINES = {".xlsx": "openpyxl", ".xlsm": "openpyxl", ".xls": "xlrd"}
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+SHEET_PATTERN = re.compile(rb'<sheet\b[^>]*?\br:id="([^"]+)"')
+RELATIONSHIP_PATTERN = re.compile(rb"<Relationship\b([^>]*)>")
+ATTRIBUTE_PATTERN = re.compile(rb'\b(\w+)="([^"]*)"')
+DIMENSION_PATTERN = re.compile(rb'<dimension\s+ref="([A-Z]+)\d+(?::([A-Z]+)\d+)?"')
+FIRST_ROW_PATTERN = re.compile(rb"<row\b[^>]*>(.*?)</row>", re.S)
+CELL_PATTERN = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+CELL_TYPE_PATTERN = re.compile(rb'\bt="([^"]+)"')
+CELL_VALUE_PATTERN = re.compile(rb"<(?:v|t)(?:\s[^>]*)?>(.*?)</(?:v|t)>", re.S)
+
+
+def _read_head(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        head = f.read(size)
+    count(PROFILE_BYTES_READ, len(head))
+    return head
+
+
+def _value_kind(value: str) -> str | None:
+    if value == "":
+        return None
+    if value.lower() in BOOL_VALUES:
+        return "bool"
+    try:
+        int(value)
+        return "int"
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return "float"
+    except ValueError:
+        return "str"
+
+
+def _column_kind(kinds: set[str]) -> str:
+    if kinds <= {"int"}:
+        return "int"
+    if kinds <= {"int", "float"}:
+        return "float"
+    if kinds <= {"bool"}:
+        return "bool"
+    return "str"
+
+
+def _usecols(header: List[str], columns: set[str] | None) -> List[str] | None:
+    # Only worth it when the pipeline is known to read a strict subset
+    if not columns or not columns < set(header):
+        return None
+    return [name for name in header if name in columns]
+
+
+def profile_csv(path: str, columns: set[str] | None = None) -> dict:
+    head = _read_head(path, HEADER_BYTES)
+    complete = len(head) < HEADER_BYTES
+    try:
+        text = head.decode("utf-8")
+    except UnicodeDecodeError:
+        return {}
+    lines = text.splitlines()
+    if not complete:
+        # The last line of a truncated head may be cut in half
+        lines = lines[:-1]
+    # Types seen in every row can be pinned as they are
+    seen_all = complete and len(lines) <= CSV_PROFILE_ROWS + 1
+    lines = lines[: CSV_PROFILE_ROWS + 1]
+    if len(lines) < 2:
+        return {}
+
+    try:
+        dialect = csv.Sniffer().sniff("\n".join(lines[:20]), delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        return {}
+    header, *rows = list(csv.reader(lines, dialect))
+    if len(set(header)) != len(header) or any(len(row) != len(header) for row in rows if row):
+        return {}
+
+    load_args = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+    if dialect.delimiter != ",":
+        load_args["sep"] = dialect.delimiter
+
+    usecols = _usecols(header, columns)
+    dtype = {}
+    for i, name in enumerate(header):
+        if usecols is not None and name not in usecols:
+            continue
+        kinds = {kind for row in rows if row and (kind := _value_kind(row[i])) is not None}
+        if not kinds:
+            continue
+        kind = _column_kind(kinds)
+        if not seen_all and kind != "str":
+            # Rows further down may not fit the head's type, only strings
+            # take any value. Other columns are left to the reader.
+            continue
+        dtype[name] = ARROW_DTYPES[kind]
+    if dtype:
+        load_args["dtype"] = dtype
+    if usecols is not None:
+        load_args["usecols"] = usecols
+    return {"load_args": load_args}
+
+
+def profile_parquet(path: str, columns: set[str] | None = None) -> dict:
+    import pyarrow.parquet as pq
+
+    # Only the footer is read
+    metadata = pq.read_metadata(path)
+    count(PROFILE_BYTES_READ, metadata.serialized_size + 8)
+    load_args = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+    usecols = _usecols(metadata.schema.to_arrow_schema().names, columns)
+    if usecols is not None:
+        load_args["columns"] = usecols
+    return {"load_args": load_args, "save_args": {"engine": "pyarrow"}}
+
+
+def _first_sheet(zf: zipfile.ZipFile) -> str | None:
+    workbook = zf.read("xl/workbook.xml")
+    rels = zf.read("xl/_rels/workbook.xml.rels")
+    count(PROFILE_BYTES_READ, len(workbook) + len(rels))
+    sheet = SHEET_PATTERN.search(workbook)
+    if sheet is None:
+        return None
+    targets = {}
+    for attributes in RELATIONSHIP_PATTERN.findall(rels):
+        attributes = dict(ATTRIBUTE_PATTERN.findall(attributes))
+        targets[attributes.get(b"Id")] = attributes.get(b"Target")
+    target = targets.get(sheet.group(1))
+    if target is None:
+        return None
+    target = target.decode()
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def _shared_strings(zf: zipfile.ZipFile, wanted: set[int]) -> dict[int, str]:
+    # Streamed, and only up to the last string the header refers to
+    strings = {}
+    if not wanted or "xl/sharedStrings.xml" not in zf.namelist():
+        return strings
+    last = max(wanted)
+    with zf.open("xl/sharedStrings.xml") as f:
+        for i, (_, element) in enumerate(
+            (e for e in ElementTree.iterparse(f) if e[1].tag == f"{XLSX_NS}si")
+        ):
+            if i in wanted:
+                strings[i] = "".join(t.text or "" for t in element.iter(f"{XLSX_NS}t"))
+            element.clear()
+            if i >= last:
+                break
+    return strings
+
+
+def _sheet_header(zf: zipfile.ZipFile, sheet: str) -> List[str] | None:
+    with zf.open(sheet) as f:
+        head = f.read(SHEET_HEAD_BYTES)
+    count(PROFILE_BYTES_READ, len(head))
+    if DIMENSION_PATTERN.search(head) is None:
+        return None
+    row = FIRST_ROW_PATTERN.search(head)
+    if row is None:
+        return None
+
+    cells = []
+    for attributes, body in CELL_PATTERN.findall(row.group(1)):
+        cell_type = CELL_TYPE_PATTERN.search(attributes)
+        value = CELL_VALUE_PATTERN.search(body or b"")
+        cells.append((cell_type.group(1) if cell_type else b"n", unescape(value.group(1).decode()) if value else ""))
+
+    shared = _shared_strings(zf, {int(value) for cell_type, value in cells if cell_type == b"s" and value.isdigit()})
+    return [shared.get(int(value), "") if cell_type == b"s" else value for cell_type, value in cells]
+
+
+def profile_excel(path: str, columns: set[str] | None = None) -> dict:
+    ext = os.path.splitext(path)[1].lower()
+    engine = EXCEL_ENGINES.get(ext)
+    if engine is None:
+        return {}
+    load_args = {"engine": engine, "dtype_backend": "pyarrow"}
+    if engine == "openpyxl" and columns:
+        # Sheet and header names come from the archive without loading a cell
+        with zipfile.ZipFile(path) as zf:
+            sheet = _first_sheet(zf)
+            header = _sheet_header(zf, sheet) if sheet is not None else None
+        usecols = _usecols(header or [], columns)
+        if usecols is not None:
+            load_args["usecols"] = usecols
+    return {"load_args": load_args}
+
+
+def profile_json(path: str, columns: set[str] | None = None) -> dict:
+    head = _read_head(path, HEADER_BYTES)
+    complete = len(head) < HEADER_BYTES
+    text = head.decode("utf-8", errors="ignore")
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not complete:
+        lines = lines[:-1]
+
+    if len(lines) >= 2:
+        try:
+            records = [json.loads(line) for line in lines]
+        except ValueError:
+            records = None
+        if records is not None and all(isinstance(r, dict) for r in records):
+            return {
+                "load_args": {"lines": True, "engine": "pyarrow", "dtype_backend": "pyarrow"},
+                "save_args": {"orient": "records", "lines": True},
+            }
+
+    if text.lstrip()[:1] == "[":
+        return {"load_args": {"orient": "records", "dtype_backend": "pyarrow"}, "save_args": {"orient": "records"}}
+    return {"load_args": {"dtype_backend": "pyarrow"}}
+
+
+PROFILERS = {
+    "pandas.CSVDataset": profile_csv,
+    "pandas.ParquetDataset": profile_parquet,
+    "pandas.ExcelDataset": profile_excel,
+    "pandas.JSONDataset": profile_json,
+}
+
+
+def profile_dataset(path: str, dataset_type: str | None, columns: set[str] | None = None) -> dict:
+    # ``load_args`` and ``save_args`` for a catalog entry, from file metadata
+    # only. Anything unreadable just gets no arguments.
+    profiler = PROFILERS.get(dataset_type)
+    if profiler is None:
+        return {}
+    if os.path.isdir(path):
+        path = _latest_version_file(path)
+        if path is None:
+            return {}
+    try:
+        return profiler(path, columns)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        logger.warning("Could not profile %s: %s", path, e)
+        return {}
+
+
+def profile_datasets(
+    suggestions: List[CatalogEntrySuggestion],
+    data_dir: str = "data",
+    column_usage: dict[str, set[str] | None] | None = None,
+):
+    # Updates the suggestions in place
+    column_usage = column_usage or {}
+    with span("profile", datasets=len(suggestions)):
+        for s in suggestions:
+            path = os.path.join(data_dir, s.filepath)
+            if not os.path.exists(path):
+                continue
+            args = profile_dataset(path, s.suggested_type, column_usage.get(s.suggested_name.lower()))
+            # On top of what the resolver found the entry needs
+            if "load_args" in args:
+                s.load_args = {**(s.load_args or {}), **args["load_args"]}
+            if "save_args" in args:
+                s.save_args = {**(s.save_args or {}), **args["save_args"]}
@@ -0,0 +1,125 @@
+import posixpath
+
+from telemetry_scripts import SNIFF_BYTES_READ, count
+
+REMOTE_LISTINGS = "remote.listings"
+
+# URLs with these protocols are plain local paths
+LOCAL_PROTOCOLS = {"file", "local"}
+# Where object stores report a content hash in their listings, in order of preference
+ETAG_KEYS = ("ETag", "etag", "md5Hash", "mtime", "LastModified", "created")
+
+
+def is_url(path: str) -> bool:
+    return "://" in path
+
+
+def is_remote(path: str) -> bool:
+    protocol, sep, _ = path.partition("://")
+    return bool(sep) and protocol not in LOCAL_PROTOCOLS
+
+
+def local_path(path: str) -> str:
+    # ``file://`` URLs are scanned like any local directory
+    protocol, sep, rest = path.partition("://")
+    return rest if sep and protocol in LOCAL_PROTOCOLS else path
+
+
+def catalog_root(data_dir: str) -> str:
+    # Generated filepaths keep the protocol of a data folder given as a URL,
+    # local folders are written relative to the project like Kedro expects
+    return data_dir.rstrip("/") if is_url(data_dir) else "data"
+
+
+def _filesystem(url: str):
+    # fsspec caches instances, so every call for a bucket shares one client
+    # and its listings cache
+    from fsspec.core import url_to_fs
+
+    return url_to_fs(url)
+
+
+def _etag(info: dict) -> str | None:
+    for key in ETAG_KEYS:
+        value = info.get(key)
+        if value is not None:
+            return str(value).strip('"')
+    return None
+
+
+def is_remote_dir(url: str) -> bool:
+    fs, path = _filesystem(url)
+    return fs.isdir(path)
+
+
+def list_remote_directory(url: str, with_stat: bool = True) -> tuple[dict[str, list | None], list[str]]:
+    # One bulk listing per directory. Object stores page through it with a
+    # delimiter, and report the size and ETag of every object on the way, so
+    # no object is looked up on its own.
+    fs, path = _filesystem(url)
+    path = path.rstrip("/")
+    entries = fs.ls(path, detail=True)
+    count(REMOTE_LISTINGS)
+
+    files = {}
+    subdirs = []
+    for info in entries:
+        name = posixpath.basename(info["name"].rstrip("/"))
+        if not name or info["name"].rstrip("/") == path:
+            continue
+        if info["type"] == "directory":
+            subdirs.append(name)
+        else:
+            files[name] = [info.get("size"), _etag(info)] if with_stat else None
+    return dict(sorted(files.items())), sorted(subdirs)
+
+
+def latest_version_url(url: str) -> str | None:
+    fs, path = _filesystem(url)
+    basename = posixpath.basename(path.rstrip("/"))
+    for version in sorted(fs.ls(path, detail=False), reverse=True):
+        candidate = posixpath.join(version, basename)
+        if fs.isfile(candidate):
+            return fs.unstrip_protocol(candidate)
+    return None
+
+
+def read_remote_head_tail(url: str, head_bytes: int, tail_bytes: int) -> tuple[str | None, int, bytes, bytes]:
+    # Ranged reads of the start and end of an object, or of the latest save of
+    # a versioned dataset. Returns the object read, its size, head and tail.
+    fs, path = _filesystem(url)
+    info = fs.info(path)
+    if info["type"] == "directory":
+        url = latest_version_url(url)
+        if url is None:
+            return None, 0, b"", b""
+        fs, path = _filesystem(url)
+        info = fs.info(path)
+
+    size = info.get("size") or 0
+    if size <= head_bytes:
+        data = fs.cat_file(path) if size else b""
+        count(SNIFF_BYTES_READ, len(data))
+        return url, size, data, data[-tail_bytes:]
+    head = fs.cat_file(path, start=0, end=head_bytes)
+    tail = fs.cat_file(path, start=size - tail_bytes, end=size)
+    count(SNIFF_BYTES_READ, len(head) + len(tail))
+    return url, size, head, tail
+
+
+def read_remote_file(url: str) -> bytes:
+    fs, path = _filesystem(url)
+    return fs.cat_file(path)
+
+
+def remote_fingerprint(url: str) -> list | None:
+    # The ETag changes with the content. s3fs and gcsfs answer ``info`` from
+    # the listings cache filled by the scan.
+    fs, path = _filesystem(url)
+    try:
+        info = fs.info(path)
+    except (OSError, FileNotFoundError):
+        return None
+    if info["type"] == "directory":
+        return [url, "dir"]
+    return [url, info.get("size"), _etag(info)]
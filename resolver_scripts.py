@@ -0,0 +1,213 @@
+import csv
+import json
+import mmap
+import os
+import zipfile
+from typing import List
+
+from models import CatalogEntrySuggestion
+from remote_scripts import is_remote, read_remote_head_tail
+from telemetry_scripts import SNIFF_BYTES_READ, count
+
+EXT_TO_KEDRO_DATASET = {
+    ".csv": "pandas.CSVDataset",
+    ".parquet": "pandas.ParquetDataset",
+    ".xlsx": "pandas.ExcelDataset",
+    ".xls": "pandas.ExcelDataset",
+    ".xml": "pandas.XMLDataset",
+    ".yaml": "yaml.YAMLDataset",
+    ".yml": "yaml.YAMLDataset",
+}
+
+# Entries resolved with at least this confidence are not sent to the model
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+HEADER_BYTES = 64 * 1024
+# Below this size a plain read is cheaper than setting up a mapping
+MMAP_MIN_SIZE = 1024 * 1024
+
+CSV_DELIMITERS = ",;\t|"
+CSV_SAMPLE_LINES = 20
+
+PARQUET_MAGIC = b"PAR1"
+ARROW_MAGIC = b"ARROW1"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+HDF5_MAGIC = b"\x89HDF\r\n\x1a\n"
+PICKLE_PROTOCOLS = {2, 3, 4, 5}
+
+
+def _read_head_tail(path: str, size: int, tail_bytes: int = len(PARQUET_MAGIC)) -> tuple[bytes, bytes]:
+    with open(path, "rb") as f:
+        if size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                head, tail = m[:HEADER_BYTES], m[-tail_bytes:]
+                count(SNIFF_BYTES_READ, len(head) + len(tail))
+                return head, tail
+        head = f.read(HEADER_BYTES)
+        if size <= len(head):
+            tail = head[-tail_bytes:]
+        else:
+            f.seek(max(size - tail_bytes, len(head)))
+            tail = f.read(tail_bytes)
+    count(SNIFF_BYTES_READ, len(head) + (len(tail) if size > len(head) else 0))
+    return head, tail
+
+
+def _latest_version_file(path: str) -> str | None:
+    # Versioned datasets are stored as <filepath>/<timestamp>/<basename>, and
+    # Kedro's timestamps sort chronologically
+    basename = os.path.basename(path)
+    for version in sorted(os.listdir(path), reverse=True):
+        candidate = os.path.join(path, version, basename)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _sniff_json(text: str, complete: bool) -> tuple[str | None, float, dict]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not complete:
+        # The last line of a truncated header may be cut in half
+        lines = lines[:-1]
+
+    if len(lines) >= 2:
+        try:
+            records = [json.loads(line) for line in lines[:CSV_SAMPLE_LINES]]
+        except ValueError:
+            pass
+        else:
+            if all(isinstance(r, dict) for r in records):
+                # One record per line, read and written back the same way
+                args = {"load_args": {"lines": True}, "save_args": {"orient": "records", "lines": True}}
+                return "pandas.JSONDataset", 0.85, args
+
+    if not complete:
+        return "json.JSONDataset", 0.8, {}
+
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return None, 0.0, {}
+
+    if isinstance(document, dict) and {"data", "layout"} <= document.keys():
+        # Could be a plotly.PlotlyDataset or plotly.JSONDataset, the code decides
+        return "plotly.JSONDataset", 0.7, {}
+    return "json.JSONDataset", 0.9, {}
+
+
+def _sniff_delimited(text: str, ext: str) -> tuple[str | None, float, dict]:
+    sample_lines = text.splitlines()[:CSV_SAMPLE_LINES]
+    if len(sample_lines) < 2:
+        return None, 0.0, {}
+
+    sample = "\n".join(sample_lines)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        return None, 0.0, {}
+
+    widths = {len(row) for row in csv.reader(sample_lines, dialect) if row}
+    if len(widths) != 1 or widths.pop() < 2:
+        return None, 0.0, {}
+    args = {}
+    if dialect.delimiter != ",":
+        # Saved back with the same separator
+        args = {"load_args": {"sep": dialect.delimiter}, "save_args": {"sep": dialect.delimiter}}
+    return "pandas.CSVDataset", 0.95 if ext in {".csv", ".tsv"} else 0.6, args
+
+
+def sniff_dataset_type(path: str) -> tuple[str | None, float]:
+    dataset_type, confidence, _ = sniff_dataset(path)
+    return dataset_type, confidence
+
+
+def sniff_dataset(path: str) -> tuple[str | None, float, dict]:
+    # The type, how sure the sniffing is of it, and the ``load_args`` and
+    # ``save_args`` the entry cannot load without
+    if is_remote(path):
+        try:
+            path, size, head, tail = read_remote_head_tail(path, HEADER_BYTES, len(PARQUET_MAGIC))
+        except OSError:
+            return None, 0.0, {}
+        if path is None or size == 0:
+            return None, 0.0, {}
+    else:
+        if os.path.isdir(path):
+            path = _latest_version_file(path)
+            if path is None:
+                return None, 0.0, {}
+
+        try:
+            size = os.path.getsize(path)
+            if size == 0:
+                return None, 0.0, {}
+            head, tail = _read_head_tail(path, size)
+        except OSError:
+            return None, 0.0, {}
+
+    ext = os.path.splitext(path)[1].lower()
+
+    if head.startswith(PARQUET_MAGIC) and tail == PARQUET_MAGIC:
+        return "pandas.ParquetDataset", 0.99, {}
+    if head.startswith(ARROW_MAGIC):
+        return "pandas.FeatherDataset", 0.95, {}
+    if head.startswith(HDF5_MAGIC):
+        # The entry needs the key of a group inside the file, which the
+        # header does not give, so it is left to the model
+        return "pandas.HDFDataset", 0.6, {}
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(path) as zf:
+                # Only the central directory is read, not the compressed members
+                is_workbook = "xl/workbook.xml" in zf.namelist()
+        except zipfile.BadZipFile:
+            return None, 0.0, {}
+        return ("pandas.ExcelDataset", 0.97, {}) if is_workbook else (None, 0.0, {})
+    if head.startswith(OLE2_MAGIC):
+        return ("pandas.ExcelDataset", 0.9, {}) if ext == ".xls" else (None, 0.0, {})
+    if head[:1] == b"\x80" and len(head) > 1 and head[1] in PICKLE_PROTOCOLS:
+        return "pickle.PickleDataset", 0.95 if ext in {".pkl", ".pickle"} else 0.7, {}
+
+    complete = size <= HEADER_BYTES
+    try:
+        text = head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character may straddle the end of a truncated header
+        if complete or e.start < len(head) - 3:
+            return None, 0.0, {}
+        text = head[: e.start].decode("utf-8")
+
+    stripped = text.lstrip()
+    if ext in {".json", ".jsonl", ".ndjson"} or stripped[:1] in {"{", "["}:
+        return _sniff_json(text, complete)
+    if ext in {".yaml", ".yml"}:
+        return "yaml.YAMLDataset", 0.9, {}
+    if ext == ".xml" and stripped.startswith("<"):
+        return "pandas.XMLDataset", 0.85, {}
+
+    dataset_type, confidence, args = _sniff_delimited(text, ext)
+    if dataset_type is not None:
+        return dataset_type, confidence, args
+    if ext in {".txt", ".md", ".log"}:
+        return "text.TextDataset", 0.6, {}
+    return None, 0.0, {}
+
+
+def resolve_dataset_types(
+    suggestions: List[CatalogEntrySuggestion],
+    data_dir: str = "data",
+    threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+) -> List[CatalogEntrySuggestion]:
+    # Updates the suggestions in place and returns the ones left for the model
+    unresolved = []
+    for s in suggestions:
+        dataset_type, confidence, args = sniff_dataset(os.path.join(data_dir, s.filepath))
+        s.confidence = confidence
+        if dataset_type is not None and confidence >= threshold:
+            s.suggested_type = dataset_type
+            s.load_args = args.get("load_args")
+            s.save_args = args.get("save_args")
+        else:
+            unresolved.append(s)
+    return unresolved
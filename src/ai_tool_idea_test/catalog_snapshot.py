@@ -0,0 +1,77 @@
+"""Precompiled snapshots of the generated ``auto_catalog.yml``.
+
+A snapshot is the catalog as JSON, one ``[name, entry]`` line per entry,
+followed by the SHA-256 of the YAML it was written with. It is only trusted
+while that hash still matches the YAML on disk, so hand edits to the YAML
+always win. Catalog entries are plain data, and JSON never runs code when it
+is loaded, unlike pickle, which matters for a file under ``conf/base``.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import yaml
+
+SNAPSHOT_MAGIC = b"AUTOCAT2"
+DIGEST_SIZE = 64
+
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def snapshot_path_for(catalog_path: Union[str, Path]) -> str:
+    # Kept next to the YAML as a hidden file, which no config pattern matches
+    catalog_path = Path(catalog_path)
+    return str(catalog_path.with_name(f".{catalog_path.name}.snapshot"))
+
+
+def file_sha256(path: Union[str, Path]) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def snapshot_digest(snapshot_path: Union[str, Path]) -> Optional[str]:
+    try:
+        with open(snapshot_path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            f.seek(-DIGEST_SIZE, os.SEEK_END)
+            return f.read(DIGEST_SIZE).decode("ascii")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def read_snapshot(snapshot_path: Union[str, Path], catalog_path: Union[str, Path]) -> Optional[dict[str, Any]]:
+    # None if the snapshot is missing, corrupt or was written for other YAML
+    digest = snapshot_digest(snapshot_path)
+    if digest is None or digest != file_sha256(catalog_path):
+        return None
+
+    catalog = {}
+    try:
+        with open(snapshot_path, "rb") as f:
+            body = f.read()[len(SNAPSHOT_MAGIC):-DIGEST_SIZE]
+        for line in body.splitlines():
+            name, entry = json.loads(line)
+            catalog[name] = entry
+    except (OSError, ValueError, TypeError):
+        return None
+    return catalog
+
+
+def load_generated_catalog(catalog_path: Union[str, Path]) -> dict[str, Any]:
+    if not os.path.exists(catalog_path):
+        return {}
+
+    catalog = read_snapshot(snapshot_path_for(catalog_path), catalog_path)
+    if catalog is None:
+        with open(catalog_path, "rb") as f:
+            catalog = yaml.load(f, Loader=_SafeLoader) or {}
+    return catalog
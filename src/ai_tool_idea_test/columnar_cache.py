@@ -0,0 +1,77 @@
+"""Parquet copies of raw datasets that are slow to parse.
+
+The generated catalog pairs such a dataset with its transcoded cache, e.g.
+``shuttles@excel`` and ``shuttles@parquet``. The cache entry's metadata names
+its source, and a stamp file next to the cache records the SHA-256 of the
+source it was converted from. The cache is rebuilt whenever that hash no
+longer matches, and only stat results are compared while the source is
+untouched.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ai_tool_idea_test.catalog_snapshot import file_sha256
+
+logger = logging.getLogger(__name__)
+
+METADATA_KEY = "autocatalog"
+
+
+def cache_source(dataset) -> Optional[dict[str, str]]:
+    # ``source``, ``source_filepath`` and ``stamp`` of a cache entry, None for
+    # any other dataset
+    metadata = getattr(dataset, "metadata", None) or {}
+    source = metadata.get(METADATA_KEY)
+    if not isinstance(source, dict) or not {"source", "source_filepath", "stamp"} <= source.keys():
+        return None
+    return source
+
+
+def _read_stamp(stamp_path: Union[str, Path]) -> dict[str, Any]:
+    try:
+        with open(stamp_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_fresh(source_filepath: Union[str, Path], stamp_path: Union[str, Path]) -> bool:
+    stamp = _read_stamp(stamp_path)
+    try:
+        stat = os.stat(source_filepath)
+    except OSError:
+        return False
+    if stamp.get("size") == stat.st_size and stamp.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    # Touched or copied over, but possibly with the same content
+    return stamp.get("sha256") is not None and stamp.get("sha256") == file_sha256(source_filepath)
+
+
+def write_stamp(source_filepath: Union[str, Path], stamp_path: Union[str, Path]):
+    stat = os.stat(source_filepath)
+    stamp = {"sha256": file_sha256(source_filepath), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    os.makedirs(os.path.dirname(stamp_path) or ".", exist_ok=True)
+    tmp_path = f"{stamp_path}.partial"
+    with open(tmp_path, "w") as f:
+        json.dump(stamp, f)
+    os.replace(tmp_path, stamp_path)
+
+
+def refresh_cache(catalog, cache_name: str) -> bool:
+    """Converts the source of ``cache_name`` again if it changed.
+
+    Returns whether the cache was rebuilt. The stamp is written after the
+    cache, so a conversion that fails half way is retried on the next call.
+    """
+    source = cache_source(catalog.get(cache_name))
+    if source is None:
+        raise ValueError(f"'{cache_name}' is not a transcoded cache entry")
+    if is_fresh(source["source_filepath"], source["stamp"]):
+        return False
+
+    catalog.save(cache_name, catalog.load(source["source"]))
+    write_stamp(source["source_filepath"], source["stamp"])
+    return True
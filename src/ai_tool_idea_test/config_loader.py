@@ -0,0 +1,31 @@
+"""Config loader that adds the generated ``auto_catalog.yml`` to the catalog."""
+from pathlib import Path
+from typing import Any
+
+from kedro.config import MissingConfigException, OmegaConfigLoader
+
+from ai_tool_idea_test.catalog_snapshot import load_generated_catalog
+
+AUTO_CATALOG_FILE = "auto_catalog.yml"
+
+
+class AutoCatalogConfigLoader(OmegaConfigLoader):
+    """``OmegaConfigLoader`` that also serves the generated catalog entries.
+
+    The generated entries are plain data without interpolations, so they skip
+    OmegaConf entirely and come from the precompiled snapshot when it is up to
+    date with the YAML. Hand-written entries take precedence over generated ones.
+    """
+
+    def __getitem__(self, key: str) -> dict[str, Any]:
+        if key != "catalog" or key in self or self._protocol != "file":
+            return super().__getitem__(key)
+
+        generated = load_generated_catalog(Path(self.conf_source) / self.base_env / AUTO_CATALOG_FILE)
+        try:
+            catalog = super().__getitem__(key)
+        except MissingConfigException:
+            if not generated:
+                raise
+            catalog = {}
+        return {**generated, **catalog}
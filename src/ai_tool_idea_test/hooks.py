@@ -0,0 +1,127 @@
+"""Hooks that catalogue the inputs of a run on demand.
+
+Register ``AutoCatalogHooks`` in ``settings.HOOKS`` to have the free inputs of
+the selected pipeline that no catalog covers found under ``data/`` and typed
+right before the run, instead of cataloguing the whole data folder up front.
+``TranscodeCacheHooks`` has the inputs with a generated Parquet cache read
+from that cache instead of their slow raw files.
+"""
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from kedro.framework.hooks import hook_impl
+from kedro.io import AbstractDataset
+from kedro.pipeline import Pipeline
+
+from ai_tool_idea_test.columnar_cache import cache_source, refresh_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _is_parameter(name: str) -> bool:
+    return name == "parameters" or name.startswith("params:")
+
+
+def _load_resolver(project_path: Path):
+    # The cataloguing tools live at the project root, next to main.py, which
+    # is not on the path when running through the kedro CLI
+    try:
+        from tool_scripts import resolve_named_datasets
+    except ImportError:
+        sys.path.insert(0, str(project_path))
+        from tool_scripts import resolve_named_datasets
+    return resolve_named_datasets
+
+
+class AutoCatalogHooks:
+    """Types and registers the pipeline inputs missing from the catalog.
+
+    Only the selected pipeline is looked at, so ``kedro run --pipeline
+    data_science`` never pays for the reporting outputs or unrelated raw files.
+    Datasets are typed by the local resolvers first, the model is only asked
+    about the rest and its verdicts are cached. Entries are registered lazily,
+    like the ones from the catalog files.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = "data",
+        cache_path: Optional[str] = ".autocatalog/inference_cache.sqlite",
+        backend: Optional[str] = None,
+        backend_options: Optional[dict] = None,
+    ):
+        self.data_dir = data_dir
+        self.cache_path = cache_path
+        self.backend = backend
+        self.backend_options = backend_options
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: dict[str, Any], pipeline: Pipeline, catalog) -> None:
+        missing = sorted(
+            name for name in pipeline.inputs() if not _is_parameter(name) and name not in catalog
+        )
+        if not missing:
+            return
+
+        project_path = Path(run_params.get("project_path") or Path.cwd())
+        options = {"cache_path": self.cache_path, "backend_options": self.backend_options}
+        if self.backend is not None:
+            options["backend"] = self.backend
+        try:
+            resolve_named_datasets = _load_resolver(project_path)
+            entries = resolve_named_datasets(missing, data_dir=str(project_path / self.data_dir), **options)
+        except Exception as e:
+            # Kedro reports the inputs that stay missing once the run starts
+            logger.warning("Could not catalogue %s: %s", ", ".join(missing), e)
+            return
+
+        for name, config in entries.items():
+            _register(catalog, name, config)
+        logger.info("Catalogued %d of %d missing inputs on demand: %s", len(entries), len(missing), ", ".join(entries))
+
+
+class TranscodeCacheHooks:
+    """Serves raw inputs from their transcoded Parquet caches.
+
+    For every free input ``name`` of the run with a generated ``name@parquet``
+    cache, the cache is converted again if its source changed, and ``name``
+    is pointed at it for the run, so the nodes keep their input names. Inputs
+    already using the ``@parquet`` name are only refreshed. A cache that cannot
+    be built leaves its input reading the raw file.
+    """
+
+    def __init__(self, redirect: bool = True):
+        self.redirect = redirect
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: dict[str, Any], pipeline: Pipeline, catalog) -> None:
+        for name in sorted(pipeline.inputs()):
+            if _is_parameter(name):
+                continue
+            base, _, suffix = name.partition("@")
+            cache_name = f"{base}@parquet"
+            if suffix not in ("", "parquet") or cache_name not in catalog:
+                continue
+            cache = catalog.get(cache_name)
+            if cache_source(cache) is None:
+                continue
+
+            try:
+                if refresh_cache(catalog, cache_name):
+                    logger.info("Converted '%s' to '%s'", cache_source(cache)["source"], cache_name)
+            except Exception as e:
+                logger.warning("Could not build '%s', reading '%s' from its source: %s", cache_name, name, e)
+                continue
+            if self.redirect and not suffix:
+                catalog[name] = cache
+
+
+def _register(catalog, name: str, config: dict[str, Any]):
+    add_from_config = getattr(catalog, "_add_from_config", None)
+    if add_from_config is not None:
+        # Materialised on first use, with the catalog's save version
+        add_from_config(name, config)
+    else:
+        catalog[name] = AbstractDataset.from_config(name, config)
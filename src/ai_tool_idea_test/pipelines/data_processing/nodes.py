@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -17,6 +18,50 @@ def _parse_money(x: pd.Series) -> pd.Series:
     return x
 
 
+# Inputs loaded with ``dtype_backend: pyarrow`` take the Arrow path below:
+# columns are parsed with pyarrow.compute kernels and the model input table
+# is joined on row numbers, so each column is gathered once at the end.
+
+
+def _is_arrow_backed(*dfs: pd.DataFrame) -> bool:
+    return any(isinstance(dtype, pd.ArrowDtype) for df in dfs for dtype in df.dtypes)
+
+
+def _to_arrow(x: pd.Series):
+    import pyarrow as pa
+
+    # Zero-copy for Arrow-backed columns
+    if isinstance(x.dtype, pd.ArrowDtype):
+        return x.array.__arrow_array__()
+    return pa.chunked_array([pa.array(x, from_pandas=True)])
+
+
+def _from_arrow(values, like: pd.Series) -> pd.Series:
+    return pd.Series(pd.arrays.ArrowExtensionArray(values), index=like.index, name=like.name)
+
+
+def _is_true_arrow(x: pd.Series) -> pd.Series:
+    import pyarrow.compute as pc
+
+    return _from_arrow(pc.fill_null(pc.equal(_to_arrow(x), "t"), False), x)
+
+
+def _parse_percentage_arrow(x: pd.Series) -> pd.Series:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.cast(pc.replace_substring(_to_arrow(x), "%", ""), pa.float64())
+    return _from_arrow(pc.divide(values, 100.0), x)
+
+
+def _parse_money_arrow(x: pd.Series) -> pd.Series:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.replace_substring(pc.replace_substring(_to_arrow(x), "$", ""), ",", "")
+    return _from_arrow(pc.cast(values, pa.float64()), x)
+
+
 def preprocess_companies(companies: pd.DataFrame) -> pd.DataFrame:
     """Preprocesses the data for companies.
 
@@ -26,6 +71,10 @@ def preprocess_companies(companies: pd.DataFrame) -> pd.DataFrame:
         Preprocessed data, with `company_rating` converted to a float and
         `iata_approved` converted to boolean.
     """
+    if _is_arrow_backed(companies):
+        companies["iata_approved"] = _is_true_arrow(companies["iata_approved"])
+        companies["company_rating"] = _parse_percentage_arrow(companies["company_rating"])
+        return companies
     companies["iata_approved"] = _is_true(companies["iata_approved"])
     companies["company_rating"] = _parse_percentage(companies["company_rating"])
     return companies
@@ -40,12 +89,124 @@ def preprocess_shuttles(shuttles: pd.DataFrame) -> pd.DataFrame:
         Preprocessed data, with `price` converted to a float and `d_check_complete`,
         `moon_clearance_complete` converted to boolean.
     """
+    if _is_arrow_backed(shuttles):
+        shuttles["d_check_complete"] = _is_true_arrow(shuttles["d_check_complete"])
+        shuttles["moon_clearance_complete"] = _is_true_arrow(shuttles["moon_clearance_complete"])
+        shuttles["price"] = _parse_money_arrow(shuttles["price"])
+        return shuttles
     shuttles["d_check_complete"] = _is_true(shuttles["d_check_complete"])
     shuttles["moon_clearance_complete"] = _is_true(shuttles["moon_clearance_complete"])
     shuttles["price"] = _parse_money(shuttles["price"])
     return shuttles
 
 
+def _join_rows(left_keys, right_keys):
+    # Row numbers of the inner join of two key columns, in no particular
+    # order. Null keys never match, but pandas matches them only for rows
+    # ``dropna`` removes anyway.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if right_keys.type != left_keys.type:
+        right_keys = pc.cast(right_keys, left_keys.type)
+    left = pa.table({"key": left_keys, "left": pa.array(np.arange(len(left_keys)))})
+    right = pa.table({"key": right_keys, "right": pa.array(np.arange(len(right_keys)))})
+    joined = left.join(right, "key", join_type="inner")
+    return joined["left"], joined["right"]
+
+
+def _complete_rows(columns: dict):
+    import pyarrow.compute as pc
+
+    complete = None
+    for values in columns.values():
+        valid = pc.invert(pc.is_null(values, nan_is_null=True))
+        complete = valid if complete is None else pc.and_(complete, valid)
+    return complete
+
+
+def _to_numpy_dtypes(columns: dict, sources: dict) -> pd.DataFrame:
+    # The dtypes the numpy-backed loaders give: an integer column with
+    # missing values is float, a boolean one object
+    import pyarrow as pa
+
+    arrays = {}
+    for name, values in columns.items():
+        source = sources[name]
+        if source.null_count and pa.types.is_integer(source.type):
+            values = values.cast(pa.float64())
+        arrays[name] = values
+    df = pa.table(arrays).to_pandas()
+    for name, source in sources.items():
+        if source.null_count and pa.types.is_boolean(source.type):
+            df[name] = df[name].astype(object)
+    return df
+
+
+def _has_suffixed_columns(
+    shuttles: pd.DataFrame, companies: pd.DataFrame, reviews: pd.DataFrame
+) -> bool:
+    # Names both sides of a merge share get suffixes, left to pandas
+    rated = [*shuttles.columns, *reviews.columns]
+    return len(set(rated)) < len(rated) or bool(
+        (set(rated) - {"id"}) & set(companies.columns)
+    )
+
+
+def _create_model_input_table_arrow(
+    shuttles: pd.DataFrame, companies: pd.DataFrame, reviews: pd.DataFrame
+) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    shuttle_columns = {name: _to_arrow(shuttles[name]) for name in shuttles.columns}
+    review_columns = {name: _to_arrow(reviews[name]) for name in reviews.columns}
+    company_columns = {name: _to_arrow(companies[name]) for name in companies.columns}
+
+    # Only the key columns and row numbers are joined, then put in the order
+    # pandas gives: by shuttle, then by review, then by company
+    shuttle_rows, review_rows = _join_rows(shuttle_columns["id"], review_columns["shuttle_id"])
+    company_id = shuttle_columns["company_id"].take(shuttle_rows)
+    rated_rows, company_rows = _join_rows(company_id, company_columns["id"])
+    rows = pa.table({
+        "shuttle": shuttle_rows.take(rated_rows),
+        "review": review_rows.take(rated_rows),
+        "company": company_rows,
+    }).sort_by([("shuttle", "ascending"), ("review", "ascending"), ("company", "ascending")])
+    shuttle_rows, review_rows, company_rows = rows["shuttle"], rows["review"], rows["company"]
+    del shuttle_columns["id"]
+
+    # ``dropna`` decided per source row, before anything is gathered
+    complete = pc.and_(
+        pc.and_(
+            _complete_rows(shuttle_columns).take(shuttle_rows),
+            _complete_rows(review_columns).take(review_rows),
+        ),
+        _complete_rows(company_columns).take(company_rows),
+    )
+    # An empty join has no chunks, which ``indices_nonzero`` does not take
+    kept = pc.indices_nonzero(complete.combine_chunks())
+    dropped = len(kept) < len(complete)
+    if dropped:
+        shuttle_rows, review_rows, company_rows = (
+            shuttle_rows.take(kept), review_rows.take(kept), company_rows.take(kept)
+        )
+
+    columns, sources = {}, {}
+    for source_columns, rows in (
+        (shuttle_columns, shuttle_rows),
+        (review_columns, review_rows),
+        (company_columns, company_rows),
+    ):
+        for name, values in source_columns.items():
+            columns[name], sources[name] = values.take(rows), values
+    model_input_table = _to_numpy_dtypes(columns, sources)
+    if dropped:
+        # ``dropna`` keeps the labels of the merged rows
+        model_input_table.index = pd.Index(kept.to_numpy(), dtype="int64")
+    return model_input_table
+
+
 def create_model_input_table(
     shuttles: pd.DataFrame, companies: pd.DataFrame, reviews: pd.DataFrame
 ) -> pd.DataFrame:
@@ -59,6 +220,10 @@ def create_model_input_table(
         Model input table.
 
     """
+    if _is_arrow_backed(shuttles, companies, reviews) and not _has_suffixed_columns(
+        shuttles, companies, reviews
+    ):
+        return _create_model_input_table_arrow(shuttles, companies, reviews)
     rated_shuttles = shuttles.merge(reviews, left_on="id", right_on="shuttle_id")
     rated_shuttles = rated_shuttles.drop("id", axis=1)
     model_input_table = rated_shuttles.merge(
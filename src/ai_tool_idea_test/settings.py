@@ -3,11 +3,14 @@ from the Kedro defaults. For further information, including these default values
 https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 
 # Instantiated project hooks.
-# For example, after creating a hooks.py and defining a ProjectHooks class there, do
-# from ai_tool_idea_test.hooks import ProjectHooks
+# AutoCatalogHooks types and registers the pipeline inputs missing from the
+# catalog right before a run, only for the pipeline that is run.
+# TranscodeCacheHooks reads raw inputs from their generated Parquet caches,
+# converting them again whenever their source file changed.
+# from ai_tool_idea_test.hooks import AutoCatalogHooks, TranscodeCacheHooks
 
 # Hooks are executed in a Last-In-First-Out (LIFO) order.
-# HOOKS = (ProjectHooks(),)
+# HOOKS = (TranscodeCacheHooks(), AutoCatalogHooks())
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
@@ -23,10 +26,11 @@ https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 # Directory that holds configuration.
 # CONF_SOURCE = "conf"
 
-# Class that manages how configuration is loaded.
-from kedro.config import OmegaConfigLoader  # noqa: E402
+# Class that manages how configuration is loaded. It is the OmegaConfigLoader,
+# plus the entries generated into conf/base/auto_catalog.yml.
+from ai_tool_idea_test.config_loader import AutoCatalogConfigLoader  # noqa: E402
 
-CONFIG_LOADER_CLASS = OmegaConfigLoader
+CONFIG_LOADER_CLASS = AutoCatalogConfigLoader
 # Keyword arguments to pass to the `CONFIG_LOADER_CLASS` constructor.
 CONFIG_LOADER_ARGS = {
       "base_env": "base",
@@ -0,0 +1,334 @@
+import ast
+import builtins
+import inspect
+import logging
+import os
+import textwrap
+import typing
+from pathlib import Path
+from typing import Any, List
+
+from models import CatalogEntrySuggestion
+
+logger = logging.getLogger(__name__)
+
+DATAFRAME = "pandas.core.frame.DataFrame"
+SERIES = "pandas.core.series.Series"
+GROUPBY = "pandas.core.groupby.generic.DataFrameGroupBy"
+MATPLOTLIB_FIGURE = "matplotlib.figure.Figure"
+MATPLOTLIB_AXES = "matplotlib.axes._axes.Axes"
+PLOTLY_FIGURE = "plotly.graph_objs._figure.Figure"
+
+ANNOTATION_CONFIDENCE = 0.95
+RETURN_EXPRESSION_CONFIDENCE = 0.85
+
+# Functions whose return type cannot be read off a class
+FACTORY_RETURN_TYPES = {
+    "matplotlib.pyplot.subplots": (MATPLOTLIB_FIGURE, MATPLOTLIB_AXES),
+    "matplotlib.pyplot.figure": MATPLOTLIB_FIGURE,
+    "pandas.core.reshape.concat.concat": DATAFRAME,
+    "pandas.core.reshape.merge.merge": DATAFRAME,
+    "pandas.core.reshape.pivot.crosstab": DATAFRAME,
+    "pandas.core.reshape.pivot.pivot_table": DATAFRAME,
+    "pandas.io.parsers.readers.read_csv": DATAFRAME,
+    "pandas.io.parquet.read_parquet": DATAFRAME,
+    "pandas.io.excel._base.read_excel": DATAFRAME,
+}
+
+DATAFRAME_METHODS = {
+    "assign", "astype", "copy", "drop", "drop_duplicates", "dropna", "fillna", "join",
+    "melt", "merge", "pivot_table", "query", "rename", "reset_index", "set_index",
+    "sort_index", "sort_values",
+}
+GROUPBY_AGGREGATIONS = {"agg", "aggregate", "count", "first", "last", "max", "mean", "median", "min", "size", "std", "sum"}
+
+# Where outputs that do not exist yet are proposed, following the Kedro data layers
+DATASET_TYPE_LOCATIONS = {
+    "pandas.ParquetDataset": ("02_intermediate", ".parquet"),
+    "pickle.PickleDataset": ("06_models", ".pickle"),
+    "plotly.JSONDataset": ("08_reporting", ".json"),
+    "matplotlib.MatplotlibWriter": ("08_reporting", ".png"),
+    "json.JSONDataset": ("08_reporting", ".json"),
+    "text.TextDataset": ("08_reporting", ".txt"),
+}
+
+# File extensions a dataset type can be saved under
+DATASET_TYPE_EXTENSIONS = {
+    "pandas.ParquetDataset": {".parquet", ".pq"},
+    "pickle.PickleDataset": {".pickle", ".pkl"},
+    "plotly.JSONDataset": {".json"},
+    "matplotlib.MatplotlibWriter": {".png", ".jpg", ".jpeg", ".svg", ".pdf"},
+    "json.JSONDataset": {".json"},
+    "text.TextDataset": {".txt", ".md"},
+}
+
+
+def load_registered_pipelines(project_path: str = ".") -> dict[str, Any]:
+    # Kedro and the project's node modules are only imported when asked for
+    try:
+        from kedro.framework.project import pipelines
+        from kedro.framework.startup import bootstrap_project
+
+        bootstrap_project(Path(project_path).resolve())
+        return dict(pipelines)
+    except Exception as e:
+        logger.warning("Could not load the registered pipelines: %s", e)
+        return {}
+
+
+def _qualname(obj: Any) -> str | None:
+    module = getattr(obj, "__module__", None)
+    name = getattr(obj, "__qualname__", None)
+    return f"{module}.{name}" if module and name else None
+
+
+def _annotation_type(hint: Any) -> str | tuple | None:
+    origin = typing.get_origin(hint)
+    if origin is tuple:
+        args = typing.get_args(hint)
+        return tuple(_annotation_type(a) for a in args) if args and ... not in args else None
+    if origin is not None:
+        return _qualname(origin)
+    if hint is tuple or hint is Any or hint is None or not isinstance(hint, type):
+        return None
+    return _qualname(hint)
+
+
+def _resolve(expr: ast.expr, namespace: dict) -> Any:
+    if isinstance(expr, ast.Name):
+        return namespace.get(expr.id, getattr(builtins, expr.id, None))
+    if isinstance(expr, ast.Attribute):
+        base = _resolve(expr.value, namespace)
+        return getattr(base, expr.attr, None) if base is not None else None
+    return None
+
+
+def _expression_type(expr: ast.expr | None, env: dict, namespace: dict) -> str | tuple | None:
+    if isinstance(expr, ast.Name):
+        return env.get(expr.id)
+    if isinstance(expr, ast.Tuple):
+        return tuple(_expression_type(e, env, namespace) for e in expr.elts)
+    if isinstance(expr, ast.Dict):
+        return "builtins.dict"
+    if isinstance(expr, ast.List):
+        return "builtins.list"
+    if isinstance(expr, ast.Subscript):
+        if _expression_type(expr.value, env, namespace) == DATAFRAME:
+            return DATAFRAME if isinstance(expr.slice, ast.List) else SERIES
+        return None
+    if not isinstance(expr, ast.Call):
+        return None
+
+    callee = _resolve(expr.func, namespace)
+    if isinstance(callee, type):
+        return _qualname(callee)
+    if callee is not None:
+        name = _qualname(callee)
+        if name in FACTORY_RETURN_TYPES:
+            return FACTORY_RETURN_TYPES[name]
+        # plotly.express functions all build a figure
+        if (getattr(callee, "__module__", None) or "").startswith("plotly.express"):
+            return PLOTLY_FIGURE
+        try:
+            return _annotation_type(typing.get_type_hints(callee).get("return"))
+        except Exception:
+            return None
+
+    if isinstance(expr.func, ast.Attribute):
+        receiver = _expression_type(expr.func.value, env, namespace)
+        method = expr.func.attr
+        if receiver == DATAFRAME and method in DATAFRAME_METHODS:
+            return DATAFRAME
+        if receiver == DATAFRAME and method == "groupby":
+            return GROUPBY
+        if receiver == GROUPBY and method in GROUPBY_AGGREGATIONS:
+            return DATAFRAME
+    return None
+
+
+def _function_def(func: Any) -> ast.FunctionDef | None:
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):
+        return None
+    tree = ast.parse(source)
+    return next((s for s in tree.body if isinstance(s, (ast.FunctionDef, ast.AsyncFunctionDef))), None)
+
+
+def infer_output_types(func: Any, n_outputs: int) -> List[tuple[str | None, float]]:
+    # Returns a (qualified type name, confidence) pair per output, read from the
+    # return annotation or else from what the return statements evaluate to
+    func = inspect.unwrap(func)
+    unresolved = [(None, 0.0)] * n_outputs
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+
+    returned = _annotation_type(hints.get("return"))
+    if n_outputs == 1 and isinstance(returned, str):
+        return [(returned, ANNOTATION_CONFIDENCE)]
+    if isinstance(returned, tuple) and len(returned) == n_outputs and all(returned):
+        return [(t, ANNOTATION_CONFIDENCE) for t in returned]
+
+    func_def = _function_def(func)
+    if func_def is None:
+        return unresolved
+
+    namespace = getattr(func, "__globals__", {})
+    env = {name: _annotation_type(hint) for name, hint in hints.items() if name != "return"}
+    return_types = []
+    for stmt in ast.walk(func_def):
+        if isinstance(stmt, ast.Assign):
+            value_type = _expression_type(stmt.value, env, namespace)
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    env[target.id] = value_type
+                elif isinstance(target, ast.Tuple) and isinstance(value_type, tuple) and len(value_type) == len(target.elts):
+                    for elt, elt_type in zip(target.elts, value_type):
+                        if isinstance(elt, ast.Name):
+                            env[elt.id] = elt_type
+        elif isinstance(stmt, ast.Return) and stmt.value is not None:
+            return_types.append(_expression_type(stmt.value, env, namespace))
+
+    # Every return statement has to agree for the type to be trusted
+    if not return_types or any(t != return_types[0] for t in return_types):
+        return unresolved
+    returned = return_types[0]
+    if n_outputs == 1 and isinstance(returned, str):
+        return [(returned, RETURN_EXPRESSION_CONFIDENCE)]
+    if isinstance(returned, tuple) and len(returned) == n_outputs:
+        return [(t, RETURN_EXPRESSION_CONFIDENCE if t else 0.0) for t in returned]
+    return unresolved
+
+
+def dataset_type_for(type_name: str | None) -> str | None:
+    if type_name is None:
+        return None
+    if type_name == DATAFRAME:
+        return "pandas.ParquetDataset"
+    if type_name.startswith("plotly.") and type_name.endswith(".Figure"):
+        return "plotly.JSONDataset"
+    if type_name.startswith("matplotlib.") and type_name.endswith(".Figure"):
+        return "matplotlib.MatplotlibWriter"
+    if type_name in {"builtins.dict", "builtins.list"}:
+        return "json.JSONDataset"
+    if type_name == "builtins.str":
+        return "text.TextDataset"
+    if type_name == GROUPBY:
+        return None
+    # Models, estimators and anything else Python can serialise
+    return "pickle.PickleDataset"
+
+
+def infer_pipeline_dataset_types(pipelines: dict[str, Any]) -> dict[str, CatalogEntrySuggestion]:
+    suggestions = {}
+    seen_nodes = set()
+    for pipeline in pipelines.values():
+        for node in pipeline.nodes:
+            if node.name in seen_nodes or not node.outputs:
+                continue
+            seen_nodes.add(node.name)
+
+            outputs = node.outputs
+            for dataset_name, (type_name, confidence) in zip(outputs, infer_output_types(node.func, len(outputs))):
+                dataset_type = dataset_type_for(type_name)
+                if dataset_type is None or dataset_name.startswith("params:"):
+                    continue
+                layer, ext = DATASET_TYPE_LOCATIONS.get(dataset_type, ("02_intermediate", ""))
+                suggestions[dataset_name.lower()] = CatalogEntrySuggestion(
+                    filepath=os.path.join(layer, f"{dataset_name}{ext}"),
+                    suggested_name=dataset_name,
+                    suggested_type=dataset_type,
+                    is_versioned=False,
+                    confidence=confidence,
+                )
+    return suggestions
+
+
+def _subscript_columns(node: ast.Subscript) -> set[str] | None:
+    key = node.slice
+    if isinstance(key, ast.Constant) and isinstance(key.value, str):
+        return {key.value}
+    if isinstance(key, ast.List) and all(isinstance(e, ast.Constant) and isinstance(e.value, str) for e in key.elts):
+        return {e.value for e in key.elts}
+    return None
+
+
+def used_columns(func: Any, parameter: str) -> set[str] | None:
+    # The columns a node reads from one of its inputs, or None when the input
+    # is used in any other way than being indexed by literal column names
+    func_def = _function_def(inspect.unwrap(func))
+    if func_def is None:
+        return None
+
+    parents = {child: parent for parent in ast.walk(func_def) for child in ast.iter_child_nodes(parent)}
+    columns = set()
+    for node in ast.walk(func_def):
+        if not (isinstance(node, ast.Name) and node.id == parameter):
+            continue
+        parent = parents.get(node)
+        if not (isinstance(parent, ast.Subscript) and parent.value is node and isinstance(parent.ctx, ast.Load)):
+            return None
+        subscript = _subscript_columns(parent)
+        if subscript is None:
+            return None
+        columns |= subscript
+    return columns or None
+
+
+def _input_parameters(node: Any) -> dict[str, str]:
+    # Dataset name -> the parameter of the node function it is passed as
+    inputs = getattr(node, "_inputs", None)
+    if isinstance(inputs, dict):
+        return {dataset: parameter for parameter, dataset in inputs.items()}
+    try:
+        parameters = inspect.signature(node.func).parameters.values()
+    except (TypeError, ValueError):
+        return {}
+    if any(p.kind is p.VAR_POSITIONAL for p in parameters):
+        return {}
+    return dict(zip(node.inputs, (p.name for p in parameters)))
+
+
+def infer_pipeline_column_usage(pipelines: dict[str, Any]) -> dict[str, set[str] | None]:
+    # Per input dataset, the union of the columns its nodes read, or None if
+    # any node needs the whole table
+    usage: dict[str, set[str] | None] = {}
+    seen_nodes = set()
+    for pipeline in pipelines.values():
+        for node in pipeline.nodes:
+            if node.name in seen_nodes:
+                continue
+            seen_nodes.add(node.name)
+
+            parameters = _input_parameters(node)
+            for dataset_name in node.inputs:
+                if dataset_name.startswith("params:") or dataset_name == "parameters":
+                    continue
+                key = dataset_name.lower()
+                parameter = parameters.get(dataset_name)
+                columns = used_columns(node.func, parameter) if parameter is not None else None
+                if columns is None or (key in usage and usage[key] is None):
+                    usage[key] = None
+                else:
+                    usage[key] = usage.get(key, set()) | columns
+    return usage
+
+
+def apply_static_types(
+    suggestions: List[CatalogEntrySuggestion], static_types: dict[str, CatalogEntrySuggestion]
+) -> List[CatalogEntrySuggestion]:
+    # Updates the suggestions in place and returns the ones left unresolved. A
+    # static type is only trusted if the file on disk has a matching extension,
+    # e.g. a DataFrame output saved as JSON is handed to a plotly.PlotlyDataset
+    unresolved = []
+    for s in suggestions:
+        proposal = static_types.get(s.suggested_name.lower())
+        ext = os.path.splitext(s.filepath)[1].lower()
+        if proposal is not None and ext in DATASET_TYPE_EXTENSIONS.get(proposal.suggested_type, ()):
+            s.suggested_type = proposal.suggested_type
+            s.confidence = proposal.confidence
+        else:
+            unresolved.append(s)
+    return unresolved
@@ -0,0 +1,240 @@
+import os
+from typing import Iterable, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from models import CatalogEntrySuggestion, ScannedDataFile
+from resolver_scripts import EXT_TO_KEDRO_DATASET
+
+
+# Files are buffered as Python lists until this many, then packed into Arrow
+BUILDER_CHUNK_SIZE = 65_536
+STAT_TYPES = (pa.int64(), pa.int64(), pa.uint64())
+
+# os.path.splitext semantics: leading dots belong to the stem, "a.tar.gz" ends in ".gz"
+SPLITEXT_PATTERN = r"^(?P<stem>\.*[^.].*)(?P<ext>\.[^.]*)$"
+TIMESTAMP = r"\d{4}-\d{2}-\d{2}T\d{2}\.\d{2}\.\d{2}\.\d{3}Z"
+# Greedy like VERSIONED_PATH_PATTERN, so the last version directory wins
+VERSIONED_DIR_PATTERN = rf"^(?P<dataset>.*)/(?P<version>{TIMESTAMP})/"
+
+
+def _posix(paths: pa.Array) -> pa.Array:
+    if os.sep == "/":
+        return paths
+    return pc.replace_substring(paths, os.sep, "/")
+
+
+class ScanTable:
+    """Scan results held as Arrow columns rather than one model per file.
+
+    Each directory is stored once, as a prefix ending in a separator, and files
+    only keep their name and the index of their directory. Stats are null when
+    the scan did not stat the files, and the version summary of a collapsed
+    versioned dataset is kept per directory, next to its latest version.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        dirs: pa.Array,
+        dir_ids: pa.Array,
+        names: pa.Array,
+        sizes: pa.Array,
+        mtimes: pa.Array,
+        inodes: pa.Array,
+        dir_versions: pa.Table,
+    ):
+        self.data_dir = data_dir
+        self.dirs = dirs
+        self.dir_ids = dir_ids
+        self.names = names
+        self.sizes = sizes
+        self.mtimes = mtimes
+        self.inodes = inodes
+        self.dir_versions = dir_versions
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_models(cls, data_dir: str, files: Iterable[ScannedDataFile]) -> "ScanTable":
+        builder = ScanTableBuilder(data_dir)
+        for f in files:
+            rel_dir, name = os.path.split(f.rel_path)
+            versions = None
+            if f.version is not None:
+                versions = {"version": f.version, "version_count": f.version_count, "versioned_bytes": f.versioned_bytes}
+            builder.add_directory(rel_dir, [name], [[f.size, f.mtime_ns, f.inode]], versions=versions)
+        return builder.finish()
+
+    def rel_paths(self) -> pa.Array:
+        return pc.binary_join_element_wise(pc.take(self.dirs, self.dir_ids), self.names, "")
+
+    def stems(self) -> pa.Array:
+        parts = pc.extract_regex(self.names, SPLITEXT_PATTERN)
+        return pc.if_else(pc.is_valid(parts), pc.struct_field(parts, "stem"), self.names)
+
+    def extensions(self) -> pa.Array:
+        parts = pc.extract_regex(self.names, SPLITEXT_PATTERN)
+        return pc.utf8_lower(pc.fill_null(pc.struct_field(parts, "ext"), ""))
+
+    def dataset_types(self) -> pa.Array:
+        codes = pc.index_in(self.extensions(), value_set=pa.array(list(EXT_TO_KEDRO_DATASET)))
+        return pc.take(pa.array(list(EXT_TO_KEDRO_DATASET.values())), codes)
+
+    def versioned_datasets(self) -> pa.Array:
+        # Matched once per directory, then spread over its files. Null for
+        # files outside a Kedro version directory.
+        parts = pc.extract_regex(_posix(self.dirs), VERSIONED_DIR_PATTERN)
+        datasets = pc.if_else(pc.is_valid(parts), pc.struct_field(parts, "dataset"), pa.scalar(None, pa.string()))
+        return pc.take(datasets, self.dir_ids)
+
+    def present_stems(self, names: Iterable[str]) -> set[str]:
+        # Which of the given lowercase names some file is named after
+        stems = pc.utf8_lower(self.stems())
+        return set(pc.filter(stems, pc.is_in(stems, value_set=pa.array(list(names), pa.string()))).to_pylist())
+
+    def to_models(self) -> List[ScannedDataFile]:
+        rel_paths = self.rel_paths().to_pylist()
+        dataset_types = self.dataset_types().to_pylist()
+        sizes, mtimes, inodes = self.sizes.to_pylist(), self.mtimes.to_pylist(), self.inodes.to_pylist()
+        versions = pc.take(self.dir_versions, self.dir_ids).to_pylist()
+
+        return [
+            ScannedDataFile(
+                full_path=os.path.join(self.data_dir, rel_path),
+                rel_path=rel_path,
+                dataset_type=dataset_types[i],
+                size=sizes[i],
+                mtime_ns=mtimes[i],
+                inode=inodes[i],
+                **versions[i],
+            )
+            for i, rel_path in enumerate(rel_paths)
+        ]
+
+
+class ScanTableBuilder:
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._dir_ids = {}
+        self._dirs = []
+        self._dir_versions = []
+        self._chunks = []
+        self._columns = ([], [], None)
+
+    def add_directory(
+        self,
+        rel_dir: str,
+        names: Iterable[str],
+        stats: Iterable[list[int] | None] | None = None,
+        versions: dict | None = None,
+    ):
+        # Directories are interned, adding to one again reuses its prefix
+        dir_id = self._dir_ids.get(rel_dir)
+        if dir_id is None:
+            dir_id = self._dir_ids[rel_dir] = len(self._dirs)
+            self._dirs.append(os.path.join(rel_dir, "") if rel_dir else "")
+            self._dir_versions.append(versions or {})
+
+        dir_ids, file_names, file_stats = self._columns
+        start = len(file_names)
+        file_names.extend(names)
+        dir_ids.extend([dir_id] * (len(file_names) - start))
+        if stats is not None:
+            if file_stats is None:
+                # Stats only take memory once some file has them
+                file_stats = [None] * start
+                self._columns = (dir_ids, file_names, file_stats)
+            file_stats.extend(stats)
+        elif file_stats is not None:
+            file_stats.extend([None] * (len(file_names) - start))
+
+        if len(file_names) >= BUILDER_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        dir_ids, names, stats = self._columns
+        if names:
+            if stats is not None:
+                stats = [
+                    pa.array([s and s[i] for s in stats], stat_type)
+                    for i, stat_type in enumerate(STAT_TYPES)
+                ]
+            self._chunks.append((pa.array(dir_ids, pa.int32()), pa.array(names, pa.string()), stats))
+        self._columns = ([], [], None)
+
+    def finish(self) -> ScanTable:
+        self._flush()
+        if not self._chunks:
+            self._chunks.append((pa.array([], pa.int32()), pa.array([], pa.string()), None))
+        # Kept as chunks, concatenating would copy every column
+        dir_ids = pa.chunked_array([chunk[0] for chunk in self._chunks], pa.int32())
+        names = pa.chunked_array([chunk[1] for chunk in self._chunks], pa.string())
+        if any(chunk[2] is not None for chunk in self._chunks):
+            stats = [
+                pa.chunked_array(
+                    [chunk[2][i] if chunk[2] is not None else pa.nulls(len(chunk[1]), stat_type) for chunk in self._chunks],
+                    stat_type,
+                )
+                for i, stat_type in enumerate(STAT_TYPES)
+            ]
+        else:
+            # Arrow's null type holds no buffers at all
+            stats = [pa.nulls(len(names))] * len(STAT_TYPES)
+        self._chunks = []
+
+        dir_versions = pa.table({
+            "version": pa.array([v.get("version") for v in self._dir_versions], pa.string()),
+            "version_count": pa.array([v.get("version_count") for v in self._dir_versions], pa.int64()),
+            "versioned_bytes": pa.array([v.get("versioned_bytes") for v in self._dir_versions], pa.int64()),
+        })
+        return ScanTable(self.data_dir, pa.array(self._dirs, pa.string()), dir_ids, names, *stats, dir_versions)
+
+
+def plan_catalog(table: ScanTable) -> pa.Table:
+    # Columnar observe_project + analyze_observed_project: the unversioned
+    # files, then each versioned dataset once, both in sorted order. Full paths
+    # are only built for the unversioned files, and their names come from the
+    # much shorter name column.
+    datasets = table.versioned_datasets()
+    # indices_nonzero crashes on empty chunked arrays, a bit mask is cheap to combine
+    unversioned = pc.indices_nonzero(pc.is_null(datasets).combine_chunks())
+
+    dirs = pc.take(table.dirs, pc.take(table.dir_ids, unversioned))
+    filepaths = pc.binary_join_element_wise(dirs, pc.take(table.names, unversioned), "")
+    del dirs
+    order = pc.sort_indices(filepaths)
+    filepaths = pc.take(filepaths, order)
+    names = pc.take(pc.take(table.stems(), unversioned), order)
+    del order
+
+    versioned = pc.unique(pc.drop_null(datasets))
+    versioned = pc.take(versioned, pc.sort_indices(versioned))
+    basenames = pc.struct_field(pc.extract_regex(versioned, r"(?P<name>[^/\\]*)$"), "name")
+    parts = pc.extract_regex(basenames, SPLITEXT_PATTERN)
+    versioned_names = pc.if_else(pc.is_valid(parts), pc.struct_field(parts, "stem"), basenames)
+
+    return pa.table({
+        "filepath": pa.chunked_array([*_chunks(filepaths), *_chunks(versioned)], pa.string()),
+        "suggested_name": pa.chunked_array([*_chunks(names), *_chunks(versioned_names)], pa.string()),
+        "is_versioned": np.arange(len(filepaths) + len(versioned)) >= len(filepaths),
+    })
+
+
+def _chunks(array: pa.Array | pa.ChunkedArray) -> list[pa.Array]:
+    return array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+
+
+def to_suggestions(plan: pa.Table) -> List[CatalogEntrySuggestion]:
+    return [
+        CatalogEntrySuggestion(
+            filepath=row["filepath"],
+            suggested_name=row["suggested_name"],
+            suggested_type=None,
+            is_versioned=row["is_versioned"],
+        )
+        for row in plan.to_pylist()
+    ]
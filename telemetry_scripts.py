@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+SERVICE_NAME = "autocatalog"
+
+# Counter names shared by the instrumented stages
+FILES_SEEN = "files.seen"
+FILES_PRUNED = "files.pruned"
+DATASETS_RESOLVED = "datasets.resolved_locally"
+ENTRIES_WRITTEN = "entries.written"
+ENTRIES_SKIPPED = "entries.skipped"
+CACHE_HITS = "cache.hits"
+CACHE_MISSES = "cache.misses"
+LLM_REQUESTS = "llm.requests"
+LLM_RETRIES = "llm.retries"
+LLM_REASKS = "llm.reasks"
+PROMPT_TOKENS = "llm.prompt_tokens"
+COMPLETION_TOKENS = "llm.completion_tokens"
+SNIFF_BYTES_READ = "sniff.bytes_read"
+
+_tracer: ContextVar["Tracer | None"] = ContextVar("autocatalog_tracer", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("autocatalog_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent: "Span | None" = None, attributes: dict | None = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.counters: dict[str, int] = {}
+        self.events: list[dict] = []
+        self.error: str | None = None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self._started = time.perf_counter()
+        self.wall_time: float | None = None
+        # Counted from the scan and inference threads as well
+        self._lock = threading.Lock()
+
+    def count(self, key: str, value: int = 1):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def event(self, name: str, **attributes):
+        with self._lock:
+            self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def end(self):
+        self.wall_time = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.wall_time * 1e9)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "wall_time": self.wall_time,
+            "attributes": self.attributes,
+            "counters": dict(sorted(self.counters.items())),
+            "events": self.events,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """Records the spans of one run, for a JSON report or an OTLP collector.
+
+    Entering the tracer makes it the active one, so the module level ``span``,
+    ``count`` and ``event`` helpers record into it. Without an active tracer
+    they do nothing, and the instrumented code pays only a context lookup.
+    """
+
+    def __init__(self, service_name: str = SERVICE_NAME):
+        self.service_name = service_name
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __enter__(self) -> "Tracer":
+        self._token = _tracer.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _tracer.reset(self._token)
+        self._token = None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        span = Span(name, self.trace_id, _current_span.get(), attributes)
+        with self._lock:
+            self.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def totals(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for span in self.spans:
+            for key, value in span.counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return dict(sorted(totals.items()))
+
+    def to_dict(self) -> dict:
+        return {
+            "service": self.service_name,
+            "trace_id": self.trace_id,
+            "totals": self.totals(),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def write_json(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def to_otlp(self) -> dict:
+        # OTLP/HTTP JSON, as accepted by the OpenTelemetry collector on :4318
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [_otlp_span(span) for span in self.spans],
+                }],
+            }]
+        }
+
+    def export_otlp(self, endpoint: str = DEFAULT_OTLP_ENDPOINT, timeout: float = 5.0):
+        request = urllib.request.Request(
+            endpoint,
+            data=json.dumps(self.to_otlp()).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(span: Span) -> dict:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": _otlp_attributes({**span.attributes, **span.counters}),
+        "events": [
+            {"timeUnixNano": str(e["time_ns"]), "name": e["name"], "attributes": _otlp_attributes(e["attributes"])}
+            for e in span.events
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id is not None:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | None]:
+    tracer = _tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attributes) as s:
+        yield s
+
+
+def count(key: str, value: int = 1):
+    current = _current_span.get()
+    if current is not None:
+        current.count(key, value)
+
+
+def event(name: str, **attributes):
+    current = _current_span.get()
+    if current is not None:
+        current.event(name, **attributes)
@@ -0,0 +1,20 @@
+import pytest
+
+from tests.fake_openai_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        yield server
+
+
+@pytest.fixture
+def write_file():
+    def write(path, content="a,b\n1,2\n"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    return write
@@ -0,0 +1,120 @@
+"""A minimal OpenAI-compatible chat completions server for offline tests.
+
+It answers every ``POST /v1/chat/completions`` by reading the dataset entries
+out of the prompt and mapping each file extension to a Kedro dataset type.
+Requests for structured output get the same answers as JSON.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EXT_TO_TYPE = {
+    ".csv": "pandas.CSVDataset",
+    ".parquet": "pandas.ParquetDataset",
+    ".xlsx": "pandas.ExcelDataset",
+    ".json": "json.JSONDataset",
+    ".pickle": "pickle.PickleDataset",
+    ".png": "matplotlib.MatplotlibWriter",
+}
+
+
+def dataset_entries(prompt: str) -> list[tuple[str, str]]:
+    entries = []
+    lines = prompt.splitlines()
+    start = lines.index("Dataset entries:") + 1
+    for line in lines[start:]:
+        if not line.strip():
+            break
+        name, filepath = line.split(":", 1)
+        entries.append((name.strip(), filepath.strip()))
+    return entries
+
+
+def as_structured_output(content: str) -> str:
+    datasets = []
+    for line in content.splitlines():
+        if ":" in line:
+            name, dataset_type = line.split(":", 1)
+            datasets.append({"name": name.strip(), "type": dataset_type.strip()})
+    return json.dumps({"datasets": datasets})
+
+
+def answer_by_extension(prompt: str) -> str:
+    return "\n".join(
+        f"{name}: {EXT_TO_TYPE.get(os.path.splitext(filepath)[1], 'unknown')}"
+        for name, filepath in dataset_entries(prompt)
+    )
+
+
+class FakeOpenAIServer:
+    def __init__(self, responder=answer_by_extension, latency: float = 0.0):
+        self.responder = responder
+        self.latency = latency
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests.append(body)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.latency)
+                    prompt = body["messages"][-1]["content"]
+                    content = server.responder(prompt)
+                    if body.get("response_format", {}).get("type") == "json_schema":
+                        content = as_structured_output(content)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+                payload = json.dumps({
+                    "id": f"chatcmpl-{len(server.requests)}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "gpt-4o"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": (len(prompt) + len(content)) // 4,
+                    },
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from kedro.io import DataCatalog
+from kedro.runner import SequentialRunner
+from pandas.testing import assert_frame_equal
+
+from ai_tool_idea_test.pipelines.data_processing import create_pipeline as create_dp_pipeline
+from ai_tool_idea_test.pipelines.data_processing.nodes import (
+    create_model_input_table,
+    preprocess_companies,
+    preprocess_shuttles,
+)
+
+
+def _arrow_backed(df):
+    return pa.Table.from_pandas(df, preserve_index=False).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@pytest.fixture
+def raw_data():
+    companies = pd.DataFrame(
+        {
+            "id": [3, 1, 2, 4],
+            "company_rating": ["100%", "38%", np.nan, "7%"],
+            "company_location": ["Niue", "Chile", "Chile", np.nan],
+            "iata_approved": ["t", "f", "t", np.nan],
+        }
+    )
+    shuttles = pd.DataFrame(
+        {
+            "id": [10, 11, 12, 13, 14],
+            "engines": [2.0, np.nan, 1.0, 3.0, 1.0],
+            "d_check_complete": ["t", "f", "f", "t", "t"],
+            "moon_clearance_complete": ["f", "f", "t", np.nan, "t"],
+            "price": ["$1,715.0", "$4,020.5", "$980.0", np.nan, "$1,000,000.25"],
+            "company_id": [1, 3, 3, 2, 9],
+        }
+    )
+    # Several reviews for one shuttle, in no order, and one of no known shuttle
+    reviews = pd.DataFrame(
+        {
+            "shuttle_id": [12, 10, 12, 11, 99, 10, 13],
+            "review_scores_rating": [91.0, 96.0, np.nan, 97.0, 95.0, 88.0, 90.0],
+            "number_of_reviews": [26, 61, 467, 318, 22, 3, 8],
+        }
+    )
+    return {"companies": companies, "shuttles": shuttles, "reviews": reviews}
+
+
+def _model_input_table(data):
+    return create_model_input_table(
+        preprocess_shuttles(data["shuttles"].copy()),
+        preprocess_companies(data["companies"].copy()),
+        data["reviews"],
+    )
+
+
+def test_arrow_preprocessing_parses_the_same_values(raw_data):
+    for node, name in ((preprocess_companies, "companies"), (preprocess_shuttles, "shuttles")):
+        expected = node(raw_data[name].copy())
+        result = node(_arrow_backed(raw_data[name]))
+
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes)
+        assert_frame_equal(
+            result.astype(expected.dtypes.to_dict()).fillna(np.nan),
+            expected.fillna(np.nan),
+            check_exact=True,
+        )
+
+
+@pytest.mark.parametrize("arrow_backed", [("companies", "shuttles", "reviews"), ("reviews",)])
+def test_arrow_model_input_table_is_identical(raw_data, arrow_backed):
+    expected = _model_input_table(raw_data)
+    result = _model_input_table(
+        {name: _arrow_backed(df) if name in arrow_backed else df for name, df in raw_data.items()}
+    )
+
+    assert len(expected) == 3
+    assert_frame_equal(result, expected, check_exact=True, check_index_type=True)
+
+
+def test_arrow_model_input_table_keeps_the_range_index(raw_data):
+    complete = {
+        "companies": raw_data["companies"].fillna(
+            {"company_rating": "50%", "company_location": "Niue", "iata_approved": "f"}
+        ),
+        "shuttles": raw_data["shuttles"].fillna(
+            {"engines": 1.0, "moon_clearance_complete": "f", "price": "$1.0"}
+        ),
+        "reviews": raw_data["reviews"].fillna(90.0),
+    }
+    expected = _model_input_table(complete)
+    result = _model_input_table({name: _arrow_backed(df) for name, df in complete.items()})
+
+    assert isinstance(expected.index, pd.RangeIndex)
+    assert_frame_equal(result, expected, check_exact=True, check_index_type=True)
+
+
+def test_arrow_model_input_table_without_matches(raw_data):
+    raw_data["reviews"]["shuttle_id"] = 99
+    expected = _model_input_table(raw_data)
+    result = _model_input_table({name: _arrow_backed(df) for name, df in raw_data.items()})
+
+    assert expected.empty
+    assert_frame_equal(result, expected, check_index_type=True)
+
+
+def test_data_processing_pipeline_on_arrow_inputs(raw_data):
+    catalog = DataCatalog()
+    for name, df in raw_data.items():
+        catalog[name] = _arrow_backed(df)
+
+    SequentialRunner().run(create_dp_pipeline(), catalog)
+
+    assert_frame_equal(catalog.load("model_input_table"), _model_input_table(raw_data), check_exact=True)
@@ -0,0 +1,91 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend_scripts import (
+    HeuristicsBackend,
+    OpenAIBackend,
+    ReplayBackend,
+    create_backend,
+    register_backend,
+)
+from llm_scripts import infer_dataset_types
+from models import CatalogEntrySuggestion, NodeIndex
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _suggestions(*filepaths):
+    return [
+        CatalogEntrySuggestion(filepath=f, suggested_name=Path(f).stem, suggested_type=None, is_versioned=False)
+        for f in filepaths
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_source_context(monkeypatch):
+    monkeypatch.setattr("llm_scripts.build_node_index", lambda *args: NodeIndex())
+
+
+def test_importing_the_tool_does_not_import_openai():
+    code = "import sys, tool_scripts; print(any(m.split('.')[0] in {'openai', 'httpx'} for m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown inference backend 'nope'"):
+        create_backend("nope")
+
+
+def test_registered_backends_are_created_by_name(monkeypatch):
+    monkeypatch.setattr("backend_scripts.BACKENDS", {})
+    register_backend("offline", "backend_scripts:HeuristicsBackend")
+
+    assert isinstance(create_backend("offline"), HeuristicsBackend)
+
+
+def test_heuristics_backend(tmp_path):
+    (tmp_path / "notes.txt").write_text("free text")
+    (tmp_path / "table.parquet").write_bytes(b"")
+
+    result = infer_dataset_types(
+        _suggestions("notes.txt", "table.parquet", "blob.bin"),
+        verbose=False,
+        data_dir=str(tmp_path),
+        backend=HeuristicsBackend(),
+    )
+
+    assert [s.suggested_type for s in result] == ["text.TextDataset", "pandas.ParquetDataset", None]
+
+
+def test_recorded_responses_replay_offline(tmp_path, fake_openai):
+    fixture_path = str(tmp_path / "responses.json")
+    suggestions = _suggestions("companies.csv", "regressor.pickle")
+
+    recorded = infer_dataset_types(
+        suggestions, verbose=False, backend=OpenAIBackend(record_path=fixture_path)
+    )
+    replayed = infer_dataset_types(
+        _suggestions("companies.csv", "regressor.pickle"),
+        verbose=False,
+        backend=ReplayBackend(fixture_path),
+    )
+
+    assert len(fake_openai.requests) == 1
+    assert [s.suggested_type for s in replayed] == [s.suggested_type for s in recorded]
+    assert replayed[1].suggested_type == "pickle.PickleDataset"
+
+
+def test_replay_fails_loudly_on_unrecorded_prompt(tmp_path):
+    with pytest.raises(KeyError, match="No recorded response"):
+        infer_dataset_types(
+            _suggestions("companies.csv"),
+            verbose=False,
+            backend=ReplayBackend(str(tmp_path / "empty.json")),
+        )
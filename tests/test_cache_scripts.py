@@ -0,0 +1,64 @@
+import pytest
+
+import llm_scripts
+from cache_scripts import InferenceCache, fingerprint_file
+from models import CatalogEntrySuggestion, NodeIndex
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with InferenceCache(str(tmp_path / "cache.sqlite"), max_entries=3) as cache:
+        yield cache
+
+
+def test_round_trip_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with InferenceCache(path) as cache:
+        cache.put_many({"a": "pandas.CSVDataset"})
+
+    with InferenceCache(path) as cache:
+        assert cache.get_many(["a", "b"]) == {"a": "pandas.CSVDataset"}
+
+
+def test_evicts_least_recently_used(cache, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("cache_scripts.time.time", lambda: next(clock))
+
+    cache.put_many({"a": "A", "b": "B", "c": "C"})
+    cache.get_many(["a"])
+    cache.put_many({"d": "D"})
+
+    assert len(cache) == 3
+    assert cache.get_many(["a", "b", "c", "d"]) == {"a": "A", "c": "C", "d": "D"}
+
+
+def test_fingerprint_changes_with_content(tmp_path):
+    path = tmp_path / "companies.csv"
+    path.write_text("id,name\n")
+    before = fingerprint_file(str(path))
+
+    path.write_text("id,rating\n")
+
+    assert fingerprint_file(str(path)) != before
+    assert fingerprint_file(str(tmp_path / "missing.csv")) is None
+
+
+def test_infer_dataset_types_only_sends_cache_misses(tmp_path, cache, fake_openai, monkeypatch):
+    (tmp_path / "companies.csv").write_text("id\n1\n")
+    (tmp_path / "shuttles.xlsx").write_bytes(b"PK\x03\x04")
+    monkeypatch.setattr(llm_scripts, "build_node_index", lambda *args: NodeIndex())
+
+    def suggestions():
+        return [
+            CatalogEntrySuggestion(filepath=name, suggested_name=name.split(".")[0], suggested_type=None, is_versioned=False)
+            for name in ("companies.csv", "shuttles.xlsx")
+        ]
+
+    llm_scripts.infer_dataset_types(suggestions(), verbose=False, cache=cache, data_dir=str(tmp_path))
+    (tmp_path / "shuttles.xlsx").write_bytes(b"PK\x03\x04changed")
+    result = llm_scripts.infer_dataset_types(suggestions(), verbose=False, cache=cache, data_dir=str(tmp_path))
+
+    prompts = [r["messages"][-1]["content"] for r in fake_openai.requests]
+    assert [s.suggested_type for s in result] == ["pandas.CSVDataset", "pandas.ExcelDataset"]
+    assert len(prompts) == 2
+    assert "companies" in prompts[0] and "companies" not in prompts[1]
@@ -0,0 +1,65 @@
+import os
+
+from catalog_scripts import CatalogIndex, build_catalog_index, drop_catalogued
+from models import CatalogEntrySuggestion
+
+
+def _suggestion(filepath):
+    return CatalogEntrySuggestion(
+        filepath=filepath,
+        suggested_name=os.path.splitext(os.path.basename(filepath))[0],
+        suggested_type=None,
+        is_versioned=False,
+    )
+
+
+def test_explicit_entries_are_matched_by_resolved_filepath():
+    index = CatalogIndex({
+        "companies": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/companies.csv"},
+        "_anchor": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/anchor.csv"},
+        "in_memory": {"type": "MemoryDataset"},
+    })
+
+    assert index.match("./data/01_raw/companies.csv") == "companies"
+    assert index.match(os.path.abspath("data/01_raw/companies.csv")) == "companies"
+    assert index.match("data/01_raw/anchor.csv") is None
+    assert len(index) == 1
+
+
+def test_factory_patterns_follow_kedro_precedence():
+    index = CatalogIndex({
+        "{name}": {"type": "pandas.CSVDataset", "filepath": "data/{name}"},
+        "{name}_raw": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/{name}.csv"},
+        "{layer}.{name}": {"type": "pandas.ParquetDataset", "filepath": "data/{layer}/{name}.parquet"},
+        "{name}_twice": {"type": "pandas.CSVDataset", "filepath": "data/{name}/{name}.txt"},
+    })
+
+    assert index.match("data/01_raw/reviews.csv") == "reviews_raw"
+    assert index.match("data/03_primary/table.parquet") == "03_primary.table"
+    assert index.match("data/a/a.txt") == "a_twice"
+    assert index.match("data/a/b.txt") == "a/b.txt"
+    assert index.match("elsewhere/reviews.csv") is None
+
+
+def test_drop_catalogued_keeps_uncovered_files():
+    index = CatalogIndex({"companies": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/companies.csv"}})
+
+    kept = drop_catalogued([_suggestion("01_raw/companies.csv"), _suggestion("01_raw/new.csv")], index, "data")
+
+    assert [s.filepath for s in kept] == ["01_raw/new.csv"]
+
+
+def test_project_catalog_is_loaded_through_the_config_loader():
+    index = build_catalog_index(".")
+
+    assert index.match("data/01_raw/shuttles.xlsx") == "shuttles"
+    assert index.match("data/06_models/regressor.pickle") == "regressor"
+    assert "model_input_table" in index.names
+
+
+def test_entries_written_by_the_tool_are_not_counted():
+    entry = {"type": "pandas.CSVDataset", "filepath": "data/01_raw/companies.csv"}
+
+    index = build_catalog_index(".", exclude={"companies": entry})
+
+    assert index.match("data/01_raw/companies.csv") is None
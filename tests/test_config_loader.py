@@ -0,0 +1,90 @@
+import json
+import os
+import pickle
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from ai_tool_idea_test import catalog_snapshot
+from ai_tool_idea_test.catalog_snapshot import read_snapshot, snapshot_path_for
+from ai_tool_idea_test.config_loader import AutoCatalogConfigLoader
+from tool_scripts import write_catalog_to_yaml
+
+GENERATED = {
+    "companies": {"type": "pandas.ParquetDataset", "filepath": "data/01_raw/companies.parquet"},
+    "reviews": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv", "versioned": True},
+}
+
+
+@pytest.fixture
+def conf_source(tmp_path):
+    base = tmp_path / "conf" / "base"
+    base.mkdir(parents=True)
+    (base / "catalog.yml").write_text(
+        "companies:\n  type: pandas.CSVDataset\n  filepath: data/01_raw/companies.csv\n"
+    )
+    write_catalog_to_yaml(GENERATED, str(base / "auto_catalog.yml"))
+    return tmp_path / "conf"
+
+
+def _catalog(conf_source):
+    return AutoCatalogConfigLoader(conf_source=str(conf_source), base_env="base", default_run_env="base")["catalog"]
+
+
+def test_generated_entries_are_served_from_the_snapshot(conf_source, monkeypatch):
+    monkeypatch.setattr(catalog_snapshot, "yaml", SimpleNamespace(load=lambda *args, **kwargs: pytest.fail("YAML was parsed")))
+
+    catalog = _catalog(conf_source)
+
+    # Hand-written entries win over generated ones
+    assert catalog["companies"]["type"] == "pandas.CSVDataset"
+    assert catalog["reviews"] == GENERATED["reviews"]
+
+
+def test_stale_snapshot_falls_back_to_the_yaml(conf_source):
+    catalog_path = conf_source / "base" / "auto_catalog.yml"
+    catalog_path.write_text(catalog_path.read_text().replace("reviews.csv", "reviews_v2.csv"))
+
+    assert read_snapshot(snapshot_path_for(catalog_path), catalog_path) is None
+    assert _catalog(conf_source)["reviews"]["filepath"] == "data/01_raw/reviews_v2.csv"
+
+
+def test_unchanged_catalog_is_not_rewritten(conf_source):
+    catalog_path = conf_source / "base" / "auto_catalog.yml"
+    os.utime(catalog_path, ns=(0, 0))
+
+    write_catalog_to_yaml(GENERATED, str(catalog_path))
+    assert os.stat(catalog_path).st_mtime_ns == 0
+
+    write_catalog_to_yaml({"reviews": GENERATED["reviews"]}, str(catalog_path))
+    assert os.stat(catalog_path).st_mtime_ns != 0
+    assert read_snapshot(snapshot_path_for(catalog_path), catalog_path) == {"reviews": GENERATED["reviews"]}
+    assert sorted(os.listdir(catalog_path.parent)) == [".auto_catalog.yml.snapshot", "auto_catalog.yml", "catalog.yml"]
+
+
+def test_snapshot_holds_no_pickles(conf_source):
+    catalog_path = conf_source / "base" / "auto_catalog.yml"
+    snapshot_path = snapshot_path_for(catalog_path)
+    with open(snapshot_path, "rb") as f:
+        body = f.read()[len(catalog_snapshot.SNAPSHOT_MAGIC):-catalog_snapshot.DIGEST_SIZE]
+
+    assert {name: entry for name, entry in map(json.loads, body.splitlines())} == GENERATED
+
+    # Snapshots that are not JSON are ignored, whatever their digest says
+    with open(snapshot_path, "wb") as f:
+        f.write(catalog_snapshot.SNAPSHOT_MAGIC)
+        f.write(pickle.dumps(("reviews", {"type": "pandas.CSVDataset"})))
+        f.write(catalog_snapshot.file_sha256(catalog_path).encode("ascii"))
+    assert read_snapshot(snapshot_path, catalog_path) is None
+    assert _catalog(conf_source)["reviews"] == GENERATED["reviews"]
+
+
+def test_entries_json_cannot_hold_are_read_from_the_yaml(conf_source):
+    catalog_path = conf_source / "base" / "auto_catalog.yml"
+    generated = {**GENERATED, "events": {"type": "pandas.CSVDataset", "filepath": "data/events.csv", "since": date(2024, 1, 1)}}
+
+    write_catalog_to_yaml(generated, str(catalog_path))
+
+    assert read_snapshot(snapshot_path_for(catalog_path), catalog_path) is None
+    assert _catalog(conf_source)["events"]["since"] == date(2024, 1, 1)
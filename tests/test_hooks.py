@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.pipeline import Node, Pipeline
+
+from ai_tool_idea_test.hooks import AutoCatalogHooks, TranscodeCacheHooks
+from models import NodeIndex
+
+
+def _identity(*args):
+    return args[0]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, write_file):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+    write_file(tmp_path / "data" / "01_raw" / "companies.csv")
+    write_file(tmp_path / "data" / "01_raw" / "reviews.csv")
+    (tmp_path / "data" / "06_models").mkdir(parents=True)
+    (tmp_path / "data" / "06_models" / "regressor.pickle").write_bytes(b"\x00\x01")
+    write_file(tmp_path / "data" / "08_reporting" / "unrelated.pickle", "not a pickle")
+    return tmp_path
+
+
+def _pipeline(*inputs):
+    return Pipeline([Node(_identity, list(inputs), "out", name="node")])
+
+
+def test_registers_missing_inputs_of_the_run(project, fake_openai):
+    catalog = DataCatalog(datasets={"reviews": MemoryDataset()})
+    pipeline = _pipeline("companies", "reviews", "regressor", "params:alpha")
+    hooks = AutoCatalogHooks(cache_path=str(project / "cache.db"))
+
+    hooks.before_pipeline_run({"project_path": str(project)}, pipeline, catalog)
+
+    assert catalog.get_type("companies") == "kedro_datasets.pandas.csv_dataset.CSVDataset"
+    assert catalog.load("companies").shape == (1, 2)
+    assert isinstance(catalog.get("reviews"), MemoryDataset)
+    assert catalog.get_type("regressor") == "kedro_datasets.pickle.pickle_dataset.PickleDataset"
+    # Only the input nothing local could type was sent to the model
+    assert len(fake_openai.requests) == 1
+    prompt = fake_openai.requests[0]["messages"][-1]["content"]
+    assert "regressor" in prompt
+    assert "unrelated" not in prompt
+
+
+def test_nothing_to_do_when_inputs_are_catalogued(project, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("data folder should not be walked")
+
+    monkeypatch.setattr("tool_scripts.iter_data_folder", fail)
+    catalog = DataCatalog(datasets={"companies": MemoryDataset()})
+
+    AutoCatalogHooks().before_pipeline_run({"project_path": str(project)}, _pipeline("companies"), catalog)
+
+    assert list(catalog) == ["companies"]
+
+
+def test_failures_leave_the_catalog_alone(project, caplog):
+    catalog = DataCatalog()
+    hooks = AutoCatalogHooks(backend="replay", backend_options={"fixture_path": str(project / "missing.json")})
+
+    hooks.before_pipeline_run({"project_path": str(project)}, _pipeline("companies", "regressor"), catalog)
+
+    assert "companies" not in catalog
+    assert "Could not catalogue companies, regressor" in caplog.text
+
+
+class TestTranscodeCacheHooks:
+    @pytest.fixture
+    def catalog(self, project):
+        from transcode_scripts import transcoded_pair
+
+        pd.DataFrame({"id": range(2000)}).to_csv(project / "data" / "01_raw" / "reviews.csv", index=False)
+        entry = {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv"}
+        config = {"reviews": entry, **transcoded_pair("reviews", entry, min_bytes=1024)}
+        return DataCatalog.from_config(config)
+
+    def test_reads_inputs_from_their_cache(self, project, catalog):
+        TranscodeCacheHooks().before_pipeline_run({}, _pipeline("reviews"), catalog)
+
+        assert catalog.get_type("reviews") == "kedro_datasets.pandas.parquet_dataset.ParquetDataset"
+        assert catalog.load("reviews").shape == (2000, 1)
+        assert (project / ".autocatalog" / "cache" / "reviews.parquet.source.json").exists()
+
+    def test_transcoded_inputs_are_only_refreshed(self, project, catalog):
+        TranscodeCacheHooks().before_pipeline_run({}, _pipeline("reviews@parquet"), catalog)
+
+        assert catalog.get_type("reviews") == "kedro_datasets.pandas.csv_dataset.CSVDataset"
+        assert catalog.load("reviews@parquet").shape == (2000, 1)
+
+    def test_failed_conversions_keep_the_source(self, project, catalog, caplog):
+        (project / "data" / "01_raw" / "reviews.csv").unlink()
+
+        TranscodeCacheHooks().before_pipeline_run({}, _pipeline("reviews"), catalog)
+
+        assert catalog.get_type("reviews") == "kedro_datasets.pandas.csv_dataset.CSVDataset"
+        assert "Could not build 'reviews@parquet'" in caplog.text
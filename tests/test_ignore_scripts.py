@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import tool_scripts
+from ignore_scripts import IgnoreRules, load_ignore_rules
+from tool_scripts import iter_data_folder, scan_data_folder, scan_data_folder_incremental
+from watch_scripts import DirectoryPoller
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_dir, ignored",
+    [
+        ("*.tmp", "01_raw/nested/x.tmp", False, True),
+        ("/scratch", "scratch", True, True),
+        ("/scratch", "01_raw/scratch", True, False),
+        ("01_raw/*.csv", "01_raw/a.csv", False, True),
+        ("01_raw/*.csv", "01_raw/nested/a.csv", False, False),
+        ("**/backup", "a/b/backup", True, True),
+        ("exports/**", "exports/a/b.csv", False, True),
+        ("a/**/b", "a/x/y/b", False, True),
+        ("a/**/b", "a/b", False, True),
+        ("logs/", "logs", True, True),
+        ("logs/", "logs", False, False),
+        ("report_[0-9].csv", "report_7.csv", False, True),
+        ("report_[!0-9].csv", "report_7.csv", False, False),
+        ("\\#notes", "#notes", False, True),
+        ("version", "versions_report.csv", False, False),
+    ],
+)
+def test_gitignore_semantics(pattern, path, is_dir, ignored):
+    assert IgnoreRules([pattern]).ignores(path, is_dir) is ignored
+
+
+def test_last_matching_rule_wins():
+    rules = IgnoreRules(["*.csv", "!keep.csv", "# a comment", "", "01_raw/keep.csv"])
+
+    assert rules.ignores("02_intermediate/keep.csv") is False
+    assert rules.ignores("01_raw/keep.csv") is True
+    assert rules.ignores("01_raw/other.csv") is True
+    assert rules.ignores_tree("01_raw/nested/file.parquet") is False
+    assert IgnoreRules(["tmp/"]).ignores_tree("01_raw/tmp/nested/file.parquet") is True
+
+
+@pytest.fixture
+def data_dir(tmp_path, write_file):
+    data = tmp_path / "data"
+    write_file(data / "01_raw" / "companies.csv")
+    write_file(data / "01_raw" / "versions_report.csv")
+    write_file(data / "01_raw" / ".DS_Store", "")
+    write_file(data / "01_raw" / "~$companies.xlsx.tmp", "")
+    for i in range(3):
+        write_file(data / "01_raw" / ".ipynb_checkpoints" / f"companies_{i}-checkpoint.csv")
+    write_file(data / "02_intermediate" / "scratch" / "deep" / "dump.csv")
+    write_file(data / "02_intermediate" / "shuttles.csv")
+    write_file(data / ".autocatalogignore", "# local scratch space\n/02_intermediate/scratch/\n")
+    return str(data)
+
+
+def test_ignored_directories_are_never_listed(data_dir, monkeypatch):
+    listed = []
+    list_directory = tool_scripts._list_directory
+
+    def recording(abs_dir, *args, **kwargs):
+        listed.append(os.path.relpath(abs_dir, data_dir))
+        return list_directory(abs_dir, *args, **kwargs)
+
+    monkeypatch.setattr(tool_scripts, "_list_directory", recording)
+
+    files = [f.rel_path for f in scan_data_folder(data_dir, jobs=1)]
+
+    assert files == [
+        os.path.join("01_raw", "companies.csv"),
+        os.path.join("01_raw", "versions_report.csv"),
+        os.path.join("02_intermediate", "shuttles.csv"),
+    ]
+    assert [f.rel_path for f in iter_data_folder(data_dir, jobs=1)] == files
+    assert not any("checkpoints" in d or "scratch" in d for d in listed)
+
+
+def test_incremental_scan_rescans_when_the_rules_change(data_dir, tmp_path, write_file):
+    result, manifest = scan_data_folder_incremental(data_dir, jobs=1)
+    assert len(result.files) == 3
+
+    write_file(tmp_path / "data" / ".autocatalogignore", "*_report.csv\n")
+    assert load_ignore_rules(data_dir).digest != manifest["ignore"]
+    result, manifest = scan_data_folder_incremental(data_dir, manifest, jobs=1)
+
+    rel_paths = {f.rel_path for f in result.files}
+    assert os.path.join("02_intermediate", "scratch", "deep", "dump.csv") in rel_paths
+    assert os.path.join("01_raw", "versions_report.csv") not in rel_paths
+    assert os.path.join("01_raw", "versions_report.csv") in result.removed
+
+
+def test_poller_skips_ignored_directories(data_dir, write_file):
+    poller = DirectoryPoller(data_dir, on_change=None)
+    checkpoints = os.path.join("01_raw", ".ipynb_checkpoints")
+
+    assert checkpoints not in poller._mtimes
+    write_file(Path(data_dir) / checkpoints / "nested" / "new-checkpoint.csv")
+    assert not any(d.startswith(checkpoints) for d in poller.poll())
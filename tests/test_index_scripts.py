@@ -0,0 +1,51 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from index_scripts import build_node_index, node_context_for
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+@pytest.fixture
+def src_root(tmp_path):
+    root = tmp_path / "src"
+    shutil.copytree(PROJECT_SRC / "ai_tool_idea_test", root / "ai_tool_idea_test")
+    return root
+
+
+def test_maps_datasets_to_their_nodes(src_root, tmp_path):
+    index = build_node_index(str(src_root), str(tmp_path / "index.json"))
+
+    producers = [index.nodes[i] for i in index.datasets["regressor"]]
+    assert {n.name for n in producers} == {"train_model_node", "evaluate_model_node"}
+    train = next(n for n in producers if n.name == "train_model_node")
+    assert train.func == "train_model"
+    assert train.outputs == ["regressor"]
+    assert "-> LinearRegression" in train.func_source
+
+
+def test_context_only_holds_relevant_snippets(src_root, tmp_path):
+    index = build_node_index(str(src_root), str(tmp_path / "index.json"))
+
+    context = node_context_for(index, ["shuttles"])
+
+    assert list(context) == ["ai_tool_idea_test/pipelines/data_processing/pipeline.py (node `preprocess_shuttles_node`)"]
+    snippet = context[next(iter(context))]
+    assert snippet.startswith("Node(\n    func=preprocess_shuttles,")
+    # Module-level helpers called by the node function come along with it
+    assert "def _parse_money" in snippet
+    assert "train_model" not in snippet
+
+
+def test_cache_is_refreshed_when_node_module_changes(src_root, tmp_path):
+    cache_path = str(tmp_path / "index.json")
+    build_node_index(str(src_root), cache_path)
+
+    nodes = src_root / "ai_tool_idea_test" / "pipelines" / "data_science" / "nodes.py"
+    nodes.write_text(nodes.read_text().replace("-> LinearRegression", "-> object"))
+    index = build_node_index(str(src_root), cache_path)
+
+    train = next(n for n in index.nodes if n.name == "train_model_node")
+    assert "-> object" in train.func_source
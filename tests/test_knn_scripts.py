@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+
+import llm_scripts
+from backend_scripts import HeuristicsBackend
+from knn_scripts import MAX_LABEL_BYTES, TypeIndex, feature_vector
+from llm_scripts import infer_dataset_types
+from models import CatalogEntrySuggestion, NodeIndex
+
+
+def _suggestions(*filepaths):
+    return [
+        CatalogEntrySuggestion(
+            filepath=f, suggested_name=f.rsplit("/", 1)[-1].split(".")[0], suggested_type=None, is_versioned=False
+        )
+        for f in filepaths
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_source_context(monkeypatch):
+    monkeypatch.setattr(llm_scripts, "build_node_index", lambda *args: NodeIndex())
+
+
+@pytest.fixture
+def data_dir(tmp_path, write_file):
+    data = tmp_path / "data"
+    for year in (2023, 2024):
+        write_file(data / "01_raw" / f"customers_{year}.csv", "id,name,email\n1,a,b\n")
+    for name, kind in (("plot_a", "bar"), ("plot_b", "scatter")):
+        write_file(data / "08_reporting" / f"{name}.json", f'{{"data": [{{"type": "{kind}"}}], "layout": {{}}}}\n')
+    write_file(data / "05_model_input" / "params.json", '{"alpha": 1}\n')
+    return str(data)
+
+
+def test_similar_files_are_close_and_others_are_not(data_dir):
+    def similarity(a, b):
+        return float(feature_vector(a, data_dir) @ feature_vector(b, data_dir))
+
+    assert similarity("01_raw/customers_2023.csv", "01_raw/customers_2024.csv") == pytest.approx(1.0)
+    assert similarity("08_reporting/plot_a.json", "08_reporting/plot_b.json") > 0.8
+    assert similarity("08_reporting/plot_a.json", "05_model_input/params.json") < 0.8
+
+
+def test_classifies_by_nearest_neighbours_above_the_threshold(data_dir, tmp_path):
+    index = TypeIndex(str(tmp_path / "index.npy"))
+    index.learn("01_raw/customers_2023.csv", "pandas.CSVDataset", data_dir)
+    index.learn("08_reporting/plot_a.json", "plotly.JSONDataset", data_dir)
+    index.close()
+
+    results = TypeIndex(str(tmp_path / "index.npy")).classify(
+        _suggestions("01_raw/customers_2024.csv", "08_reporting/plot_b.json", "05_model_input/params.json"), data_dir
+    )
+
+    assert {name: label for name, (label, _) in results.items()} == {
+        "customers_2024": "pandas.CSVDataset",
+        "plot_b": "plotly.JSONDataset",
+    }
+
+
+def test_index_is_mapped_and_updated_in_place(data_dir, tmp_path):
+    path = str(tmp_path / "index.npy")
+    with TypeIndex(path) as index:
+        index.learn("08_reporting/plot_a.json", "json.JSONDataset", data_dir)
+        index.learn("01_raw/customers_2023.csv", "pandas.CSVDataset", data_dir)
+
+    with TypeIndex(path) as index:
+        assert isinstance(index._vectors, np.memmap)
+        assert len(index) == 2
+        # Same file and type is not added twice, a corrected type replaces the row
+        index.learn("01_raw/customers_2023.csv", "pandas.CSVDataset", data_dir)
+        index.learn("08_reporting/plot_a.json", "plotly.JSONDataset", data_dir)
+
+    index = TypeIndex(path)
+    assert len(index) == 2
+    assert index.classify(_suggestions("08_reporting/plot_b.json"), data_dir)["plot_b"][0] == "plotly.JSONDataset"
+
+
+def test_learned_rows_are_matched_without_copying_the_mapped_ones(data_dir, tmp_path, monkeypatch):
+    path = str(tmp_path / "index.npy")
+    with TypeIndex(path) as index:
+        index.learn("08_reporting/plot_a.json", "json.JSONDataset", data_dir)
+        index.learn("01_raw/customers_2023.csv", "pandas.CSVDataset", data_dir)
+
+    index = TypeIndex(path)
+    index.learn("08_reporting/plot_a.json", "plotly.JSONDataset", data_dir)
+    monkeypatch.setattr(index, "_merged", lambda: pytest.fail("mapped rows copied"))
+    results = index.classify(_suggestions("08_reporting/plot_b.json", "01_raw/customers_2024.csv"), data_dir)
+
+    assert {name: label for name, (label, _) in results.items()} == {
+        "plot_b": "plotly.JSONDataset",
+        "customers_2024": "pandas.CSVDataset",
+    }
+
+
+def test_type_names_too_long_to_store_are_not_learned(data_dir, tmp_path):
+    index = TypeIndex(str(tmp_path / "index.npy"))
+    index.learn("01_raw/customers_2023.csv", "my_project.datasets." + "x" * MAX_LABEL_BYTES, data_dir)
+
+    assert len(index) == 0
+
+
+def test_learns_hand_written_catalog_entries(data_dir, tmp_path):
+    index = TypeIndex(str(tmp_path / "index.npy"))
+    index.learn_catalog(
+        {
+            "customers": {"type": "kedro_datasets.pandas.CSVDataset", "filepath": "data/01_raw/customers_2023.csv"},
+            "elsewhere": {"type": "pandas.CSVDataset", "filepath": "s3://bucket/customers.csv"},
+            "memory": {"type": "MemoryDataset"},
+        },
+        "data",
+        data_dir,
+    )
+
+    assert len(index) == 1
+    assert index.classify(_suggestions("01_raw/customers_2024.csv"), data_dir)["customers_2024"][0] == "pandas.CSVDataset"
+
+
+def test_only_outliers_are_sent_to_the_model(data_dir, tmp_path, fake_openai):
+    fake_openai.responder = lambda prompt: "\n".join(
+        f"{name}: plotly.JSONDataset" for name in ("plot_a", "plot_b", "params") if f"{name}:" in prompt
+    )
+    path = str(tmp_path / "index.npy")
+
+    with TypeIndex(path, learn_model_answers=True) as index:
+        infer_dataset_types(_suggestions("08_reporting/plot_a.json"), verbose=False, data_dir=data_dir, type_index=index)
+    with TypeIndex(path) as index:
+        result = infer_dataset_types(
+            _suggestions("08_reporting/plot_b.json", "05_model_input/params.json"),
+            verbose=False,
+            data_dir=data_dir,
+            type_index=index,
+        )
+
+    assert [s.suggested_type for s in result] == ["plotly.JSONDataset", "plotly.JSONDataset"]
+    assert len(fake_openai.requests) == 2
+    second = fake_openai.requests[1]["messages"][-1]["content"]
+    assert "params:" in second and "plot_b:" not in second
+
+
+def test_model_answers_are_only_learned_when_asked_for(data_dir, tmp_path, fake_openai):
+    fake_openai.responder = lambda prompt: "plot_a: plotly.JSONDataset"
+
+    with TypeIndex(str(tmp_path / "index.npy")) as index:
+        infer_dataset_types(_suggestions("08_reporting/plot_a.json"), verbose=False, data_dir=data_dir, type_index=index)
+
+    assert len(index) == 0
+    assert not (tmp_path / "index.npy").exists()
+
+
+def test_offline_guesses_are_not_learned(data_dir, tmp_path):
+    with TypeIndex(str(tmp_path / "index.npy"), learn_model_answers=True) as index:
+        infer_dataset_types(
+            _suggestions("01_raw/customers_2023.csv"),
+            verbose=False,
+            data_dir=data_dir,
+            backend=HeuristicsBackend(),
+            type_index=index,
+        )
+
+    assert len(index) == 0
+    assert not (tmp_path / "index.npy").exists()
@@ -0,0 +1,174 @@
+import random
+import time
+
+import pytest
+
+import llm_scripts
+from llm_scripts import chunk_suggestions, infer_dataset_types, parse_llm_response, valid_dataset_type
+from models import CatalogEntrySuggestion, NodeIndex
+from tests.fake_openai_server import answer_by_extension, dataset_entries
+
+
+def _suggestions(n):
+    extensions = [".csv", ".parquet", ".xlsx", ".json", ".pickle"]
+    return [
+        CatalogEntrySuggestion(
+            filepath=f"01_raw/dataset_{i}{extensions[i % len(extensions)]}",
+            suggested_name=f"dataset_{i}",
+            suggested_type=None,
+            is_versioned=False,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_source_context(monkeypatch):
+    monkeypatch.setattr(llm_scripts, "build_node_index", lambda *args: NodeIndex())
+
+
+class TestChunkSuggestions:
+    def test_single_chunk_when_within_budget(self):
+        suggestions = _suggestions(10)
+
+        assert chunk_suggestions(suggestions, None) == [suggestions]
+
+    def test_respects_token_budget_and_keeps_order(self):
+        suggestions = _suggestions(100)
+        base = chunk_suggestions([], None)
+
+        chunks = chunk_suggestions(suggestions, "x" * 2000, max_prompt_tokens=1500)
+
+        assert base == []
+        assert len(chunks) > 1
+        assert [s for chunk in chunks for s in chunk] == suggestions
+
+    def test_respects_entry_cap(self):
+        chunks = chunk_suggestions(_suggestions(25), None, max_chunk_entries=10)
+
+        assert [len(c) for c in chunks] == [10, 10, 5]
+
+    def test_oversized_context_still_sends_one_entry_per_chunk(self):
+        chunks = chunk_suggestions(_suggestions(3), "x" * 10_000, max_prompt_tokens=100)
+
+        assert [len(c) for c in chunks] == [1, 1, 1]
+
+
+class TestInferDatasetTypes:
+    def test_chunks_are_sent_concurrently_and_merged_in_order(self, fake_openai):
+        def slow_random_answer(prompt):
+            time.sleep(random.uniform(0, 0.05))
+            return answer_by_extension(prompt)
+
+        fake_openai.responder = slow_random_answer
+        suggestions = _suggestions(50)
+
+        result = infer_dataset_types(
+            suggestions, verbose=False, max_chunk_entries=5, max_concurrency=3
+        )
+
+        assert len(fake_openai.requests) == 10
+        assert 1 < fake_openai.max_in_flight <= 3
+        assert [s.suggested_name for s in result] == [f"dataset_{i}" for i in range(50)]
+        assert result[0].suggested_type == "pandas.CSVDataset"
+        assert result[4].suggested_type == "pickle.PickleDataset"
+
+    def test_ignores_answers_for_datasets_outside_the_chunk(self, fake_openai):
+        def answer_for_other_chunk_too(prompt):
+            answer = answer_by_extension(prompt)
+            if "dataset_0:" not in prompt:
+                answer += "\ndataset_0: pickle.PickleDataset"
+            return answer
+
+        fake_openai.responder = answer_for_other_chunk_too
+
+        result = infer_dataset_types(_suggestions(4), verbose=False, max_chunk_entries=2)
+
+        assert result[0].suggested_type == "pandas.CSVDataset"
+
+
+    def test_asks_again_only_for_missing_or_invalid_entries(self, fake_openai):
+        def drop_and_garble(prompt):
+            if "Your previous answer" in prompt:
+                return answer_by_extension(prompt)
+            lines = answer_by_extension(prompt).splitlines()
+            return "\n".join([lines[0], "dataset_2: pandas.CSVFile", *lines[3:]])
+
+        fake_openai.responder = drop_and_garble
+
+        result = infer_dataset_types(_suggestions(5), verbose=False)
+
+        assert len(fake_openai.requests) == 2
+        assert "response_format" in fake_openai.requests[0]
+        reask = fake_openai.requests[1]["messages"][-1]["content"]
+        assert [name for name, _ in dataset_entries(reask)] == ["dataset_1", "dataset_2"]
+        assert "- dataset_1: no answer" in reask
+        assert "- dataset_2: `pandas.CSVFile` is not a Kedro dataset class" in reask
+        assert [s.suggested_type for s in result][:3] == [
+            "pandas.CSVDataset", "pandas.ParquetDataset", "pandas.ExcelDataset"
+        ]
+
+    def test_leaves_out_entries_still_invalid_after_the_last_reask(self, fake_openai):
+        fake_openai.responder = lambda prompt: "\n".join(f"{name}: pandas.CSVFile" for name, _ in dataset_entries(prompt))
+
+        result = infer_dataset_types(_suggestions(2), verbose=False, max_reasks=1)
+
+        assert len(fake_openai.requests) == 2
+        assert [s.suggested_type for s in result] == [None, None]
+
+    def test_does_not_ask_again_for_entries_the_model_called_unknown(self, fake_openai):
+        def unknown_first(prompt):
+            lines = answer_by_extension(prompt).splitlines()
+            if "Your previous answer" in prompt:
+                return "\n".join(lines)
+            return "\n".join(["dataset_0: unknown", "dataset_1: pandas.CSVFile", *lines[2:]])
+
+        fake_openai.responder = unknown_first
+
+        result = infer_dataset_types(_suggestions(3), verbose=False)
+
+        assert len(fake_openai.requests) == 2
+        reask = fake_openai.requests[1]["messages"][-1]["content"]
+        assert [name for name, _ in dataset_entries(reask)] == ["dataset_1"]
+        assert [s.suggested_type for s in result] == [None, "pandas.ParquetDataset", "pandas.ExcelDataset"]
+
+
+def test_parses_structured_fenced_and_line_replies():
+    structured = '{"datasets": [{"name": "a", "type": "pandas.CSVDataset"}]}'
+
+    assert parse_llm_response(structured) == {"a": "pandas.CSVDataset"}
+    assert parse_llm_response(f"```json\n{structured}\n```") == {"a": "pandas.CSVDataset"}
+    assert parse_llm_response("a: pandas.CSVDataset\nb: unknown") == {"a": "pandas.CSVDataset", "b": "unknown"}
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("pandas.CSVDataset", "pandas.CSVDataset"),
+        ("kedro_datasets.pandas.ParquetDataset", "pandas.ParquetDataset"),
+        ("`pickle.pickledataset`", "pickle.PickleDataset"),
+        ("pandas.CSVFile", None),
+        ("unknown", None),
+        (None, None),
+    ],
+)
+def test_only_known_dataset_classes_are_valid(answer, expected):
+    assert valid_dataset_type(answer) == expected
+
+
+def test_chunks_account_for_per_dataset_snippets_once():
+    suggestions = _suggestions(4)
+    shared = {"pipeline.py (node `a`)": "x" * 400}
+
+    chunks = chunk_suggestions(
+        suggestions, None, max_prompt_tokens=600, snippets_for=lambda s: shared
+    )
+
+    # The shared ~100 token snippet is only counted once per chunk
+    assert chunks == [suggestions]
+
+    chunks = chunk_suggestions(
+        suggestions, None, max_prompt_tokens=600, snippets_for=lambda s: {s.suggested_name: "x" * 400}
+    )
+
+    assert len(chunks) > 1
@@ -0,0 +1,109 @@
+import pytest
+import yaml
+from kedro.io import DataCatalog
+
+from partition_scripts import find_collections, group_collections
+from tool_scripts import iter_catalog_suggestions, iter_data_folder, scan_data_table, stream_auto_catalog, update_auto_catalog
+from table_scripts import plan_catalog
+
+
+@pytest.fixture
+def data_dir(tmp_path, write_file):
+    data = tmp_path / "data"
+    write_file(data / "01_raw" / "companies.csv")
+    for day in range(1, 7):
+        write_file(data / "01_raw" / "drops" / f"sales_2024-01-0{day}.csv")
+    write_file(data / "01_raw" / "drops" / "CHECKPOINT", "sales_2024-01-03.csv")
+    for part in range(5):
+        write_file(data / "01_raw" / "parts" / f"part-{part:05d}.json", '{"a": 1}\n{"a": 2}\n')
+    for day in range(1, 6):
+        write_file(data / "02_intermediate" / "events" / f"date=2024-02-0{day}" / "part-0.csv")
+    # Mixed shapes and directories with something else in them stay file by file
+    for name in ("train_1.csv", "train_2.csv", "test_1.csv", "test_2.csv", "test_3.csv"):
+        write_file(data / "05_model_input" / name)
+    for day in range(1, 6):
+        write_file(data / "03_primary" / "daily" / f"2024-03-0{day}.csv")
+    write_file(data / "03_primary" / "daily" / "notes" / "readme.txt", "notes")
+    return str(data)
+
+
+def _collections(data_dir, **kwargs):
+    table = find_collections(plan_catalog(scan_data_table(data_dir)), **kwargs)
+    return {row["root"]: row for row in table.to_pylist()}
+
+
+def test_finds_dedicated_directories_of_same_shaped_files(data_dir):
+    collections = _collections(data_dir)
+
+    assert set(collections) == {"01_raw/drops", "01_raw/parts", "02_intermediate/events"}
+    assert collections["01_raw/drops"]["collection_type"] == "partitions.IncrementalDataset"
+    assert collections["01_raw/drops"]["sample"] == "01_raw/drops/sales_2024-01-01.csv"
+    assert collections["01_raw/parts"]["collection_type"] == "partitions.PartitionedDataset"
+    assert collections["02_intermediate/events"]["files"] == 5
+
+
+def test_small_or_used_collections_stay_file_by_file(data_dir):
+    assert "01_raw/parts" not in _collections(data_dir, min_partitions=6)
+    assert "01_raw/drops" not in _collections(data_dir, exclude_names={"sales_2024-01-02"})
+
+
+def test_streaming_finds_the_same_collections(data_dir):
+    suggestions = list(group_collections(iter_catalog_suggestions(iter_data_folder(data_dir))))
+
+    grouped = {s.collection_path: s.collection_type for s in suggestions if s.collection_type}
+    assert grouped == {root: row["collection_type"] for root, row in _collections(data_dir).items()}
+    names = [s.suggested_name for s in suggestions]
+    assert "CHECKPOINT" not in names
+    assert {"train_1", "test_3", "readme", "2024-03-01"} <= set(names)
+
+
+def test_stream_and_full_rebuild_write_the_same_catalog(data_dir, tmp_path):
+    options = dict(data_dir=data_dir, cache_path=None, backend="heuristics", project_path=None)
+
+    update_auto_catalog(incremental=False, output_path=str(tmp_path / "full.yml"), **options)
+    stream_auto_catalog(output_path=str(tmp_path / "stream.yml"), batch_size=3, queue_size=1, **options)
+
+    assert (tmp_path / "stream.yml").read_text() == (tmp_path / "full.yml").read_text()
+
+
+def test_collections_load_through_kedro(data_dir, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output_path = str(tmp_path / "catalog.yml")
+    update_auto_catalog(
+        incremental=False, data_dir="data", output_path=output_path, cache_path=None, backend="heuristics", project_path=None
+    )
+
+    with open(output_path) as f:
+        config = yaml.safe_load(f)
+    assert config["parts"]["dataset"]["type"] == "pandas.JSONDataset"
+    assert config["parts"]["filename_suffix"] == ".json"
+    assert not any(name.startswith("sales_") or name.startswith("part-") for name in config)
+
+    catalog = DataCatalog.from_config(config)
+    assert len(catalog.load("parts")) == 5
+    # Only the partitions after the checkpoint are new
+    assert sorted(catalog.load("drops")) == ["sales_2024-01-04", "sales_2024-01-05", "sales_2024-01-06"]
+
+
+def test_incremental_update_replaces_files_that_became_a_collection(tmp_path, monkeypatch, write_file):
+    monkeypatch.chdir(tmp_path)
+    options = dict(
+        data_dir="data",
+        output_path=str(tmp_path / "catalog.yml"),
+        manifest_path=str(tmp_path / "manifest.json"),
+        cache_path=None,
+        backend="heuristics",
+        project_path=None,
+    )
+    for day in range(1, 5):
+        write_file(tmp_path / "data" / "drops" / f"2024-01-0{day}.csv")
+    update_auto_catalog(incremental=True, **options)
+    assert "2024-01-01" in yaml.safe_load((tmp_path / "catalog.yml").read_text())
+
+    write_file(tmp_path / "data" / "drops" / "2024-01-05.csv")
+    update_auto_catalog(incremental=True, **options)
+    assert list(yaml.safe_load((tmp_path / "catalog.yml").read_text())) == ["drops"]
+
+    # Nothing changed, the collection is kept
+    update_auto_catalog(incremental=True, **options)
+    assert list(yaml.safe_load((tmp_path / "catalog.yml").read_text())) == ["drops"]
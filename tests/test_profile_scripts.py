@@ -0,0 +1,150 @@
+import json
+import re
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+from kedro_datasets.pandas import CSVDataset, ExcelDataset, JSONDataset, ParquetDataset
+
+from models import CatalogEntrySuggestion
+from profile_scripts import profile_dataset, profile_datasets
+from resolver_scripts import HEADER_BYTES
+
+VERSION = "2025-01-01T10.00.00.000Z"
+
+
+@pytest.fixture
+def companies(tmp_path):
+    path = tmp_path / "companies.csv"
+    path.write_text("id;rating;approved;location\n1;1.5;true;Oslo\n2;2;false;\n")
+    return path
+
+
+def test_csv_types_come_from_the_head(companies):
+    load_args = profile_dataset(str(companies), "pandas.CSVDataset")["load_args"]
+
+    assert load_args == {
+        "engine": "pyarrow",
+        "dtype_backend": "pyarrow",
+        "sep": ";",
+        "dtype": {
+            "id": "int64[pyarrow]",
+            "rating": "double[pyarrow]",
+            "approved": "bool[pyarrow]",
+            "location": "string[pyarrow]",
+        },
+    }
+    frame = CSVDataset(filepath=str(companies), load_args=load_args).load()
+    assert frame["rating"].tolist() == [1.5, 2.0]
+
+
+def test_csv_usecols_when_the_pipeline_reads_a_subset(companies):
+    load_args = profile_dataset(str(companies), "pandas.CSVDataset", {"rating", "id"})["load_args"]
+
+    assert load_args["usecols"] == ["id", "rating"]
+    assert set(load_args["dtype"]) == {"id", "rating"}
+    assert list(CSVDataset(filepath=str(companies), load_args=load_args).load().columns) == ["id", "rating"]
+    # Unknown or all columns read everything
+    assert "usecols" not in profile_dataset(str(companies), "pandas.CSVDataset", {"id", "missing"})["load_args"]
+
+
+def test_large_csv_only_reads_the_head(tmp_path):
+    path = tmp_path / "large.csv"
+    row = "1,2.5,text\n"
+    path.write_text("a,b,c\n" + row * (2 * HEADER_BYTES // len(row)))
+
+    load_args = profile_dataset(str(path), "pandas.CSVDataset")["load_args"]
+
+    assert load_args["dtype"] == {"c": "string[pyarrow]"}
+
+
+def test_csv_type_changing_below_the_head_still_loads(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("id,price\n" + "".join(f"{i},{i}.5\n" for i in range(20_000)) + "unknown,n/a\n")
+    assert path.stat().st_size > HEADER_BYTES
+
+    load_args = profile_dataset(str(path), "pandas.CSVDataset")["load_args"]
+
+    assert "dtype" not in load_args
+    frame = CSVDataset(filepath=str(path), load_args=load_args).load()
+    assert len(frame) == 20_001
+    assert frame["id"].iloc[-1] == "unknown"
+
+
+def test_parquet_columns_from_the_footer(tmp_path):
+    path = tmp_path / "table.parquet"
+    pd.DataFrame({"a": [1], "b": ["x"], "c": [2.0]}).to_parquet(path)
+
+    args = profile_dataset(str(path), "pandas.ParquetDataset", {"a", "c"})
+
+    assert args["load_args"] == {"engine": "pyarrow", "dtype_backend": "pyarrow", "columns": ["a", "c"]}
+    assert list(ParquetDataset(filepath=str(path), load_args=args["load_args"]).load().columns) == ["a", "c"]
+
+
+def _shared_strings_workbook(path):
+    # Excel keeps cell strings in a shared table, openpyxl writes them inline
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["id", "price", "crew"])
+    workbook.save(path)
+    with zipfile.ZipFile(path) as zf:
+        members = {name: zf.read(name) for name in zf.namelist()}
+    cells = "".join(f'<c r="{col}1" t="s"><v>{i}</v></c>' for i, col in enumerate("ABC"))
+    members["xl/worksheets/sheet1.xml"] = re.sub(
+        rb"<row .*</row>", f'<row r="1">{cells}</row>'.encode(), members["xl/worksheets/sheet1.xml"]
+    )
+    members["xl/sharedStrings.xml"] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        "<si><t>id</t></si><si><r><t>pri</t></r><r><t>ce</t></r></si><si><t>crew</t></si></sst>"
+    ).encode()
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+
+def test_excel_header_without_loading_cells(tmp_path):
+    path = tmp_path / "shuttles.xlsx"
+    pd.DataFrame({"id": [1], "price": ["$1"], "crew": [3]}).to_excel(path, index=False)
+
+    load_args = profile_dataset(str(path), "pandas.ExcelDataset", {"id", "price"})["load_args"]
+
+    assert load_args == {"engine": "openpyxl", "dtype_backend": "pyarrow", "usecols": ["id", "price"]}
+    assert list(ExcelDataset(filepath=str(path), load_args=load_args).load().columns) == ["id", "price"]
+    assert "usecols" not in profile_dataset(str(path), "pandas.ExcelDataset")["load_args"]
+
+
+def test_excel_header_from_shared_strings(tmp_path):
+    path = tmp_path / "shuttles.xlsx"
+    _shared_strings_workbook(path)
+
+    load_args = profile_dataset(str(path), "pandas.ExcelDataset", {"price", "crew"})["load_args"]
+
+    assert load_args["usecols"] == ["price", "crew"]
+
+
+def test_json_lines(tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text("\n".join(json.dumps({"a": i}) for i in range(3)))
+
+    args = profile_dataset(str(path), "pandas.JSONDataset")
+
+    assert args["load_args"]["lines"] is True
+    dataset = JSONDataset(filepath=str(path), load_args=args["load_args"], save_args=args["save_args"])
+    assert dataset.load()["a"].tolist() == [0, 1, 2]
+
+
+def test_profiles_latest_version_and_skips_other_types(tmp_path):
+    (tmp_path / "t.csv" / VERSION).mkdir(parents=True)
+    (tmp_path / "t.csv" / VERSION / "t.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "model.pickle").write_bytes(b"\x80\x04")
+    suggestions = [
+        CatalogEntrySuggestion(filepath="t.csv", suggested_name="t", suggested_type="pandas.CSVDataset", is_versioned=True),
+        CatalogEntrySuggestion(filepath="model.pickle", suggested_name="model", suggested_type="pickle.PickleDataset", is_versioned=False),
+        CatalogEntrySuggestion(filepath="missing.csv", suggested_name="missing", suggested_type="pandas.CSVDataset", is_versioned=False),
+    ]
+
+    profile_datasets(suggestions, str(tmp_path))
+
+    assert suggestions[0].load_args["dtype"] == {"a": "int64[pyarrow]", "b": "int64[pyarrow]"}
+    assert suggestions[1].load_args is None
+    assert suggestions[2].load_args is None
@@ -0,0 +1,123 @@
+import logging
+
+import fsspec
+import pytest
+import yaml
+from kedro.io import DataCatalog
+
+from remote_scripts import catalog_root, is_remote, list_remote_directory, local_path
+from resolver_scripts import sniff_dataset_type
+from telemetry_scripts import Tracer
+from tool_scripts import observe_project, scan_data_folder, stream_auto_catalog, update_auto_catalog
+
+
+@pytest.fixture
+def bucket():
+    fs = fsspec.filesystem("memory")
+    fs.store.clear()
+    fs.pseudo_dirs[:] = [""]
+    fs.pipe({
+        "/data/01_raw/companies.csv": b"id,name\n1,acme\n2,globex\n",
+        "/data/01_raw/reviews.json": b'[{"id": 1, "stars": 5}]',
+        "/data/02_intermediate/nested/shuttles.csv": b"id,engines\n1,2\n",
+        "/data/06_models/model.pkl/2024-01-01T00.00.00.000Z/model.pkl": b"\x80\x04N.",
+    })
+    yield "memory:///data"
+    fs.store.clear()
+    fs.pseudo_dirs[:] = [""]
+
+
+def _update(data_dir, output_path, **kwargs):
+    update_auto_catalog(
+        data_dir=data_dir, output_path=str(output_path), cache_path=None, backend="heuristics", project_path=None, **kwargs
+    )
+    with open(output_path) as f:
+        return yaml.safe_load(f)
+
+
+def test_urls_and_local_paths():
+    assert is_remote("s3://bucket/data") and not is_remote("file:///tmp/data") and not is_remote("data")
+    assert local_path("file:///tmp/data") == "/tmp/data"
+    assert catalog_root("gs://bucket/data/") == "gs://bucket/data"
+    assert catalog_root("/tmp/data") == "data"
+
+
+def test_lists_sizes_and_etags_in_one_call(bucket):
+    files, subdirs = list_remote_directory(f"{bucket}/01_raw")
+
+    assert subdirs == []
+    assert files["companies.csv"][0] == 24
+    assert files["companies.csv"][1] is not None
+    assert sniff_dataset_type(f"{bucket}/01_raw/companies.csv")[0] == "pandas.CSVDataset"
+
+
+def test_remote_catalog_loads_through_kedro(bucket, tmp_path):
+    catalog = _update(bucket, tmp_path / "catalog.yml", incremental=False)
+
+    assert catalog["companies"]["filepath"] == "memory:///data/01_raw/companies.csv"
+    assert catalog["shuttles"]["filepath"] == "memory:///data/02_intermediate/nested/shuttles.csv"
+    assert catalog["model"]["versioned"] is True
+    assert DataCatalog.from_config(catalog).load("companies")["name"].tolist() == ["acme", "globex"]
+
+
+def test_versioned_dataset_in_a_bucket(bucket):
+    project = observe_project(scan_data_folder(bucket))
+
+    [model] = project.versioned_datasets
+    assert model.path == "06_models/model.pkl"
+    assert model.latest_version == "2024-01-01T00.00.00.000Z"
+    assert model.version_count == 1
+    assert model.total_bytes is None
+
+
+def test_scan_lists_each_prefix_once(bucket, tmp_path, monkeypatch):
+    fs = fsspec.filesystem("memory")
+    calls = {"ls": 0, "info": 0}
+    for method in calls:
+        original = getattr(fs, method)
+
+        def counted(*args, _method=method, _original=original, **kwargs):
+            calls[_method] += 1
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(fs, method, counted)
+
+    with Tracer() as tracer:
+        _update(bucket, tmp_path / "catalog.yml", incremental=False, profile=False)
+
+    # data, 01_raw, 02_intermediate, nested, 06_models, model.pkl and its version
+    assert tracer.totals()["remote.listings"] == 7
+    # No object is looked up on its own outside of sniffing its bytes
+    assert calls["info"] <= 2 * 4
+
+
+def test_stream_and_full_rebuild_agree(bucket, tmp_path):
+    options = dict(data_dir=bucket, cache_path=None, backend="heuristics", project_path=None)
+
+    update_auto_catalog(incremental=False, output_path=str(tmp_path / "full.yml"), **options)
+    stream_auto_catalog(output_path=str(tmp_path / "stream.yml"), batch_size=2, **options)
+
+    assert (tmp_path / "stream.yml").read_text() == (tmp_path / "full.yml").read_text()
+
+
+def test_incremental_update_of_a_bucket_rescans_it(bucket, tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger="tool_scripts")
+    options = dict(incremental=True, manifest_path=str(tmp_path / "manifest.json"))
+
+    first = _update(bucket, tmp_path / "catalog.yml", **options)
+    fsspec.filesystem("memory").pipe("/data/01_raw/more.csv", b"a\n1\n")
+    second = _update(bucket, tmp_path / "catalog.yml", **options)
+
+    assert "scanning it in full" in caplog.text
+    assert set(second) - set(first) == {"more"}
+
+
+def test_file_urls_are_scanned_locally(tmp_path):
+    (tmp_path / "data" / "01_raw").mkdir(parents=True)
+    (tmp_path / "data" / "01_raw" / "companies.csv").write_text("id\n1\n")
+    data_dir = f"file://{tmp_path / 'data'}"
+
+    catalog = _update(data_dir, tmp_path / "catalog.yml", incremental=False)
+
+    assert catalog["companies"]["filepath"] == f"{data_dir}/01_raw/companies.csv"
+    assert DataCatalog.from_config(catalog).load("companies")["id"].tolist() == [1]
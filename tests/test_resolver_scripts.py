@@ -0,0 +1,132 @@
+import pickle
+import zipfile
+
+import pytest
+import yaml
+from kedro.io import DataCatalog
+
+from models import CatalogEntrySuggestion
+from resolver_scripts import (
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    HEADER_BYTES,
+    MMAP_MIN_SIZE,
+    resolve_dataset_types,
+    sniff_dataset_type,
+)
+from telemetry_scripts import SNIFF_BYTES_READ, Tracer
+from tool_scripts import update_auto_catalog
+
+
+def _write_workbook(path, member="xl/workbook.xml"):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr(member, "<workbook/>")
+
+
+@pytest.mark.parametrize(
+    "name, content, expected",
+    [
+        ("table.parquet", b"PAR1" + b"\x00" * 32 + b"PAR1", "pandas.ParquetDataset"),
+        ("model.pickle", pickle.dumps({"a": 1}, protocol=4), "pickle.PickleDataset"),
+        ("companies.csv", b"id;rating\n1;90%\n2;80%\n", "pandas.CSVDataset"),
+        ("events.jsonl", b'{"id": 1}\n{"id": 2}\n', "pandas.JSONDataset"),
+        ("embeddings.json", b'[{"text": "a", "embedding": [0.1]}]', "json.JSONDataset"),
+        ("params.yml", b"a: 1\n", "yaml.YAMLDataset"),
+    ],
+)
+def test_sniffs_unambiguous_files(tmp_path, name, content, expected):
+    path = tmp_path / name
+    path.write_bytes(content)
+
+    dataset_type, confidence = sniff_dataset_type(str(path))
+
+    assert dataset_type == expected
+    assert confidence >= 0.8
+
+
+def test_hdf5_is_left_to_the_model(tmp_path):
+    path = tmp_path / "store.h5"
+    path.write_bytes(b"\x89HDF\r\n\x1a\n" + b"\x00" * 32)
+    suggestions = [CatalogEntrySuggestion(filepath="store.h5", suggested_name="store", suggested_type=None, is_versioned=False)]
+
+    unresolved = resolve_dataset_types(suggestions, str(tmp_path))
+
+    assert unresolved == suggestions
+    assert suggestions[0].suggested_type is None
+    assert suggestions[0].confidence < DEFAULT_CONFIDENCE_THRESHOLD
+
+
+def test_xlsx_needs_a_workbook_member(tmp_path):
+    _write_workbook(tmp_path / "shuttles.xlsx")
+    _write_workbook(tmp_path / "report.docx", member="word/document.xml")
+
+    assert sniff_dataset_type(str(tmp_path / "shuttles.xlsx"))[0] == "pandas.ExcelDataset"
+    assert sniff_dataset_type(str(tmp_path / "report.docx")) == (None, 0.0)
+
+
+def test_large_files_are_read_through_mmap(tmp_path):
+    path = tmp_path / "reviews.csv"
+    row = b"1,2,3\n"
+    path.write_bytes(b"a,b,c\n" + row * (MMAP_MIN_SIZE // len(row) + 1))
+
+    assert sniff_dataset_type(str(path)) == ("pandas.CSVDataset", 0.95)
+
+
+def test_files_below_the_mmap_size_only_read_head_and_tail(tmp_path):
+    path = tmp_path / "table.parquet"
+    path.write_bytes(b"PAR1" + b"\x00" * (MMAP_MIN_SIZE // 2) + b"PAR1")
+
+    with Tracer() as tracer, tracer.span("resolve"):
+        assert sniff_dataset_type(str(path))[0] == "pandas.ParquetDataset"
+
+    assert tracer.totals()[SNIFF_BYTES_READ] == HEADER_BYTES + 4
+
+
+def test_entries_get_the_args_they_cannot_load_without(tmp_path):
+    data = tmp_path / "data" / "01_raw"
+    data.mkdir(parents=True)
+    (data / "events.jsonl").write_text('{"id": 1, "kind": "a"}\n{"id": 2, "kind": "b"}\n')
+    (data / "ratings.tsv").write_text("id\trating\n1\t90\n2\t80\n")
+
+    update_auto_catalog(
+        data_dir=str(tmp_path / "data"),
+        output_path=str(tmp_path / "catalog.yml"),
+        cache_path=None,
+        backend="heuristics",
+        project_path=None,
+        incremental=False,
+        profile=False,
+    )
+    with open(tmp_path / "catalog.yml") as f:
+        config = yaml.safe_load(f)
+    for entry in config.values():
+        entry["filepath"] = str(tmp_path / entry["filepath"])
+    catalog = DataCatalog.from_config(config)
+
+    assert catalog.load("events")["kind"].tolist() == ["a", "b"]
+    assert list(catalog.load("ratings").columns) == ["id", "rating"]
+
+
+def test_versioned_dataset_uses_latest_version(tmp_path):
+    dataset = tmp_path / "regressor.pickle"
+    for version in ("2024-01-01T00.00.00.000Z", "2024-02-01T00.00.00.000Z"):
+        (dataset / version).mkdir(parents=True)
+        (dataset / version / "regressor.pickle").write_bytes(pickle.dumps(1, protocol=5))
+
+    assert sniff_dataset_type(str(dataset))[0] == "pickle.PickleDataset"
+
+
+def test_resolve_dataset_types_returns_low_confidence_entries(tmp_path):
+    (tmp_path / "companies.csv").write_text("id,name\n1,a\n")
+    (tmp_path / "notes.txt").write_text("free text")
+    suggestions = [
+        CatalogEntrySuggestion(filepath=name, suggested_name=name.split(".")[0], suggested_type=None, is_versioned=False)
+        for name in ("companies.csv", "notes.txt", "missing.csv")
+    ]
+
+    unresolved = resolve_dataset_types(suggestions, str(tmp_path))
+
+    assert [s.suggested_name for s in unresolved] == ["notes", "missing"]
+    assert suggestions[0].suggested_type == "pandas.CSVDataset"
+    assert suggestions[1].suggested_type is None
+    assert suggestions[1].confidence == 0.6
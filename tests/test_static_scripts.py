@@ -0,0 +1,106 @@
+import pandas as pd
+import plotly.graph_objs as go
+from kedro.pipeline import Node, Pipeline
+
+from ai_tool_idea_test.pipelines.data_processing import create_pipeline as create_dp_pipeline
+from ai_tool_idea_test.pipelines.data_science import create_pipeline as create_ds_pipeline
+from ai_tool_idea_test.pipelines.reporting import create_pipeline as create_reporting_pipeline
+from models import CatalogEntrySuggestion
+from static_scripts import (
+    DATAFRAME,
+    apply_static_types,
+    infer_output_types,
+    infer_pipeline_column_usage,
+    infer_pipeline_dataset_types,
+    used_columns,
+)
+
+
+def summarise(frame: pd.DataFrame):
+    return frame.groupby(["kind"]).mean(numeric_only=True).reset_index()
+
+
+def split(frame: pd.DataFrame):
+    left = frame[["a"]]
+    figure = go.Figure()
+    return left, figure
+
+
+def inconsistent(flag: bool):
+    if flag:
+        return pd.DataFrame()
+    return {}
+
+
+def test_output_types_from_return_expressions():
+    assert infer_output_types(summarise, 1) == [(DATAFRAME, 0.85)]
+    assert infer_output_types(split, 2) == [
+        (DATAFRAME, 0.85),
+        ("plotly.graph_objs._figure.Figure", 0.85),
+    ]
+    assert infer_output_types(inconsistent, 1) == [(None, 0.0)]
+
+
+def test_project_pipelines_resolve_without_a_model():
+    pipelines = {
+        "data_processing": create_dp_pipeline(),
+        "data_science": create_ds_pipeline(),
+        "reporting": create_reporting_pipeline(),
+    }
+
+    proposals = infer_pipeline_dataset_types(pipelines)
+
+    assert {name: p.suggested_type for name, p in proposals.items()} == {
+        "preprocessed_companies": "pandas.ParquetDataset",
+        "preprocessed_shuttles": "pandas.ParquetDataset",
+        "model_input_table": "pandas.ParquetDataset",
+        "regressor": "pickle.PickleDataset",
+        "shuttle_passenger_capacity_plot_exp": "pandas.ParquetDataset",
+        "shuttle_passenger_capacity_plot_go": "plotly.JSONDataset",
+        "dummy_confusion_matrix": "matplotlib.MatplotlibWriter",
+    }
+    assert proposals["regressor"].filepath == "06_models/regressor.pickle"
+    assert proposals["regressor"].confidence == 0.95
+
+
+def test_static_types_need_a_matching_extension():
+    proposals = infer_pipeline_dataset_types({"reporting": create_reporting_pipeline()})
+    suggestions = [
+        CatalogEntrySuggestion(filepath=f"08_reporting/{name}", suggested_name=name.split(".")[0], suggested_type=None, is_versioned=True)
+        for name in ("shuttle_passenger_capacity_plot_exp.json", "dummy_confusion_matrix.png")
+    ]
+
+    unresolved = apply_static_types(suggestions, proposals)
+
+    assert [s.suggested_name for s in unresolved] == ["shuttle_passenger_capacity_plot_exp"]
+    assert suggestions[1].suggested_type == "matplotlib.MatplotlibWriter"
+
+
+def _select_columns(companies: pd.DataFrame) -> pd.DataFrame:
+    rated = companies[["id", "company_rating"]]
+    return rated[companies["iata_approved"] == "t"]
+
+
+def _whole_table(companies: pd.DataFrame) -> pd.DataFrame:
+    return companies.dropna()
+
+
+def test_used_columns_from_literal_subscripts():
+    assert used_columns(_select_columns, "companies") == {"id", "company_rating", "iata_approved"}
+    assert used_columns(_whole_table, "companies") is None
+
+
+def test_column_usage_is_merged_over_nodes():
+    pipelines = {
+        "a": Pipeline([
+            Node(_select_columns, "companies", "selected", name="select"),
+            Node(_select_columns, {"companies": "reviews"}, "reviewed", name="select_reviews"),
+        ]),
+        "b": Pipeline([Node(_whole_table, "reviews", "cleaned", name="clean")]),
+    }
+
+    usage = infer_pipeline_column_usage(pipelines)
+
+    # One node reading the whole table is enough to need every column
+    assert usage["companies"] == {"id", "company_rating", "iata_approved"}
+    assert usage["reviews"] is None
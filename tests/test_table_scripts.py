@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from catalog_scripts import CatalogIndex, drop_catalogued, drop_catalogued_table
+from table_scripts import ScanTable, plan_catalog, to_suggestions
+from tool_scripts import analyze_observed_project, observe_project, scan_data_folder, scan_data_table
+
+VERSIONS = ["2025-01-01T10.00.00.000Z", "2025-02-01T10.00.00.000Z"]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for rel_path in [
+        "top.csv",
+        "01_raw/companies.csv",
+        "01_raw/Shuttles.XLSX",
+        "01_raw/archive.tar.gz",
+        "01_raw/.gitkeep",
+        "02_intermediate/nested/table.parquet",
+        *(f"06_models/regressor.pickle/{v}/regressor.pickle" for v in VERSIONS),
+        *(f"08_reporting/plot.json/{v}/plot.json" for v in VERSIONS),
+    ]:
+        path = tmp_path / "data" / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("a,b\n1,2\n")
+    return str(tmp_path / "data")
+
+
+def test_plan_matches_observe_and_analyze(data_dir):
+    expected = analyze_observed_project(observe_project(scan_data_folder(data_dir)))
+
+    assert to_suggestions(plan_catalog(scan_data_table(data_dir))) == expected
+
+
+def test_round_trips_through_models(data_dir):
+    files = scan_data_folder(data_dir)
+    table = ScanTable.from_models(data_dir, files)
+
+    assert table.to_models() == files
+    # Files sharing a directory share its prefix
+    assert len(table.dirs) < len(table)
+    assert table.dataset_types().to_pylist() == [f.dataset_type for f in files]
+
+
+def test_present_stems(data_dir):
+    assert scan_data_table(data_dir).present_stems({"companies", "shuttles", "missing"}) == {"companies", "shuttles"}
+
+
+@pytest.mark.parametrize("catalog", [
+    {"companies": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/companies.csv"}},
+    {
+        "{name}_raw": {"type": "pandas.CSVDataset", "filepath": "data/01_raw/{name}.csv"},
+        "{name}_model": {"type": "pickle.PickleDataset", "filepath": "data/06_models/{name}.pickle"},
+        "{name}_twice": {"type": "pandas.CSVDataset", "filepath": "data/{name}/{name}.csv"},
+    },
+])
+def test_drop_catalogued_table_matches_row_by_row(data_dir, catalog, monkeypatch):
+    # Catalog filepaths are relative to the project root
+    monkeypatch.chdir(Path(data_dir).parent)
+    data_dir = "data"
+    index = CatalogIndex(catalog)
+    plan = plan_catalog(scan_data_table(data_dir))
+
+    expected = drop_catalogued(to_suggestions(plan), index, data_dir)
+
+    assert to_suggestions(drop_catalogued_table(plan, index, data_dir)) == expected
+    assert len(expected) < plan.num_rows
+
+
+def test_empty_folder(tmp_path):
+    table = scan_data_table(str(tmp_path / "missing"))
+
+    assert len(table) == 0
+    assert to_suggestions(plan_catalog(table)) == []
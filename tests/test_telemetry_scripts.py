@@ -0,0 +1,155 @@
+import contextvars
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from models import NodeIndex
+from telemetry_scripts import Tracer, count, event, span
+from tool_scripts import stream_auto_catalog, update_auto_catalog
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    raw = tmp_path / "data" / "01_raw"
+    raw.mkdir(parents=True)
+    (raw / "companies.csv").write_text("a,b\n1,2\n")
+    # Nothing local can type these, so they go to the model
+    (raw / "blob.pickle").write_bytes(b"\x00\x01\x02")
+    (raw / "other.pickle").write_bytes(b"\x03\x04")
+    return str(tmp_path / "data")
+
+
+def _span(tracer, name):
+    return next(s for s in tracer.spans if s.name == name)
+
+
+class TestTracer:
+    def test_helpers_do_nothing_without_a_tracer(self):
+        with span("stage") as s:
+            count("files.seen", 3)
+            event("skipped")
+        assert s is None
+
+    def test_records_nested_spans_and_counters(self):
+        with Tracer() as tracer:
+            with span("run", mode="full"):
+                count("files.seen", 2)
+                with span("scan"):
+                    count("files.seen", 3)
+                    event("skipped", dataset="a")
+            count("files.seen", 100)
+
+        run, scan = tracer.spans
+        assert scan.parent_id == run.span_id
+        assert run.attributes == {"mode": "full"}
+        assert run.counters == {"files.seen": 2}
+        assert scan.events[0]["attributes"] == {"dataset": "a"}
+        assert tracer.totals() == {"files.seen": 5}
+        assert run.wall_time >= scan.wall_time
+
+    def test_counts_from_threads_started_with_the_context(self):
+        with Tracer() as tracer, span("run"):
+            context = contextvars.copy_context()
+            threads = [threading.Thread(target=context.run, args=(count, "n")) for _ in range(2)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert tracer.totals() == {"n": 2}
+
+    def test_records_errors(self):
+        with Tracer() as tracer, pytest.raises(ValueError):
+            with span("run"):
+                raise ValueError("boom")
+
+        assert tracer.spans[0].error == "ValueError: boom"
+        assert tracer.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["status"]["code"] == 2
+
+    def test_writes_json_report(self, tmp_path):
+        with Tracer() as tracer, span("run"):
+            count("llm.requests")
+
+        tracer.write_json(str(tmp_path / "reports" / "run.json"))
+        report = json.loads((tmp_path / "reports" / "run.json").read_text())
+        assert report["totals"] == {"llm.requests": 1}
+        assert report["spans"][0]["name"] == "run"
+
+    def test_exports_otlp_json(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with Tracer() as tracer, span("run"), span("scan"):
+                count("files.seen", 7)
+            tracer.export_otlp(f"http://127.0.0.1:{server.server_port}/v1/traces")
+        finally:
+            server.shutdown()
+
+        run, scan = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert scan["parentSpanId"] == run["spanId"]
+        assert "parentSpanId" not in run
+        assert {"key": "files.seen", "value": {"intValue": "7"}} in scan["attributes"]
+
+
+class TestInstrumentedRuns:
+    def test_update_reports_every_stage(self, data_dir, tmp_path, monkeypatch, fake_openai):
+        monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+        options = dict(
+            incremental=False,
+            data_dir=data_dir,
+            output_path=str(tmp_path / "catalog.yml"),
+            cache_path=str(tmp_path / "cache.db"),
+            type_index_path=str(tmp_path / "type_index.npy"),
+            project_path=None,
+        )
+
+        with Tracer() as first:
+            update_auto_catalog(**options)
+        with Tracer() as second:
+            update_auto_catalog(**options)
+
+        assert [s.name for s in first.spans] == ["update_auto_catalog", "scan", "plan", "resolve", "infer", "profile", "write"]
+        totals = first.totals()
+        assert totals["files.seen"] == 3
+        assert totals["datasets.resolved_locally"] == 1
+        assert totals["sniff.bytes_read"] > 0
+        assert totals["cache.misses"] == 2
+        assert totals["llm.requests"] == len(fake_openai.requests)
+        assert totals["llm.prompt_tokens"] > 0
+        assert totals["llm.completion_tokens"] > 0
+        assert totals["llm.retries"] == 0
+
+        assert second.totals()["cache.hits"] == 2
+        assert "llm.requests" not in second.totals()
+
+    def test_stream_counts_skipped_entries(self, data_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+
+        with Tracer() as tracer:
+            stream_auto_catalog(
+                data_dir=data_dir,
+                output_path=str(tmp_path / "catalog.yml"),
+                cache_path=None,
+                backend="heuristics",
+                project_path=None,
+            )
+
+        run = _span(tracer, "stream_auto_catalog")
+        assert run.counters["files.seen"] == 3
+        assert run.counters["entries.written"] + run.counters.get("entries.skipped", 0) == 3
+        assert len(run.events) == run.counters.get("entries.skipped", 0)
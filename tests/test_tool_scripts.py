@@ -0,0 +1,308 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import tool_scripts
+from models import NodeIndex
+from tool_scripts import (
+    analyze_observed_project,
+    diff_data_folder,
+    iter_data_folder,
+    load_scan_manifest,
+    manifest_table,
+    merge_catalog_entries,
+    observe_project,
+    save_scan_manifest,
+    scan_data_folder,
+    scan_data_folder_incremental,
+    stream_auto_catalog,
+    update_auto_catalog,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, write_file):
+    write_file(tmp_path / "data" / "01_raw" / "companies.csv")
+    write_file(tmp_path / "data" / "01_raw" / "shuttles.xlsx")
+    write_file(tmp_path / "data" / "02_intermediate" / "nested" / "table.parquet")
+    return str(tmp_path / "data")
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestScanDataFolderIncremental:
+    def test_first_scan_reports_everything_as_added(self, data_dir):
+        result, _ = scan_data_folder_incremental(data_dir, {})
+
+        expected = sorted(f.rel_path for f in scan_data_folder(data_dir))
+        assert sorted(f.rel_path for f in result.files) == expected
+        assert sorted(f.rel_path for f in result.added) == expected
+        assert result.modified == []
+        assert result.removed == []
+
+    def test_unchanged_tree_has_empty_diff(self, data_dir, tmp_path):
+        manifest_path = str(tmp_path / "manifest.json")
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+        save_scan_manifest(manifest, manifest_path)
+
+        result, _ = scan_data_folder_incremental(data_dir, load_scan_manifest(manifest_path))
+
+        assert len(result.files) == 3
+        assert result.changed == []
+        assert result.removed == []
+
+    def test_added_modified_and_removed(self, data_dir, write_file):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+
+        raw = os.path.join(data_dir, "01_raw")
+        write_file(Path(raw) / "reviews.csv")
+        os.remove(os.path.join(raw, "shuttles.xlsx"))
+        with open(os.path.join(raw, "companies.csv"), "a") as f:
+            f.write("3,4\n")
+        _bump_mtime(raw)
+
+        result, _ = scan_data_folder_incremental(data_dir, manifest)
+
+        assert [f.rel_path for f in result.added] == [os.path.join("01_raw", "reviews.csv")]
+        assert [f.rel_path for f in result.modified] == [os.path.join("01_raw", "companies.csv")]
+        assert result.removed == [os.path.join("01_raw", "shuttles.xlsx")]
+
+    def test_removed_directory(self, data_dir):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+
+        nested = os.path.join(data_dir, "02_intermediate", "nested")
+        os.remove(os.path.join(nested, "table.parquet"))
+        os.rmdir(nested)
+
+        result, _ = scan_data_folder_incremental(data_dir, manifest)
+
+        assert result.removed == [os.path.join("02_intermediate", "nested", "table.parquet")]
+        assert len(result.files) == 2
+
+    def test_unchanged_directories_are_not_restated(self, data_dir, monkeypatch):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+
+        raw = os.path.join(data_dir, "01_raw")
+        mtime_ns = os.stat(raw).st_mtime_ns
+        with open(os.path.join(raw, "companies.csv"), "a") as f:
+            f.write("3,4\n")
+        os.utime(raw, ns=(mtime_ns, mtime_ns))
+
+        monkeypatch.setattr(tool_scripts, "_stat_files", lambda *args: pytest.fail("restated files"))
+        result, _ = scan_data_folder_incremental(data_dir, manifest)
+        assert result.changed == []
+
+    def test_in_place_rewrites_are_caught_without_listing(self, data_dir, monkeypatch):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+
+        raw = os.path.join(data_dir, "01_raw")
+        mtime_ns = os.stat(raw).st_mtime_ns
+        with open(os.path.join(raw, "companies.csv"), "a") as f:
+            f.write("3,4\n")
+        os.utime(raw, ns=(mtime_ns, mtime_ns))
+
+        listed = []
+        list_directory = tool_scripts._list_directory
+        monkeypatch.setattr(
+            tool_scripts, "_list_directory", lambda abs_dir, *args: listed.append(abs_dir) or list_directory(abs_dir, *args)
+        )
+        result, manifest = scan_data_folder_incremental(data_dir, manifest, verify_files=True)
+        assert [f.rel_path for f in result.modified] == [os.path.join("01_raw", "companies.csv")]
+        assert raw not in listed
+
+        result, _ = scan_data_folder_incremental(data_dir, manifest, verify_files=True)
+        assert result.changed == []
+
+    def test_dirty_dirs_are_listed_again(self, data_dir):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+
+        raw = os.path.join(data_dir, "01_raw")
+        mtime_ns = os.stat(raw).st_mtime_ns
+        with open(os.path.join(raw, "companies.csv"), "a") as f:
+            f.write("3,4\n")
+        os.utime(raw, ns=(mtime_ns, mtime_ns))
+
+        result, _ = scan_data_folder_incremental(data_dir, manifest, dirty_dirs=["01_raw"])
+        assert [f.rel_path for f in result.modified] == [os.path.join("01_raw", "companies.csv")]
+
+    def test_diff_only_creates_models_for_changed_files(self, data_dir, write_file, monkeypatch):
+        *_, manifest = diff_data_folder(data_dir, {})
+        write_file(Path(data_dir) / "01_raw" / "reviews.csv")
+        _bump_mtime(os.path.join(data_dir, "01_raw"))
+
+        created = []
+        to_scanned_file = tool_scripts._to_scanned_file
+        monkeypatch.setattr(
+            tool_scripts, "_to_scanned_file", lambda *args: created.append(args[1]) or to_scanned_file(*args)
+        )
+        added, modified, removed, manifest = diff_data_folder(data_dir, manifest)
+
+        assert [f.rel_path for f in added] == created == [os.path.join("01_raw", "reviews.csv")]
+        assert modified == removed == []
+        assert len(manifest_table(data_dir, manifest)) == 4
+
+    def test_only_dirty_dirs_are_visited(self, data_dir, write_file):
+        *_, manifest = diff_data_folder(data_dir, {})
+        with open(os.path.join(data_dir, "01_raw", "companies.csv"), "a") as f:
+            f.write("3,4\n")
+        write_file(Path(data_dir) / "02_intermediate" / "nested" / "unwatched.csv")
+
+        added, modified, _, manifest = diff_data_folder(data_dir, manifest, dirty_dirs=["01_raw"], only_dirty_dirs=True)
+
+        assert added == []
+        assert [f.rel_path for f in modified] == [os.path.join("01_raw", "companies.csv")]
+        assert len(manifest_table(data_dir, manifest)) == 3
+
+    def test_manifest_for_other_data_dir_is_ignored(self, data_dir):
+        _, manifest = scan_data_folder_incremental(data_dir, {})
+        manifest["data_dir"] = "elsewhere"
+
+        result, _ = scan_data_folder_incremental(data_dir, manifest)
+
+        assert len(result.added) == 3
+
+
+def test_merge_catalog_entries_prunes_missing_files(tmp_path):
+    existing_file = tmp_path / "kept.csv"
+    existing_file.write_text("")
+    existing = {
+        "kept": {"type": "pandas.CSVDataset", "filepath": str(existing_file)},
+        "gone": {"type": "pandas.CSVDataset", "filepath": str(tmp_path / "gone.csv")},
+    }
+    updates = {"new": {"type": "pandas.ParquetDataset", "filepath": "data/new.parquet"}}
+
+    merged = merge_catalog_entries(existing, updates, prune_missing=True)
+
+    assert list(merged) == ["kept", "new"]
+
+
+class TestScanDataFolder:
+    def test_matches_os_walk(self, data_dir):
+        expected = sorted(
+            os.path.relpath(os.path.join(root, f), data_dir)
+            for root, _, files in os.walk(data_dir)
+            for f in files
+        )
+
+        assert sorted(f.rel_path for f in scan_data_folder(data_dir)) == expected
+
+    def test_order_is_deterministic_across_jobs(self, data_dir, write_file):
+        for i in range(20):
+            write_file(Path(data_dir) / "03_primary" / f"part_{i}" / "table.csv")
+
+        serial = scan_data_folder(data_dir, jobs=1)
+        parallel = scan_data_folder(data_dir, jobs=8)
+
+        assert serial == parallel
+        assert serial[0].rel_path == os.path.join("01_raw", "companies.csv")
+        assert serial[0].dataset_type == "pandas.CSVDataset"
+
+    def test_missing_folder(self, tmp_path):
+        assert scan_data_folder(str(tmp_path / "missing")) == []
+
+
+VERSIONS = [
+    "2025-01-01T10.00.00.000Z",
+    "2025-03-01T10.00.00.000Z",
+    "2025-02-01T10.00.00.000Z",
+]
+
+
+@pytest.fixture
+def versioned_data_dir(data_dir, write_file):
+    for i, version in enumerate(VERSIONS):
+        write_file(Path(data_dir) / "06_models" / "regressor.pickle" / version / "regressor.pickle", "x" * (i + 1))
+    return data_dir
+
+
+class TestVersionedDatasets:
+    @pytest.mark.parametrize("incremental", [False, True])
+    def test_walker_only_descends_into_latest_version(self, versioned_data_dir, incremental):
+        if incremental:
+            files = scan_data_folder_incremental(versioned_data_dir, {})[0].files
+        else:
+            files = scan_data_folder(versioned_data_dir)
+
+        versioned = [f for f in files if f.version is not None]
+        assert [f.rel_path for f in versioned] == [
+            os.path.join("06_models", "regressor.pickle", VERSIONS[1], "regressor.pickle")
+        ]
+        assert versioned[0].version_count == 3
+        assert versioned[0].versioned_bytes == 6
+
+    def test_observed_project_indexes_versioned_datasets(self, versioned_data_dir):
+        project = observe_project(scan_data_folder(versioned_data_dir))
+
+        [dataset] = project.versioned_datasets
+        assert dataset.path == "06_models/regressor.pickle"
+        assert (dataset.latest_version, dataset.version_count, dataset.total_bytes) == (VERSIONS[1], 3, 6)
+        assert project.possible_models == ["06_models/regressor.pickle"]
+
+        suggestions = analyze_observed_project(project)
+        [versioned] = [s for s in suggestions if s.is_versioned]
+        assert versioned.filepath == "06_models/regressor.pickle"
+        assert versioned.suggested_name == "regressor"
+
+    def test_directory_with_files_is_not_collapsed(self, data_dir, write_file):
+        write_file(Path(data_dir) / "03_primary" / VERSIONS[0] / "a.csv")
+        write_file(Path(data_dir) / "03_primary" / VERSIONS[1] / "a.csv")
+        write_file(Path(data_dir) / "03_primary" / "readme.txt")
+
+        rel_paths = {f.rel_path for f in scan_data_folder(data_dir)}
+        assert os.path.join("03_primary", VERSIONS[0], "a.csv") in rel_paths
+        assert os.path.join("03_primary", VERSIONS[1], "a.csv") in rel_paths
+
+
+class TestStreamAutoCatalog:
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_streamed_scan_matches_full_scan(self, versioned_data_dir, jobs, write_file):
+        for i in range(10):
+            write_file(Path(versioned_data_dir) / "03_primary" / f"part_{i}" / "table.csv")
+
+        assert list(iter_data_folder(versioned_data_dir, jobs=jobs)) == scan_data_folder(versioned_data_dir)
+
+    def test_writes_same_catalog_as_full_rebuild(self, versioned_data_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+        options = dict(data_dir=versioned_data_dir, cache_path=None, backend="heuristics", project_path=None)
+
+        update_auto_catalog(incremental=False, output_path=str(tmp_path / "full.yml"), **options)
+        stream_auto_catalog(output_path=str(tmp_path / "stream.yml"), batch_size=2, queue_size=1, **options)
+
+        assert (tmp_path / "stream.yml").read_text() == (tmp_path / "full.yml").read_text()
+        assert not (tmp_path / "stream.yml.partial").exists()
+
+    def test_node_index_is_built_once_per_run(self, tmp_path, monkeypatch, write_file):
+        builds = []
+        monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: builds.append(args) or NodeIndex())
+        for name in ("a", "b", "c"):
+            write_file(tmp_path / "data" / f"{name}.dat", "\x00")
+
+        stream_auto_catalog(
+            data_dir=str(tmp_path / "data"),
+            output_path=str(tmp_path / "catalog.yml"),
+            cache_path=None,
+            backend="heuristics",
+            project_path=None,
+            type_index_path=None,
+            batch_size=1,
+        )
+
+        assert len(builds) == 1
+
+    def test_failed_run_keeps_previous_catalog(self, data_dir, tmp_path, monkeypatch):
+        output_path = tmp_path / "catalog.yml"
+        output_path.write_text("previous: {}\n")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("model unavailable")
+
+        monkeypatch.setattr("tool_scripts.resolve_dataset_types", fail)
+        with pytest.raises(RuntimeError):
+            stream_auto_catalog(data_dir=data_dir, output_path=str(output_path), cache_path=None, project_path=None)
+
+        assert output_path.read_text() == "previous: {}\n"
+        assert not (tmp_path / "catalog.yml.partial").exists()
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+import pytest
+import yaml
+from kedro.io import DataCatalog
+
+from ai_tool_idea_test.columnar_cache import refresh_cache
+from transcode_scripts import add_transcoded_entries, materialize_caches, transcoded_pair
+from tool_scripts import update_auto_catalog
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = tmp_path / "data" / "01_raw"
+    raw.mkdir(parents=True)
+    pd.DataFrame({"id": range(2000), "text": ["some review"] * 2000}).to_csv(raw / "reviews.csv", index=False)
+    (raw / "small.csv").write_text("a,b\n1,2\n")
+    return tmp_path
+
+
+def test_pairs_large_raw_files_with_a_parquet_cache(project):
+    entry = {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv"}
+
+    pair = transcoded_pair("reviews", entry, min_bytes=1024)
+
+    assert pair["reviews@csv"] == entry
+    assert pair["reviews@parquet"]["type"] == "pandas.ParquetDataset"
+    assert pair["reviews@parquet"]["filepath"] == ".autocatalog/cache/reviews.parquet"
+    assert pair["reviews@parquet"]["metadata"]["autocatalog"]["source"] == "reviews@csv"
+
+
+@pytest.mark.parametrize(
+    "name, entry",
+    [
+        ("small", {"type": "pandas.CSVDataset", "filepath": "data/01_raw/small.csv"}),
+        ("reviews", {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv", "versioned": True}),
+        ("reviews", {"type": "pandas.ParquetDataset", "filepath": "data/01_raw/reviews.csv"}),
+        ("reviews", {"type": "pandas.CSVDataset", "filepath": "s3://bucket/reviews.csv"}),
+        ("missing", {"type": "pandas.CSVDataset", "filepath": "data/01_raw/missing.csv"}),
+    ],
+)
+def test_skips_files_that_are_fast_enough(project, name, entry):
+    assert transcoded_pair(name, entry, min_bytes=1024) == {}
+
+
+def test_replaces_pairs_from_earlier_runs(project):
+    entry = {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv"}
+    first = add_transcoded_entries({"reviews": entry}, min_bytes=1024)
+    (project / "data" / "01_raw" / "reviews.csv").write_text("a\n1\n")
+
+    assert add_transcoded_entries(first, min_bytes=1024) == {"reviews": entry}
+
+
+def test_hand_written_entries_are_transcoded_unless_already_paired(project):
+    shuttles = {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv"}
+
+    assert "shuttles@parquet" in add_transcoded_entries({}, {"shuttles": shuttles}, min_bytes=1024)
+    assert add_transcoded_entries({}, {"shuttles": shuttles, "shuttles@csv": shuttles}, min_bytes=1024) == {}
+
+
+def test_cache_is_rebuilt_when_the_source_changes(project):
+    reviews = project / "data" / "01_raw" / "reviews.csv"
+    config = transcoded_pair("reviews", {"type": "pandas.CSVDataset", "filepath": "data/01_raw/reviews.csv"}, 1024)
+    catalog = DataCatalog.from_config(config)
+
+    assert refresh_cache(catalog, "reviews@parquet")
+    assert not refresh_cache(catalog, "reviews@parquet")
+    assert catalog.load("reviews@parquet").shape == (2000, 2)
+
+    # Same content under a new mtime only costs a hash
+    os.utime(reviews, ns=(0, 0))
+    assert not refresh_cache(catalog, "reviews@parquet")
+
+    reviews.write_text("id,text\n1,changed\n")
+    assert refresh_cache(catalog, "reviews@parquet")
+    assert catalog.load("reviews@parquet")["text"].tolist() == ["changed"]
+
+
+def test_update_writes_and_materializes_transcoded_entries(project):
+    output_path = str(project / "conf" / "base" / "auto_catalog.yml")
+    options = dict(data_dir="data", output_path=output_path, cache_path=None, backend="heuristics", project_path=None)
+
+    update_auto_catalog(incremental=False, transcode_min_bytes=1024, **options)
+
+    with open(output_path) as f:
+        catalog = yaml.safe_load(f)
+    assert {"reviews", "reviews@csv", "reviews@parquet", "small"} <= set(catalog)
+    assert "small@parquet" not in catalog
+
+    assert materialize_caches(output_path) == 1
+    assert materialize_caches(output_path) == 0
+    assert pd.read_parquet(project / ".autocatalog" / "cache" / "reviews.parquet").shape == (2000, 2)
@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from catalog_scripts import CatalogIndex
+from models import NodeIndex
+from watch_scripts import Debouncer, DirectoryPoller, watch_auto_catalog
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestDebouncer:
+    def test_waits_for_a_quiet_period(self):
+        debouncer = Debouncer(quiet=0.2, max_delay=10)
+        stop = threading.Event()
+        debouncer.add(["a"])
+        debouncer.add(["b"])
+
+        start = time.monotonic()
+        assert debouncer.wait(stop) == {"a", "b"}
+        assert time.monotonic() - start >= 0.15
+
+    def test_continuous_changes_are_flushed_after_max_delay(self):
+        debouncer = Debouncer(quiet=1.0, max_delay=0.3)
+        stop = threading.Event()
+        writer_done = threading.Event()
+
+        def write():
+            while not writer_done.is_set():
+                debouncer.add(["busy"])
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            start = time.monotonic()
+            assert debouncer.wait(stop) == {"busy"}
+            assert time.monotonic() - start < 1.0
+        finally:
+            writer_done.set()
+            thread.join()
+
+    def test_returns_none_once_stopped(self):
+        stop = threading.Event()
+        stop.set()
+        assert Debouncer().wait(stop) is None
+
+
+class TestDirectoryPoller:
+    def test_reports_changed_and_new_directories(self, tmp_path, write_file):
+        write_file(tmp_path / "01_raw" / "a.csv")
+        poller = DirectoryPoller(str(tmp_path), on_change=None)
+        assert poller.poll() == set()
+
+        write_file(tmp_path / "01_raw" / "b.csv")
+        os.utime(tmp_path / "01_raw", ns=(0, 1))
+        write_file(tmp_path / "02_intermediate" / "nested" / "c.csv")
+
+        assert poller.poll() == {"", "01_raw", "02_intermediate", os.path.join("02_intermediate", "nested")}
+        assert poller.poll() == set()
+
+
+def test_watch_catalogues_new_files(tmp_path, monkeypatch, write_file):
+    monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+    data_dir = tmp_path / "data"
+    write_file(data_dir / "01_raw" / "companies.csv")
+    output_path = tmp_path / "catalog.yml"
+
+    def catalog():
+        if not output_path.exists():
+            return {}
+        return yaml.safe_load(output_path.read_text()) or {}
+
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_auto_catalog,
+        kwargs=dict(
+            data_dir=str(data_dir),
+            output_path=str(output_path),
+            manifest_path=str(tmp_path / "manifest.json"),
+            cache_path=None,
+            debounce=0.1,
+            polling=True,
+            poll_interval=0.05,
+            stop=stop,
+            backend="heuristics",
+            project_path=None,
+        ),
+    )
+    watcher.start()
+    try:
+        assert _wait_for(lambda: "companies" in catalog())
+        write_file(data_dir / "02_intermediate" / "reviews.csv")
+        assert _wait_for(lambda: "reviews" in catalog())
+        assert set(catalog()) == {"companies", "reviews"}
+    finally:
+        stop.set()
+        watcher.join(timeout=10)
+    assert not watcher.is_alive()
+
+
+def test_watch_loads_the_project_once(tmp_path, monkeypatch, write_file):
+    monkeypatch.setattr("tool_scripts.build_node_index", lambda *args: NodeIndex())
+    loads = []
+    monkeypatch.setattr("watch_scripts.load_registered_pipelines", lambda path: loads.append(path) or {})
+    monkeypatch.setattr("watch_scripts.build_catalog_index", lambda *args, **kwargs: CatalogIndex({}))
+    monkeypatch.setattr("tool_scripts.load_registered_pipelines", lambda path: pytest.fail("pipelines reloaded"))
+    monkeypatch.setattr("tool_scripts.build_catalog_index", lambda *args, **kwargs: pytest.fail("catalog reloaded"))
+    data_dir = tmp_path / "data"
+    write_file(data_dir / "01_raw" / "companies.csv")
+    output_path = tmp_path / "catalog.yml"
+
+    def catalog():
+        if not output_path.exists():
+            return {}
+        return yaml.safe_load(output_path.read_text()) or {}
+
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_auto_catalog,
+        kwargs=dict(
+            data_dir=str(data_dir),
+            output_path=str(output_path),
+            manifest_path=str(tmp_path / "manifest.json"),
+            cache_path=None,
+            debounce=0.1,
+            polling=True,
+            poll_interval=0.05,
+            stop=stop,
+            backend="heuristics",
+            project_path=str(tmp_path),
+            type_index_path=None,
+        ),
+    )
+    watcher.start()
+    try:
+        assert _wait_for(lambda: "companies" in catalog())
+        write_file(data_dir / "01_raw" / "reviews.csv")
+        assert _wait_for(lambda: "reviews" in catalog())
+    finally:
+        stop.set()
+        watcher.join(timeout=10)
+    assert loads == [str(tmp_path)]
+
+
+def test_observer_events_mark_directories(tmp_path, write_file):
+    pytest.importorskip("watchdog")
+    from watch_scripts import _start_observer
+
+    changed = []
+    observer = _start_observer(str(tmp_path), changed.append)
+    try:
+        write_file(tmp_path / "01_raw" / "a.csv")
+        assert _wait_for(lambda: any("01_raw" in dirs for dirs in changed))
+    finally:
+        observer.stop()
+        observer.join()
@@ -1,54 +1,465 @@
+import contextvars
+import hashlib
+import json
+import logging
 import os
-from pathlib import Path
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 import re
-from llm_scripts import infer_dataset_types
-from models import ScannedDataFile, ObservedProject, CatalogEntrySuggestion
-from typing import List
+from ai_tool_idea_test.catalog_snapshot import SNAPSHOT_MAGIC, file_sha256, snapshot_digest, snapshot_path_for
+from backend_scripts import DEFAULT_BACKEND, create_backend
+from catalog_scripts import CatalogIndex, build_catalog_index, drop_catalogued_table
+from cache_scripts import DEFAULT_INFERENCE_CACHE_PATH, InferenceCache
+from ignore_scripts import load_ignore_rules
+from index_scripts import build_node_index
+from knn_scripts import DEFAULT_TYPE_INDEX_PATH, TypeIndex
+from llm_scripts import DEFAULT_MAX_CONCURRENCY, infer_dataset_types
+from resolver_scripts import EXT_TO_KEDRO_DATASET, resolve_dataset_types
+from partition_scripts import (
+    DEFAULT_MIN_PARTITIONS,
+    drop_collection_members,
+    find_collections,
+    group_collections,
+    merge_collections,
+    to_collection_suggestions,
+)
+from profile_scripts import profile_datasets
+from remote_scripts import catalog_root, is_remote, is_remote_dir, list_remote_directory, local_path
+from transcode_scripts import DEFAULT_TRANSCODE_MIN_BYTES, add_transcoded_entries, iter_transcoded_entries
+from static_scripts import (
+    apply_static_types,
+    infer_pipeline_column_usage,
+    infer_pipeline_dataset_types,
+    load_registered_pipelines,
+)
+from models import ScannedDataFile, ObservedProject, CatalogEntrySuggestion, ScanResult, VersionedDataset
+from telemetry_scripts import (
+    DATASETS_RESOLVED,
+    ENTRIES_SKIPPED,
+    ENTRIES_WRITTEN,
+    FILES_PRUNED,
+    FILES_SEEN,
+    count,
+    event,
+    span,
+)
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List
 
 import yaml
 
+if TYPE_CHECKING:
+    from table_scripts import ScanTable
 
-EXT_TO_KEDRO_DATASET = {
-    ".csv": "pandas.CSVDataset",
-    ".parquet": "pandas.ParquetDataset",
-    ".xlsx": "pandas.ExcelDataset",
-    ".xls": "pandas.ExcelDataset",
-    ".xml": "pandas.XMLDataset",
-    ".yaml": "yaml.YAMLDataset",
-    ".yml": "yaml.YAMLDataset",
-}
+logger = logging.getLogger(__name__)
 
+# Same output as the pure-Python dumper, rendered by libyaml when it is built in
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 TEXT_BASED_EXTENSIONS = {".csv", ".json", ".txt", ".yaml", ".yml", ".xml", ".md", ".log", ".py"}
 
+DEFAULT_CATALOG_PATH = "conf/base/auto_catalog.yml"
+DEFAULT_MANIFEST_PATH = ".autocatalog/scan_manifest.json"
+MANIFEST_VERSION = 2
 
-def scan_data_folder(data_dir: str = "data") -> List[ScannedDataFile]:
-    entries = []
+VERSION_DIR_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}\.\d{2}\.\d{2}\.\d{3}Z$")
+VERSIONED_PATH_PATTERN = re.compile(r"(.*)/(\d{4}-\d{2}-\d{2}T\d{2}\.\d{2}\.\d{2}\.\d{3}Z)/.*")
 
-    for root, _, files in os.walk(data_dir):
-        for file in files:
-            full_path = os.path.join(root, file)
-            rel_path = os.path.relpath(full_path, data_dir)
+# Directory listing is I/O bound, so a few threads per core pay off on
+# network and FUSE mounts where each listing is a round-trip
+DEFAULT_SCAN_JOBS = min(32, (os.cpu_count() or 1) * 4)
 
-            ext = Path(file).suffix.lower()
-            dataset_type = EXT_TO_KEDRO_DATASET.get(ext)
+# Streaming mode keeps at most this many suggestions queued between the scan
+# and the resolve stages, and resolves and infers them this many at a time
+DEFAULT_STREAM_QUEUE_SIZE = 1_000
+DEFAULT_STREAM_BATCH_SIZE = 200
 
-            entries.append(ScannedDataFile(
-                full_path=full_path,
+
+def scan_data_folder(data_dir: str = "data", jobs: int = DEFAULT_SCAN_JOBS) -> List[ScannedDataFile]:
+    return scan_data_table(data_dir, jobs=jobs).to_models()
+
+
+def scan_data_table(data_dir: str = "data", jobs: int = DEFAULT_SCAN_JOBS) -> "ScanTable":
+    # pyarrow is only imported once a scan is asked for
+    from table_scripts import ScanTableBuilder
+
+    rules = load_ignore_rules(data_dir)
+
+    def visit(rel_dir: str) -> dict:
+        abs_dir = os.path.join(data_dir, rel_dir)
+        files, subdirs = rules.filter_listing(rel_dir, *_list_directory(abs_dir, with_stat=False))
+        return _collapse_versions(abs_dir, {"files": files, "subdirs": subdirs})
+
+    builder = ScanTableBuilder(data_dir)
+    walked = _walk_directories(data_dir, visit, jobs)
+    records = dict(walked)
+    for rel_dir, record in walked:
+        builder.add_directory(rel_dir, record["files"], versions=_dataset_versions(records, rel_dir))
+
+    return builder.finish()
+
+
+def manifest_table(data_dir: str, manifest: dict, with_stat: bool = False) -> "ScanTable":
+    # Every file of the last incremental scan, without listing anything again
+    from table_scripts import ScanTableBuilder
+
+    builder = ScanTableBuilder(data_dir)
+    records = manifest.get("dirs", {})
+    for rel_dir, record in records.items():
+        builder.add_directory(
+            rel_dir,
+            list(record["files"]),
+            list(record["files"].values()) if with_stat else None,
+            versions=_dataset_versions(records, rel_dir),
+        )
+    return builder.finish()
+
+
+def _collapse_versions(abs_dir: str, record: dict) -> dict:
+    # A Kedro versioned dataset is a directory holding nothing but timestamped
+    # version directories, each with a single save named after the dataset.
+    # Only the latest version is walked, the others are summarised by stat-ing
+    # their save directly instead of listing them.
+    subdirs = record["subdirs"]
+    if record["files"] or not subdirs or not all(VERSION_DIR_PATTERN.match(d) for d in subdirs):
+        return record
+
+    basename = os.path.basename(os.path.normpath(abs_dir))
+    total_bytes = 0
+    for version in subdirs:
+        if is_remote(abs_dir):
+            # Would take a request per version, only the latest one is listed
+            total_bytes = None
+            break
+        try:
+            total_bytes += os.stat(os.path.join(abs_dir, version, basename)).st_size
+        except OSError:
+            continue
+
+    # Kedro's timestamps sort chronologically
+    latest = max(subdirs)
+    versions = {"latest": latest, "count": len(subdirs), "bytes": total_bytes}
+    return {**record, "subdirs": [latest], "versions": versions}
+
+
+def _dataset_versions(records: dict[str, dict], rel_dir: str) -> dict:
+    parent = records.get(os.path.dirname(rel_dir))
+    if not rel_dir or parent is None or "versions" not in parent:
+        return {}
+    versions = parent["versions"]
+    return {
+        "version": versions["latest"],
+        "version_count": versions["count"],
+        "versioned_bytes": versions["bytes"],
+    }
+
+
+def load_scan_manifest(manifest_path: str = DEFAULT_MANIFEST_PATH) -> dict:
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable scan manifest %s: %s", manifest_path, e)
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_scan_manifest(manifest: dict, manifest_path: str = DEFAULT_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp_path, manifest_path)
+
+
+def _list_directory(
+    abs_dir: str, with_stat: bool = True
+) -> tuple[dict[str, list[int] | None], List[str]]:
+    if is_remote(abs_dir):
+        return list_remote_directory(abs_dir, with_stat)
+
+    files = {}
+    subdirs = []
+
+    with os.scandir(abs_dir) as it:
+        for entry in it:
+            try:
+                # DirEntry answers is_dir() from the directory listing itself and
+                # caches stat(), so no extra syscalls are spent per entry
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not descended into
+                    if not entry.is_symlink():
+                        subdirs.append(entry.name)
+                    continue
+                if with_stat:
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+                else:
+                    files[entry.name] = None
+            except OSError:
+                continue
+
+    return dict(sorted(files.items())), sorted(subdirs)
+
+
+def _is_directory(path: str) -> bool:
+    return is_remote_dir(path) if is_remote(path) else os.path.isdir(path)
+
+
+def _walk_directories(
+    data_dir: str, visit: Callable[[str], dict | None], jobs: int = DEFAULT_SCAN_JOBS
+) -> List[tuple[str, dict]]:
+    # ``visit`` maps a directory (relative to data_dir) to a record holding at
+    # least its "subdirs". Subdirectories are fanned out over a bounded thread
+    # pool, since the time goes into waiting on the filesystem rather than into
+    # Python, and the records are then returned in a deterministic depth-first
+    # order regardless of which listing finished first.
+    if not _is_directory(data_dir):
+        return []
+
+    # Listings run in the pool but are counted in the calling span
+    def safe_visit(rel_dir: str) -> dict | None:
+        try:
+            return visit(rel_dir)
+        except OSError:
+            # Removed or unreadable while scanning, like os.walk we skip it
+            return None
+
+    records = {}
+    if jobs <= 1:
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            record = safe_visit(rel_dir)
+            if record is not None:
+                records[rel_dir] = record
+                pending.extend(os.path.join(rel_dir, d) for d in record["subdirs"])
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(contextvars.copy_context().run, safe_visit, ""): ""}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_dir = futures.pop(future)
+                    record = future.result()
+                    if record is None:
+                        continue
+                    records[rel_dir] = record
+                    for d in record["subdirs"]:
+                        child = os.path.join(rel_dir, d)
+                        futures[pool.submit(contextvars.copy_context().run, safe_visit, child)] = child
+
+    ordered = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        if rel_dir not in records:
+            continue
+        record = records[rel_dir]
+        ordered.append((rel_dir, record))
+        stack.extend(os.path.join(rel_dir, d) for d in reversed(record["subdirs"]))
+
+    return ordered
+
+
+def iter_data_folder(data_dir: str = "data", jobs: int = DEFAULT_SCAN_JOBS) -> Iterator[ScannedDataFile]:
+    # Same files and order as scan_data_folder, yielded while the tree is
+    # still being walked so nothing but the pending directories is held
+    rules = load_ignore_rules(data_dir)
+
+    def visit(rel_dir: str) -> dict:
+        abs_dir = os.path.join(data_dir, rel_dir)
+        files, subdirs = rules.filter_listing(rel_dir, *_list_directory(abs_dir, with_stat=False))
+        return _collapse_versions(abs_dir, {"files": files, "subdirs": subdirs})
+
+    # Version summaries of collapsed datasets, keyed by the latest version dir
+    pending_versions: dict[str, dict] = {}
+
+    for rel_dir, record in _iter_directories(data_dir, visit, jobs):
+        if "versions" in record:
+            pending_versions[os.path.join(rel_dir, record["versions"]["latest"])] = record["versions"]
+
+        versions = pending_versions.pop(rel_dir, None)
+        versions = {} if versions is None else {
+            "version": versions["latest"],
+            "version_count": versions["count"],
+            "versioned_bytes": versions["bytes"],
+        }
+        count(FILES_SEEN, len(record["files"]))
+        for name in record["files"]:
+            rel_path = os.path.join(rel_dir, name)
+            yield ScannedDataFile(
+                full_path=os.path.join(data_dir, rel_path),
                 rel_path=rel_path,
-                dataset_type=dataset_type 
-            ))
+                dataset_type=EXT_TO_KEDRO_DATASET.get(os.path.splitext(name)[1].lower()),
+                **versions,
+            )
+
+
+def _iter_directories(
+    data_dir: str, visit: Callable[[str], dict | None], jobs: int = DEFAULT_SCAN_JOBS
+) -> Iterator[tuple[str, dict]]:
+    # Depth-first like _walk_directories, but records are yielded as soon as
+    # they are reached and dropped afterwards. Instead of fanning out over the
+    # whole tree, the pool only lists the next ``jobs`` directories on the stack
+    # ahead of time, which bounds the listings held in memory.
+    if not _is_directory(data_dir):
+        return
+
+    def safe_visit(rel_dir: str) -> dict | None:
+        try:
+            return visit(rel_dir)
+        except OSError:
+            return None
+
+    stack = [""]
+    if jobs <= 1:
+        while stack:
+            rel_dir = stack.pop()
+            record = safe_visit(rel_dir)
+            if record is not None:
+                yield rel_dir, record
+                stack.extend(os.path.join(rel_dir, d) for d in reversed(record["subdirs"]))
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        prefetched = {}
+        while stack:
+            for rel_dir in stack[-jobs:]:
+                if rel_dir not in prefetched:
+                    prefetched[rel_dir] = pool.submit(contextvars.copy_context().run, safe_visit, rel_dir)
+
+            rel_dir = stack.pop()
+            record = prefetched.pop(rel_dir).result()
+            if record is not None:
+                yield rel_dir, record
+                stack.extend(os.path.join(rel_dir, d) for d in reversed(record["subdirs"]))
+
+
+def _to_scanned_file(data_dir: str, rel_path: str, stat: list[int], versions: dict) -> ScannedDataFile:
+    size, mtime_ns, inode = stat
+    return ScannedDataFile(
+        full_path=os.path.join(data_dir, rel_path),
+        rel_path=rel_path,
+        dataset_type=EXT_TO_KEDRO_DATASET.get(os.path.splitext(rel_path)[1].lower()),
+        size=size,
+        mtime_ns=mtime_ns,
+        inode=inode,
+        **versions,
+    )
 
-    return entries
+
+def _stat_files(abs_dir: str, files: dict[str, list[int] | None]) -> dict[str, list[int] | None]:
+    stats = {}
+    for name in files:
+        try:
+            stat = os.stat(os.path.join(abs_dir, name))
+        except OSError:
+            continue
+        stats[name] = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+    return stats
+
+
+def diff_data_folder(
+    data_dir: str = "data",
+    manifest: dict | None = None,
+    jobs: int = DEFAULT_SCAN_JOBS,
+    dirty_dirs: Iterable[str] = (),
+    verify_files: bool = False,
+    only_dirty_dirs: bool = False,
+) -> tuple[List[ScannedDataFile], List[ScannedDataFile], List[str], dict]:
+    # Only directories whose mtime changed since the manifest was written are
+    # listed again: adding, removing or renaming a file bumps the mtime of its
+    # parent directory. Files rewritten in place leave the mtime alone, and
+    # are only caught through ``dirty_dirs``, which forces a listing of
+    # directories known to have changed, or with ``verify_files``, which
+    # stats every recorded file of the unchanged directories. That is one
+    # stat per file, as much as a full scan. With ``only_dirty_dirs``, the
+    # caller watches every change and the other directories are taken from
+    # the manifest without a stat.
+    # Models are only created for the added and modified files, every file
+    # is in the returned manifest.
+    manifest = manifest or {}
+    old_dirs = manifest.get("dirs", {}) if manifest.get("data_dir") == data_dir else {}
+    dirty_dirs = set(dirty_dirs)
+    rules = load_ignore_rules(data_dir)
+    # Listings filtered by other ignore rules are all taken again, and
+    # compared to the old ones for files that are now left out
+    relist = manifest.get("ignore") != rules.digest
+
+    def visit(rel_dir: str) -> dict:
+        cached = old_dirs.get(rel_dir)
+        if only_dirty_dirs and cached is not None and rel_dir not in dirty_dirs and not relist:
+            return cached
+        mtime_ns = os.stat(os.path.join(data_dir, rel_dir)).st_mtime_ns
+        unchanged = cached is not None and cached["mtime_ns"] == mtime_ns
+        abs_dir = os.path.join(data_dir, rel_dir)
+        if unchanged and rel_dir not in dirty_dirs and not relist:
+            if not verify_files:
+                return cached
+            restated = _stat_files(abs_dir, cached["files"])
+            return cached if restated == cached["files"] else {**cached, "files": restated}
+        dir_files, subdirs = rules.filter_listing(rel_dir, *_list_directory(abs_dir))
+        return _collapse_versions(abs_dir, {"mtime_ns": mtime_ns, "files": dir_files, "subdirs": subdirs})
+
+    new_dirs = {}
+    added, modified, removed = [], [], []
+
+    walked = _walk_directories(data_dir, visit, jobs)
+    records = dict(walked)
+    for rel_dir, record in walked:
+        new_dirs[rel_dir] = record
+        cached = old_dirs.get(rel_dir)
+        if record is cached:
+            continue
+        old_files = cached["files"] if cached is not None else {}
+        versions = _dataset_versions(records, rel_dir)
+
+        for name, stat in record["files"].items():
+            if name not in old_files:
+                added.append(_to_scanned_file(data_dir, os.path.join(rel_dir, name), stat, versions))
+            elif old_files[name] != stat:
+                modified.append(_to_scanned_file(data_dir, os.path.join(rel_dir, name), stat, versions))
+        removed.extend(
+            os.path.join(rel_dir, name)
+            for name in old_files
+            if name not in record["files"]
+        )
+
+    for rel_dir, cached in old_dirs.items():
+        if rel_dir not in new_dirs:
+            removed.extend(os.path.join(rel_dir, name) for name in cached["files"])
+
+    new_manifest = {"version": MANIFEST_VERSION, "data_dir": data_dir, "ignore": rules.digest, "dirs": new_dirs}
+    return added, modified, sorted(removed), new_manifest
+
+
+def scan_data_folder_incremental(
+    data_dir: str = "data",
+    manifest: dict | None = None,
+    jobs: int = DEFAULT_SCAN_JOBS,
+    dirty_dirs: Iterable[str] = (),
+    verify_files: bool = False,
+) -> tuple[ScanResult, dict]:
+    added, modified, removed, new_manifest = diff_data_folder(data_dir, manifest, jobs, dirty_dirs, verify_files)
+    files = manifest_table(data_dir, new_manifest, with_stat=True).to_models()
+    return ScanResult(files=files, added=added, modified=modified, removed=removed), new_manifest
 
 
 def observe_project(scanned_files: List[ScannedDataFile]) -> ObservedProject:
     versioned_files = []
     uncatalogued_files = []
-    possible_models = []
+    versioned_datasets: dict[str, VersionedDataset] = {}
 
     catalogued_files = set()
-    versioned_pattern = re.compile(r"(.*)/\d{4}-\d{2}-\d{2}T\d{2}\.\d{2}\.\d{2}\.\d{3}Z/.*")
 
     for entry in scanned_files:
         rel_path = entry.rel_path
@@ -56,38 +467,64 @@ def observe_project(scanned_files: List[ScannedDataFile]) -> ObservedProject:
         dataset_type = entry.dataset_type
 
         # Track versioned files
-        if versioned_pattern.match(rel_path):
+        match = VERSIONED_PATH_PATTERN.match(rel_path.replace("\\", "/"))
+        if match:
             versioned_files.append(rel_path)
-            if "model" in rel_path.lower() or "regressor" in rel_path.lower():
-                possible_models.append(rel_path)
+            dataset_path, version = match.group(1), match.group(2)
+            known = versioned_datasets.get(dataset_path)
+            if entry.version is not None:
+                # The walker already summarised the versions it did not descend into
+                versioned_datasets[dataset_path] = VersionedDataset(
+                    path=dataset_path,
+                    latest_version=entry.version,
+                    version_count=entry.version_count,
+                    total_bytes=entry.versioned_bytes,
+                )
+            elif known is None:
+                versioned_datasets[dataset_path] = VersionedDataset(
+                    path=dataset_path,
+                    latest_version=version,
+                    version_count=1,
+                    total_bytes=entry.size or 0,
+                )
+            else:
+                known.latest_version = max(known.latest_version, version)
+                known.version_count += 1
+                known.total_bytes += entry.size or 0
             continue
 
         # Track uncatalogued files
         uncatalogued_files.append(rel_path)
 
+    possible_models = [
+        path for path in versioned_datasets
+        if "model" in path.lower() or "regressor" in path.lower()
+    ]
+
     return ObservedProject(
         versioned_files=sorted(versioned_files),
         uncatalogued_files=sorted(uncatalogued_files),
         possible_models=sorted(possible_models),
+        versioned_datasets=sorted(versioned_datasets.values(), key=lambda v: v.path),
     )
 
 
 def analyze_observed_project(project: ObservedProject) -> List[CatalogEntrySuggestion]:
     suggestions = []
 
-    versioned_dirs = {
-        Path(f).parts[0:2] 
-        for f in project.versioned_files
-    }
-    unique_versioned_paths = {os.path.join(*parts) for parts in versioned_dirs}
+    if project.versioned_datasets:
+        unique_versioned_paths = {v.path for v in project.versioned_datasets}
+    else:
+        unique_versioned_paths = {
+            match.group(1)
+            for f in project.versioned_files
+            if (match := VERSIONED_PATH_PATTERN.match(f.replace("\\", "/")))
+        }
 
     # Combine unversioned + deduplicated versioned
-    all_relevant_paths = project.uncatalogued_files + list(unique_versioned_paths)
+    all_relevant_paths = project.uncatalogued_files + sorted(unique_versioned_paths)
 
     for rel_path in all_relevant_paths:
-        _, ext = os.path.splitext(rel_path)
-        #dataset_type = EXT_TO_KEDRO_DATASET.get(ext.lower(), None)
-        dataset_type = None
         is_versioned = rel_path in unique_versioned_paths
 
         suggested_name = os.path.splitext(os.path.basename(rel_path))[0]
@@ -96,7 +533,8 @@ def analyze_observed_project(project: ObservedProject) -> List[CatalogEntrySugge
             CatalogEntrySuggestion(
                 filepath=rel_path,
                 suggested_name=suggested_name,
-                suggested_type=dataset_type,
+                # Left to the resolver and the model
+                suggested_type=None,
                 is_versioned=is_versioned,
             )
         )
@@ -104,43 +542,611 @@ def analyze_observed_project(project: ObservedProject) -> List[CatalogEntrySugge
     return suggestions
 
 
-def to_catalog_entries(suggestions: List[CatalogEntrySuggestion]) -> dict:
+def iter_catalog_suggestions(scanned_files: Iterable[ScannedDataFile]) -> Iterator[CatalogEntrySuggestion]:
+    # Streaming counterpart of observe_project + analyze_observed_project. Only
+    # the paths of versioned datasets are remembered, to yield each one once.
+    seen_versioned = set()
+
+    for entry in scanned_files:
+        rel_path = entry.rel_path
+        match = VERSIONED_PATH_PATTERN.match(rel_path.replace("\\", "/"))
+        if match:
+            rel_path = match.group(1)
+            if rel_path in seen_versioned:
+                continue
+            seen_versioned.add(rel_path)
+
+        yield CatalogEntrySuggestion(
+            filepath=rel_path,
+            suggested_name=os.path.splitext(os.path.basename(rel_path))[0],
+            suggested_type=None,
+            is_versioned=match is not None,
+        )
+
+
+def to_catalog_entry(entry: CatalogEntrySuggestion, root: str = "data") -> dict | None:
+    rel_path = entry.filepath.replace("\\", "/")
+
+    if entry.suggested_type is None:
+        logger.warning("[SKIPPED] Could not determine dataset type for: %s", rel_path)
+        count(ENTRIES_SKIPPED)
+        event("skipped", dataset=entry.suggested_name, filepath=rel_path)
+        return None
+
+    catalog_entry = {
+        "type": entry.suggested_type,
+        "filepath": f"{root}/{rel_path}"
+    }
+
+    if entry.is_versioned:
+        catalog_entry["versioned"] = True
+    if entry.load_args:
+        catalog_entry["load_args"] = entry.load_args
+    if entry.save_args:
+        catalog_entry["save_args"] = entry.save_args
+
+    if entry.collection_type is not None:
+        # Every partition is loaded like the first one
+        del catalog_entry["filepath"]
+        catalog_entry = {
+            "type": entry.collection_type,
+            "path": f"{root}/{entry.collection_path}",
+            "dataset": catalog_entry,
+            "filename_suffix": os.path.splitext(rel_path)[1],
+        }
+
+    return catalog_entry
+
+
+def entry_path(entry: dict) -> str:
+    # Collections have a ``path`` instead of a ``filepath``
+    return entry.get("filepath") or entry.get("path") or ""
+
+
+def to_catalog_entries(suggestions: List[CatalogEntrySuggestion], root: str = "data") -> dict:
     catalog = {}
 
     for entry in suggestions:
-        dataset_name = entry.suggested_name.lower()
-        dataset_type = entry.suggested_type
-        rel_path = entry.filepath.replace("\\", "/")
-
-        if dataset_type is None:
-            print(f"[SKIPPED] Could not determine dataset type for: {rel_path}")
+        catalog_entry = to_catalog_entry(entry, root)
+        if catalog_entry is None:
+            continue
+        name = entry.suggested_name.lower()
+        if name in catalog:
+            # Same as the streaming writer: the first file with a name keeps it
+            logger.warning("[SKIPPED] Dataset name already in the catalog: %s", name)
             continue
+        catalog[name] = catalog_entry
 
-        catalog[dataset_name] = {
-            "type": dataset_type,
-            "filepath": f"data/{rel_path}"
-        }
+    return catalog
 
-        if entry.is_versioned:
-            catalog[dataset_name]["versioned"] = True
 
+def load_catalog_from_yaml(catalog_path: str = DEFAULT_CATALOG_PATH) -> dict:
+    if not os.path.exists(catalog_path):
+        return {}
+
+    with open(catalog_path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def merge_catalog_entries(existing: dict, updates: dict, prune_missing: bool = False) -> dict:
+    catalog = dict(existing)
+
+    if prune_missing:
+        catalog = {
+            name: entry
+            for name, entry in catalog.items()
+            if os.path.exists(entry_path(entry))
+        }
+
+    catalog.update(updates)
     return catalog
 
 
-def write_catalog_to_yaml(catalog_dict: dict, output_path: str = "conf/base/auto_catalog.yml"):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+def write_catalog_to_yaml(catalog_dict: dict, output_path: str = DEFAULT_CATALOG_PATH):
+    with CatalogStreamWriter(output_path) as writer:
+        for name, entry in catalog_dict.items():
+            writer.write(name, entry)
+
+
+class CatalogStreamWriter:
+    """Writes catalog entries one at a time, plus their precompiled snapshot.
+
+    Entries are rendered with libyaml when available and go to ``.partial``
+    files next to the catalog and its snapshot. On ``close`` they only replace
+    the previous files if the content changed, so unchanged catalogs keep their
+    mtime, and an interrupted run leaves the previous catalog intact.
+    """
+
+    def __init__(self, output_path: str = DEFAULT_CATALOG_PATH):
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self.output_path = output_path
+        self.snapshot_path = snapshot_path_for(output_path)
+        self._tmp_path = f"{output_path}.partial"
+        self._snapshot_tmp_path = f"{self.snapshot_path}.partial"
+        self._file = open(self._tmp_path, "wb")
+        self._snapshot = open(self._snapshot_tmp_path, "wb")
+        self._snapshot.write(SNAPSHOT_MAGIC)
+        self._digest = hashlib.sha256()
+        self.names = set()
+
+    def write(self, name: str, entry: dict) -> bool:
+        if name in self.names:
+            logger.warning("[SKIPPED] Dataset name already in the catalog: %s", name)
+            return False
+        text = yaml.dump({name: entry}, Dumper=_Dumper, sort_keys=False)
+        if self.names:
+            text = "\n" + text
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._digest.update(data)
+        if self._snapshot is not None:
+            try:
+                line = json.dumps([name, entry], separators=(",", ":"))
+            except (TypeError, ValueError):
+                # Hand-edited YAML may hold values JSON has no type for, such
+                # as dates, and the catalog is then read from the YAML alone
+                self._drop_snapshot()
+            else:
+                self._snapshot.write(line.encode("utf-8") + b"\n")
+        self.names.add(name)
+        return True
+
+    def _drop_snapshot(self):
+        self._snapshot.close()
+        os.remove(self._snapshot_tmp_path)
+        self._snapshot = None
+
+    def flush(self):
+        self._file.flush()
+        if self._snapshot is not None:
+            self._snapshot.flush()
+
+    def close(self):
+        digest = self._digest.hexdigest()
+        self._file.close()
+        replaced = [(self._tmp_path, self.output_path, file_sha256(self.output_path))]
+        if self._snapshot is not None:
+            self._snapshot.write(digest.encode("ascii"))
+            self._snapshot.close()
+            replaced.append((self._snapshot_tmp_path, self.snapshot_path, snapshot_digest(self.snapshot_path)))
+
+        for tmp_path, path, current in replaced:
+            if current == digest:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+        if self._snapshot is not None:
+            self._drop_snapshot()
+
+    def __enter__(self) -> "CatalogStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
 
-    with open(output_path, "w") as f:
-        for i, (name, entry) in enumerate(catalog_dict.items()):
-            yaml.dump({name: entry}, f, sort_keys=False)
-            if i < len(catalog_dict) - 1:
-                f.write("\n")
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
-def update_auto_catalog():
-    scanned_datafile: List[ScannedDataFile] = scan_data_folder()
-    observed_project: ObservedProject = observe_project(scanned_datafile)
-    catalog_plan: List[CatalogEntrySuggestion] = analyze_observed_project(observed_project)
-    suggestions = infer_dataset_types(catalog_plan)
-    catalog_entries = to_catalog_entries(suggestions)
-    write_catalog_to_yaml(catalog_entries)
\ No newline at end of file
+def _produce_in_thread(items: Iterable, maxsize: int) -> Iterator:
+    # Runs an iterator in a background thread behind a bounded queue, so the
+    # scan keeps walking while the consumer waits on the model, but can never
+    # get more than ``maxsize`` items ahead of it
+    done = object()
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    failure = []
+
+    def produce():
+        try:
+            for item in items:
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            buffer.put(done)
+
+    # Files seen by the scan are counted in the consumer's span
+    context = contextvars.copy_context()
+    producer = threading.Thread(target=context.run, args=(produce,), daemon=True)
+    producer.start()
+    try:
+        while (item := buffer.get()) is not done:
+            yield item
+        if failure:
+            raise failure[0]
+    finally:
+        stop.set()
+        # Unblock a producer still waiting to hand over its final marker
+        while producer.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def stream_auto_catalog(
+    data_dir: str = "data",
+    output_path: str = DEFAULT_CATALOG_PATH,
+    jobs: int = DEFAULT_SCAN_JOBS,
+    cache_path: str | None = DEFAULT_INFERENCE_CACHE_PATH,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    backend: str = DEFAULT_BACKEND,
+    backend_options: dict | None = None,
+    project_path: str | None = ".",
+    batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    queue_size: int = DEFAULT_STREAM_QUEUE_SIZE,
+    profile: bool = True,
+    transcode: bool = True,
+    transcode_min_bytes: int = DEFAULT_TRANSCODE_MIN_BYTES,
+    min_partitions: int | None = DEFAULT_MIN_PARTITIONS,
+    type_index_path: str | None = DEFAULT_TYPE_INDEX_PATH,
+    learn_model_types: bool = False,
+):
+    # Full rebuild where scan, observe, resolve and infer are generator stages
+    # and entries are written as soon as their batch is typed. Memory stays
+    # bounded by the queue and batch sizes instead of growing with the tree;
+    # only dataset names are kept for the whole run.
+    root = catalog_root(data_dir)
+    data_dir = local_path(data_dir)
+    with span("stream_auto_catalog", data_dir=data_dir, backend=backend, batch_size=batch_size):
+        static_types = {}
+        column_usage = {}
+        catalog_index = CatalogIndex({})
+        if project_path is not None:
+            pipelines = load_registered_pipelines(project_path)
+            static_types = infer_pipeline_dataset_types(pipelines)
+            column_usage = infer_pipeline_column_usage(pipelines)
+            catalog_index = build_catalog_index(project_path, exclude=load_catalog_from_yaml(output_path))
+        unseen_static = set(static_types) - catalog_index.names
+
+        def uncatalogued(items: Iterable[CatalogEntrySuggestion]) -> Iterator[CatalogEntrySuggestion]:
+            for s in items:
+                if catalog_index.match(os.path.join(data_dir, s.filepath)) is None:
+                    yield s
+                else:
+                    count(FILES_PRUNED)
+                    unseen_static.discard(s.suggested_name.lower())
+
+        suggestions = uncatalogued(iter_catalog_suggestions(iter_data_folder(data_dir, jobs=jobs)))
+        if min_partitions is not None:
+            suggestions = group_collections(suggestions, min_partitions, exclude_names=static_types)
+        suggestions = _produce_in_thread(suggestions, queue_size)
+
+        total = resolved_locally = 0
+        pairs = {}
+        inference_backend = node_index = None
+        cache = InferenceCache(cache_path) if cache_path is not None else None
+        type_index = TypeIndex(type_index_path, learn_model_answers=learn_model_types) if type_index_path is not None else None
+        try:
+            if type_index is not None:
+                # Hand-written entries are the surest examples of each type
+                type_index.learn_catalog(catalog_index.entries, root, data_dir)
+            with CatalogStreamWriter(output_path) as writer:
+                for batch in _batched(suggestions, batch_size):
+                    unresolved = resolve_dataset_types(batch, data_dir)
+                    if static_types:
+                        unresolved = apply_static_types(unresolved, static_types)
+                        unseen_static.difference_update(s.suggested_name.lower() for s in batch)
+                    total += len(batch)
+                    resolved_locally += len(batch) - len(unresolved)
+
+                    if unresolved:
+                        if inference_backend is None:
+                            inference_backend = create_backend(backend, **(backend_options or {}))
+                            node_index = build_node_index()
+                        infer_dataset_types(
+                            unresolved,
+                            cache=cache,
+                            data_dir=data_dir,
+                            max_concurrency=max_concurrency,
+                            backend=inference_backend,
+                            type_index=type_index,
+                            node_index=node_index,
+                        )
+                    if profile:
+                        profile_datasets(batch, data_dir, column_usage)
+
+                    written = {}
+                    for s in batch:
+                        catalog_entry = to_catalog_entry(s, root)
+                        if catalog_entry is not None and writer.write(s.suggested_name.lower(), catalog_entry):
+                            count(ENTRIES_WRITTEN)
+                            written[s.suggested_name.lower()] = catalog_entry
+                    if transcode:
+                        # Only large raw files have pairs, which go last like in a full rebuild
+                        pairs.update(iter_transcoded_entries(written, min_bytes=transcode_min_bytes))
+                    writer.flush()
+
+                # Pipeline outputs that have not been written yet cannot be seen by the scan
+                for name in sorted(unseen_static):
+                    if name not in writer.names:
+                        writer.write(name, to_catalog_entry(static_types[name], root))
+                        count(ENTRIES_WRITTEN)
+                        total += 1
+                        resolved_locally += 1
+                if transcode:
+                    project_entries = {
+                        name: entry for name, entry in catalog_index.entries.items() if name not in writer.names
+                    }
+                    pairs.update(iter_transcoded_entries({}, project_entries, transcode_min_bytes))
+                    for name, entry in pairs.items():
+                        writer.write(name, entry)
+        finally:
+            # Stops the scan thread if a stage failed before it was drained
+            suggestions.close()
+            if cache is not None:
+                cache.close()
+            if type_index is not None:
+                type_index.close()
+
+        count(DATASETS_RESOLVED, resolved_locally)
+        logger.info("Resolved %d of %d datasets locally.", resolved_locally, total)
+
+
+def update_auto_catalog(
+    incremental: bool = True,
+    data_dir: str = "data",
+    output_path: str = DEFAULT_CATALOG_PATH,
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+    jobs: int = DEFAULT_SCAN_JOBS,
+    cache_path: str | None = DEFAULT_INFERENCE_CACHE_PATH,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    backend: str = DEFAULT_BACKEND,
+    backend_options: dict | None = None,
+    project_path: str | None = ".",
+    dirty_dirs: Iterable[str] = (),
+    verify_files: bool = False,
+    profile: bool = True,
+    transcode: bool = True,
+    transcode_min_bytes: int = DEFAULT_TRANSCODE_MIN_BYTES,
+    min_partitions: int | None = DEFAULT_MIN_PARTITIONS,
+    type_index_path: str | None = DEFAULT_TYPE_INDEX_PATH,
+    learn_model_types: bool = False,
+    manifest: dict | None = None,
+    only_dirty_dirs: bool = False,
+    pipelines: dict | None = None,
+    catalog_index: CatalogIndex | None = None,
+) -> dict | None:
+    # Returns the scan manifest of an incremental run. Long-running callers
+    # pass it back in along with the loaded ``pipelines`` and
+    # ``catalog_index``, instead of having them read again on every run.
+    from table_scripts import ScanTable, plan_catalog, to_suggestions
+
+    root = catalog_root(data_dir)
+    data_dir = local_path(data_dir)
+    if incremental and is_remote(data_dir):
+        # Object stores have no directory mtimes to skip unchanged prefixes by
+        logger.info("%s is remote, scanning it in full.", data_dir)
+        incremental = False
+
+    with span("update_auto_catalog", incremental=incremental, data_dir=data_dir, backend=backend):
+        # Scanning, observing and planning run on columns, models are only
+        # created for the changed files and for the datasets that make it
+        # past the project catalog
+        with span("scan"):
+            if incremental:
+                if manifest is None:
+                    manifest = load_scan_manifest(manifest_path)
+                added, modified, removed, manifest = diff_data_folder(
+                    data_dir, manifest, jobs, dirty_dirs, verify_files, only_dirty_dirs
+                )
+                table = ScanTable.from_models(data_dir, added + modified)
+                all_files = manifest_table(data_dir, manifest)
+                count(FILES_SEEN, len(all_files))
+                count(FILES_PRUNED, len(all_files) - len(table))
+                logger.info(
+                    "Scanned %d files: %d added, %d modified, %d removed.",
+                    len(all_files), len(added), len(modified), len(removed),
+                )
+            else:
+                table = scan_data_table(data_dir, jobs=jobs)
+                count(FILES_SEEN, len(table))
+
+        with span("plan"):
+            plan = plan_catalog(table)
+            existing_catalog = load_catalog_from_yaml(output_path)
+
+            if catalog_index is None:
+                catalog_index = CatalogIndex({})
+                if project_path is not None:
+                    catalog_index = build_catalog_index(project_path, exclude=existing_catalog)
+            if project_path is not None:
+                # Datasets the project already catalogues are neither typed nor written again
+                planned = plan.num_rows
+                plan = drop_catalogued_table(plan, catalog_index, data_dir)
+                count(FILES_PRUNED, planned - plan.num_rows)
+                logger.info("Skipped %d datasets already in the project catalog.", planned - plan.num_rows)
+
+            static_types = {}
+            if project_path is not None:
+                if pipelines is None:
+                    pipelines = load_registered_pipelines(project_path)
+                static_types = infer_pipeline_dataset_types(pipelines)
+
+            collections = None
+            if min_partitions is not None:
+                # Collections are found over every file, not just the changed ones,
+                # and emitted again each run: there are few and their types are cached
+                all_plan = plan
+                if incremental:
+                    all_plan = drop_catalogued_table(plan_catalog(all_files), catalog_index, data_dir)
+                collections = find_collections(all_plan, min_partitions, exclude_names=static_types)
+                plan = drop_collection_members(plan, collections)
+                if collections.num_rows:
+                    logger.info(
+                        "Grouped %d files into %d collections.", sum(collections["files"].to_pylist()), collections.num_rows
+                    )
+
+            catalog_plan: List[CatalogEntrySuggestion] = to_suggestions(plan)
+            collection_roots = ()
+            if collections is not None:
+                catalog_plan = merge_collections(catalog_plan, to_collection_suggestions(collections))
+                collection_roots = tuple(f"{root}/{path}/" for path in collections["root"].to_pylist())
+
+            existing_catalog = {
+                name: entry
+                for name, entry in existing_catalog.items()
+                if incremental
+                and catalog_index.match(entry_path(entry)) is None
+                # Files that joined a collection since they were catalogued
+                and not entry_path(entry).startswith(collection_roots)
+            }
+
+        type_index = TypeIndex(type_index_path, learn_model_answers=learn_model_types) if type_index_path is not None else None
+        try:
+            with span("resolve"):
+                unresolved = resolve_dataset_types(catalog_plan, data_dir)
+
+                column_usage = {}
+                if project_path is not None:
+                    column_usage = infer_pipeline_column_usage(pipelines)
+                    unresolved = apply_static_types(unresolved, static_types)
+
+                    # Pipeline outputs that have not been written yet cannot be seen by the scan
+                    known = (all_files if incremental else table).present_stems(static_types)
+                    known |= {s.suggested_name.lower() for s in catalog_plan}
+                    known |= catalog_index.names
+                    catalog_plan += [s for name, s in static_types.items() if name not in known]
+
+                if type_index is not None:
+                    # Hand-written entries are the surest examples of each type
+                    type_index.learn_catalog(catalog_index.entries, root, data_dir)
+
+                count(DATASETS_RESOLVED, len(catalog_plan) - len(unresolved))
+                logger.info("Resolved %d of %d datasets locally.", len(catalog_plan) - len(unresolved), len(catalog_plan))
+
+            if unresolved:
+                with span("infer", datasets=len(unresolved)):
+                    inference_backend = create_backend(backend, **(backend_options or {}))
+                    node_index = build_node_index()
+                    if cache_path is None:
+                        infer_dataset_types(
+                            unresolved,
+                            data_dir=data_dir,
+                            max_concurrency=max_concurrency,
+                            backend=inference_backend,
+                            type_index=type_index,
+                            node_index=node_index,
+                        )
+                    else:
+                        with InferenceCache(cache_path) as cache:
+                            infer_dataset_types(
+                                unresolved,
+                                cache=cache,
+                                data_dir=data_dir,
+                                max_concurrency=max_concurrency,
+                                backend=inference_backend,
+                                type_index=type_index,
+                                node_index=node_index,
+                            )
+        finally:
+            if type_index is not None:
+                type_index.close()
+
+        if profile:
+            # Only the metadata of the files is read, to tune how they are loaded
+            profile_datasets(catalog_plan, data_dir, column_usage)
+
+        with span("write"):
+            catalog_entries = to_catalog_entries(catalog_plan, root)
+            count(ENTRIES_WRITTEN, len(catalog_entries))
+
+            if incremental:
+                catalog_entries = merge_catalog_entries(
+                    existing_catalog,
+                    catalog_entries,
+                    prune_missing=bool(removed),
+                )
+            if transcode:
+                # Slow raw formats get a Parquet cache, hand-written entries included
+                catalog_entries = add_transcoded_entries(catalog_entries, catalog_index.entries, transcode_min_bytes)
+
+            write_catalog_to_yaml(catalog_entries, output_path)
+
+            if incremental:
+                # Only persisted once the changes made it into the catalog, so a failed
+                # run picks up the same changes next time
+                save_scan_manifest(manifest, manifest_path)
+    return manifest if incremental else None
+
+
+def resolve_named_datasets(
+    names: Iterable[str],
+    data_dir: str = "data",
+    cache_path: str | None = DEFAULT_INFERENCE_CACHE_PATH,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    backend: str = DEFAULT_BACKEND,
+    backend_options: dict | None = None,
+    type_index_path: str | None = DEFAULT_TYPE_INDEX_PATH,
+    learn_model_types: bool = False,
+) -> dict[str, dict]:
+    # Catalog entries for just the given datasets, keyed by the names asked
+    # for. The walk stops once every name has a file, and only these files are
+    # sniffed or sent to the model. Names without a file are left out.
+    wanted = {name.lower(): name for name in names}
+    found: dict[str, CatalogEntrySuggestion] = {}
+    root = catalog_root(data_dir)
+    data_dir = local_path(data_dir)
+
+    with span("resolve_named_datasets", datasets=len(wanted)):
+        suggestions = iter_catalog_suggestions(iter_data_folder(data_dir))
+        try:
+            for s in suggestions:
+                key = s.suggested_name.lower()
+                if key in wanted and key not in found:
+                    found[key] = s
+                    if len(found) == len(wanted):
+                        break
+        finally:
+            # Stops the walk of the rest of the tree
+            suggestions.close()
+        count(FILES_PRUNED, len(wanted) - len(found))
+
+        unresolved = resolve_dataset_types(list(found.values()), data_dir)
+        count(DATASETS_RESOLVED, len(found) - len(unresolved))
+        if unresolved:
+            inference_backend = create_backend(backend, **(backend_options or {}))
+            cache = InferenceCache(cache_path) if cache_path is not None else None
+            type_index = TypeIndex(type_index_path, learn_model_answers=learn_model_types) if type_index_path is not None else None
+            try:
+                infer_dataset_types(
+                    unresolved,
+                    verbose=False,
+                    cache=cache,
+                    data_dir=data_dir,
+                    max_concurrency=max_concurrency,
+                    backend=inference_backend,
+                    type_index=type_index,
+                    node_index=build_node_index(),
+                )
+            finally:
+                if cache is not None:
+                    cache.close()
+                if type_index is not None:
+                    type_index.close()
+
+        entries = {}
+        for key, s in found.items():
+            catalog_entry = to_catalog_entry(s, root)
+            if catalog_entry is not None:
+                entries[wanted[key]] = catalog_entry
+        count(ENTRIES_WRITTEN, len(entries))
+    return entries
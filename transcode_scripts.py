@@ -0,0 +1,120 @@
+import logging
+import os
+from typing import Iterator
+
+import yaml
+
+from ai_tool_idea_test.columnar_cache import METADATA_KEY, cache_source, refresh_cache
+from telemetry_scripts import count, span
+
+logger = logging.getLogger(__name__)
+
+TRANSCODED = "entries.transcoded"
+
+# Raw files smaller than this parse fast enough as they are
+DEFAULT_TRANSCODE_MIN_BYTES = 512 * 1024
+# Outside the data folder, so the scan never catalogues the caches themselves
+TRANSCODE_CACHE_DIR = ".autocatalog/cache"
+
+TRANSCODED_TYPES = {
+    "pandas.ExcelDataset": "excel",
+    "pandas.CSVDataset": "csv",
+    "pandas.XMLDataset": "xml",
+}
+
+
+def transcoded_pair(
+    name: str,
+    entry: dict,
+    min_bytes: int = DEFAULT_TRANSCODE_MIN_BYTES,
+    cache_dir: str = TRANSCODE_CACHE_DIR,
+) -> dict:
+    # ``name@<format>`` reading the raw file and ``name@parquet`` caching it,
+    # or nothing if the file is small, versioned, remote or not slow to parse
+    label = TRANSCODED_TYPES.get(entry.get("type"))
+    filepath = entry.get("filepath")
+    if label is None or not isinstance(filepath, str) or entry.get("versioned"):
+        return {}
+    if "@" in name or "{" in name or "://" in filepath:
+        return {}
+    try:
+        if os.path.getsize(filepath) < min_bytes:
+            return {}
+    except OSError:
+        return {}
+
+    cache_path = f"{cache_dir}/{name}.parquet"
+    return {
+        f"{name}@{label}": dict(entry),
+        f"{name}@parquet": {
+            "type": "pandas.ParquetDataset",
+            "filepath": cache_path,
+            "load_args": {"engine": "pyarrow"},
+            "save_args": {"engine": "pyarrow"},
+            "metadata": {
+                METADATA_KEY: {
+                    "source": f"{name}@{label}",
+                    "source_filepath": filepath,
+                    "stamp": f"{cache_path}.source.json",
+                }
+            },
+        },
+    }
+
+
+def iter_transcoded_entries(
+    catalog: dict,
+    project_entries: dict | None = None,
+    min_bytes: int = DEFAULT_TRANSCODE_MIN_BYTES,
+) -> Iterator[tuple[str, dict]]:
+    # Pairs for the generated entries and the ones written by hand, unless
+    # the project already transcodes that dataset itself
+    project_entries = project_entries or {}
+    taken = {name.partition("@")[0] for name in project_entries if "@" in name}
+    for entries in (catalog, project_entries):
+        for name, entry in entries.items():
+            if not isinstance(entry, dict) or name in taken:
+                continue
+            pair = transcoded_pair(name, entry, min_bytes)
+            if pair:
+                taken.add(name)
+                count(TRANSCODED)
+                yield from pair.items()
+
+
+def add_transcoded_entries(
+    catalog: dict,
+    project_entries: dict | None = None,
+    min_bytes: int = DEFAULT_TRANSCODE_MIN_BYTES,
+) -> dict:
+    # Pairs from a previous run are dropped first, so a file that shrank or
+    # went away loses its cache entry
+    catalog = {name: entry for name, entry in catalog.items() if "@" not in name}
+    pairs = dict(iter_transcoded_entries(catalog, project_entries, min_bytes))
+    catalog.update(pairs)
+    return catalog
+
+
+def materialize_caches(catalog_path: str) -> int:
+    # Converts every stale cache of a generated catalog up front, instead of
+    # on the first run that reads it. Returns the number of caches rebuilt.
+    from kedro.io import DataCatalog
+
+    with open(catalog_path) as f:
+        config = yaml.safe_load(f) or {}
+    # The generated catalog only has ``@`` in the names of transcoded pairs
+    transcoded = {name: entry for name, entry in config.items() if "@" in name}
+    names = [name for name, entry in transcoded.items() if METADATA_KEY in (entry.get("metadata") or {})]
+    catalog = DataCatalog.from_config(transcoded)
+
+    rebuilt = 0
+    with span("materialize", caches=len(names)):
+        for name in names:
+            source = cache_source(catalog.get(name))["source"]
+            try:
+                if refresh_cache(catalog, name):
+                    rebuilt += 1
+                    logger.info("Converted %s to %s", source, name)
+            except Exception as e:
+                logger.warning("Could not convert %s to %s: %s", source, name, e)
+    return rebuilt
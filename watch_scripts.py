@@ -0,0 +1,249 @@
+import logging
+import os
+import threading
+import time
+from typing import Iterable
+
+from cache_scripts import DEFAULT_INFERENCE_CACHE_PATH
+from catalog_scripts import build_catalog_index
+from ignore_scripts import IgnoreRules, load_ignore_rules
+from static_scripts import load_registered_pipelines
+from tool_scripts import (
+    DEFAULT_CATALOG_PATH,
+    DEFAULT_MANIFEST_PATH,
+    load_catalog_from_yaml,
+    update_auto_catalog,
+)
+
+logger = logging.getLogger(__name__)
+
+# A burst of writes is only catalogued once it has been quiet this long, but
+# never later than the max delay after its first change
+DEFAULT_WATCH_DEBOUNCE = 2.0
+DEFAULT_WATCH_MAX_DELAY = 30.0
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Reading a file changes nothing worth cataloguing
+IGNORED_EVENT_TYPES = {"opened", "closed_no_write"}
+
+
+class Debouncer:
+    def __init__(self, quiet: float = DEFAULT_WATCH_DEBOUNCE, max_delay: float = DEFAULT_WATCH_MAX_DELAY):
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self._changed = threading.Condition()
+        self._pending: set[str] = set()
+        self._first = self._last = 0.0
+
+    def add(self, rel_dirs: Iterable[str]):
+        with self._changed:
+            now = time.monotonic()
+            if not self._pending:
+                self._first = now
+            self._pending.update(rel_dirs)
+            self._last = now
+            self._changed.notify()
+
+    def wait(self, stop: threading.Event) -> set[str] | None:
+        # The directories changed in the next burst, or None once stopped
+        with self._changed:
+            while not stop.is_set():
+                if not self._pending:
+                    self._changed.wait(0.5)
+                    continue
+                due = min(self._last + self.quiet, self._first + self.max_delay)
+                now = time.monotonic()
+                if now >= due:
+                    pending, self._pending = self._pending, set()
+                    return pending
+                self._changed.wait(min(due - now, 0.5))
+        return None
+
+
+def _rel_dir(data_dir: str, path: str) -> str | None:
+    rel = os.path.relpath(path, data_dir)
+    if rel == os.curdir:
+        return ""
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+        return None
+    return rel
+
+
+class DirectoryPoller(threading.Thread):
+    """Polling fallback for when watchdog is not installed or not wanted.
+
+    Every directory is listed once up front, after which each poll only stats
+    the known directories. Creating, removing or renaming an entry bumps the
+    mtime of its directory, and only changed directories are listed again to
+    pick up new subdirectories. Files rewritten in place leave the mtime alone
+    and are not noticed until their directory changes, unlike with watchdog,
+    which reports them as modified. Ignored directories are not polled.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        on_change,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        rules: IgnoreRules | None = None,
+    ):
+        super().__init__(daemon=True)
+        self.data_dir = data_dir
+        self.on_change = on_change
+        self.interval = interval
+        self.rules = rules or load_ignore_rules(data_dir)
+        self._stop_event = threading.Event()
+        self._mtimes: dict[str, int] = {}
+        self._add_tree("")
+
+    def _add_tree(self, rel_dir: str) -> set[str]:
+        added = set()
+        for root, dirs, _ in os.walk(os.path.join(self.data_dir, rel_dir)):
+            rel = _rel_dir(self.data_dir, root)
+            dirs[:] = [d for d in sorted(dirs) if not self.rules.ignores(os.path.join(rel, d), is_dir=True)]
+            try:
+                self._mtimes[rel] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            added.add(rel)
+        return added
+
+    def poll(self) -> set[str]:
+        changed = set()
+        for rel_dir, mtime_ns in list(self._mtimes.items()):
+            abs_dir = os.path.join(self.data_dir, rel_dir)
+            try:
+                current = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                # Removed, which its parent reports as a change of its own
+                del self._mtimes[rel_dir]
+                continue
+            if current == mtime_ns:
+                continue
+            self._mtimes[rel_dir] = current
+            changed.add(rel_dir)
+            try:
+                subdirs = [entry.name for entry in os.scandir(abs_dir) if entry.is_dir() and not entry.is_symlink()]
+            except OSError:
+                continue
+            for name in subdirs:
+                child = os.path.join(rel_dir, name)
+                if child not in self._mtimes and not self.rules.ignores(child, is_dir=True):
+                    changed |= self._add_tree(child)
+        return changed
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            changed = self.poll()
+            if changed:
+                self.on_change(changed)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _start_observer(data_dir: str, on_change, rules: IgnoreRules | None = None):
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    rules = rules or load_ignore_rules(data_dir)
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.event_type in IGNORED_EVENT_TYPES:
+                return
+            paths = [event.src_path, getattr(event, "dest_path", "")]
+            rel_dirs = set()
+            for path in filter(None, paths):
+                path = os.fsdecode(path)
+                rel = _rel_dir(data_dir, path)
+                if rel and rules.ignores_tree(rel, event.is_directory):
+                    continue
+                # A directory event also changes the listing of its parent
+                rel_dirs.add(_rel_dir(data_dir, os.path.dirname(path)))
+                if event.is_directory:
+                    rel_dirs.add(_rel_dir(data_dir, path))
+            rel_dirs.discard(None)
+            if rel_dirs:
+                on_change(rel_dirs)
+
+    observer = Observer()
+    observer.schedule(Handler(), data_dir, recursive=True)
+    observer.start()
+    return observer
+
+
+def start_watching(data_dir: str, on_change, polling: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    # Returns a started watcher with ``stop`` and ``join``
+    rules = load_ignore_rules(data_dir)
+    if not polling:
+        try:
+            return _start_observer(data_dir, on_change, rules)
+        except ImportError:
+            logger.warning("watchdog is not installed, polling %s every %ss instead.", data_dir, poll_interval)
+    poller = DirectoryPoller(data_dir, on_change, poll_interval, rules)
+    poller.start()
+    return poller
+
+
+def watch_auto_catalog(
+    data_dir: str = "data",
+    output_path: str = DEFAULT_CATALOG_PATH,
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+    cache_path: str | None = DEFAULT_INFERENCE_CACHE_PATH,
+    debounce: float = DEFAULT_WATCH_DEBOUNCE,
+    max_delay: float = DEFAULT_WATCH_MAX_DELAY,
+    polling: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop: threading.Event | None = None,
+    **options,
+):
+    # Keeps the catalog up to date until interrupted or ``stop`` is set. Each
+    # burst of changes is an incremental update limited to the directories
+    # that changed: only they are listed, only their new and modified files
+    # are typed, and only their entries are replaced in the catalog. The scan
+    # manifest is kept in memory, and the registered pipelines and project
+    # catalog are loaded once, so changes to those need a restart.
+    stop = stop or threading.Event()
+    debouncer = Debouncer(debounce, max_delay)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # Started before catching up, so nothing landing meanwhile is missed
+    watcher = start_watching(data_dir, debouncer.add, polling=polling, poll_interval=poll_interval)
+    update_options = dict(
+        incremental=True,
+        data_dir=data_dir,
+        output_path=output_path,
+        manifest_path=manifest_path,
+        cache_path=cache_path,
+        **options,
+    )
+    project_path = options.get("project_path", ".")
+    failed: set[str] = set()
+    try:
+        if project_path is not None:
+            update_options["pipelines"] = load_registered_pipelines(project_path)
+            update_options["catalog_index"] = build_catalog_index(
+                project_path, exclude=load_catalog_from_yaml(output_path)
+            )
+        manifest = update_auto_catalog(**update_options)
+        logger.info("Watching %s for changes, press Ctrl+C to stop.", data_dir)
+        while (rel_dirs := debouncer.wait(stop)) is not None:
+            logger.info("Changes in %d directories, updating %s.", len(rel_dirs), output_path)
+            rel_dirs |= failed
+            try:
+                manifest = update_auto_catalog(
+                    manifest=manifest, dirty_dirs=rel_dirs, only_dirty_dirs=True, **update_options
+                )
+                failed = set()
+            except Exception as e:
+                # The manifest is only saved after a successful update, so the
+                # next burst picks these changes up again
+                logger.warning("Catalog update failed, retrying with the next change: %s", e)
+                failed = rel_dirs
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        watcher.stop()
+        watcher.join()